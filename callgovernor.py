@@ -0,0 +1,216 @@
+#! /usr/bin/env python3
+"""
+Retry with backoff, a requests-per-second cap and a circuit breaker for the calls
+to the Odoo and Jira servers. There is one Governor per server (scheme://host:port)
+shared by all threads, so that a bulk run does not trip the server throttles.
+"""
+
+__copyright__ = "(C) 2022-2025 Guido Draheim, licensed under the Apache License 2.0"""
+__version__ = "0.1.4023"
+
+from typing import Dict, List, Optional, Callable, Awaitable, TypeVar, Any, cast
+
+import logging
+import asyncio
+import random
+import socket
+import threading
+import time
+import email.utils
+import urllib.error
+import urllib.parse
+
+logg = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")  # a requests.Response
+
+RETRIES = 4  # attempts after the first one
+BACKOFF = 0.5  # seconds before the first retry, doubled for each retry (with jitter)
+MAXDELAY = 60.  # seconds, also caps the Retry-After of the server
+RATE = 0.  # requests per second per server (0 = no cap)
+BURST = 10  # requests that can go out at once before the RATE applies
+FAILURES = 8  # consecutive transient failures that open the circuit
+COOLDOWN = 30.  # seconds before a trial call is allowed through an open circuit
+RETRY_STATUS = [429, 502, 503, 504]
+SAFE_STATUS = [429, 503]  # the server did not process the request, so that a write can be retried
+
+class CircuitOpenError(Exception):
+    pass
+
+class RetryableError(Exception):
+    """ raised by a checked call for a retryable reply. The retry_after
+        is the delay asked for by the server (None if not given)."""
+    def __init__(self, message: str, retry_after: Optional[float] = None, reply: Any = None) -> None:
+        Exception.__init__(self, message)
+        self.retry_after = retry_after
+        self.reply = reply
+
+def retry_after(value: Optional[str]) -> Optional[float]:
+    """ the Retry-After header is either in seconds or a http date """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0., when.timestamp() - time.time())
+
+def retryable(error: BaseException, idempotent: bool = True) -> bool:
+    """ a write (not idempotent) is only retried when the server has surely not processed it """
+    if isinstance(error, RetryableError):
+        return True
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code in (RETRY_STATUS if idempotent else SAFE_STATUS)
+    if not idempotent:
+        return not_sent(error)
+    if isinstance(error, urllib.error.URLError):
+        return isinstance(error.reason, ConnectionError)
+    if isinstance(error, ConnectionError):
+        return True
+    return type(error).__name__ == "ConnectionError"  # requests.exceptions.ConnectionError
+
+def not_sent(error: BaseException) -> bool:
+    """ a failure while connecting, before the request was sent """
+    for nesting in range(5):
+        if isinstance(error, (ConnectionRefusedError, socket.gaierror)):
+            return True
+        if type(error).__name__ in ["ConnectTimeout", "ConnectTimeoutError", "NewConnectionError", "NameResolutionError"]:
+            return True  # requests.exceptions and urllib3.exceptions
+        reason = getattr(error, "reason", None)
+        if isinstance(reason, BaseException):
+            error = reason
+        elif error.args and isinstance(error.args[0], BaseException):
+            error = error.args[0]
+        else:
+            break
+    return False
+
+def suggested_delay(error: BaseException) -> Optional[float]:
+    if isinstance(error, RetryableError):
+        return error.retry_after
+    if isinstance(error, urllib.error.HTTPError) and error.headers:
+        return retry_after(error.headers.get("Retry-After"))
+    return None
+
+class Governor:
+    def __init__(self, name: str = "", rate: Optional[float] = None, burst: Optional[int] = None) -> None:
+        self.name = name
+        self.rate = RATE if rate is None else rate
+        self.burst = BURST if burst is None else burst
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.failures = 0
+        self.opened = 0.  # monotonic time when the circuit was opened (0 = closed)
+        self.trial = False  # a call is testing the half-open circuit
+        self.lock = threading.Lock()
+    def reserve(self) -> float:
+        """ take a token from the bucket - returns the seconds to wait before sending """
+        with self.lock:
+            now = time.monotonic()
+            if self.opened:
+                if now - self.opened < COOLDOWN or self.trial:
+                    raise CircuitOpenError(F"circuit open for {self.name} after {self.failures} failures")
+                self.trial = True
+            if not self.rate:
+                return 0.
+            self.tokens = min(float(self.burst), self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.
+            return -self.tokens / self.rate
+    def success(self) -> None:
+        with self.lock:
+            if self.opened:
+                logg.info("circuit closed for %s", self.name)
+            self.failures = 0
+            self.opened = 0.
+            self.trial = False
+    def failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            self.trial = False
+            if self.opened or self.failures >= FAILURES:
+                if not self.opened:
+                    logg.error("circuit open for %s after %s failures", self.name, self.failures)
+                self.opened = time.monotonic()
+    def delay(self, attempt: int, suggested: Optional[float] = None) -> float:
+        """ exponential backoff with full jitter - or the delay asked for by the server """
+        if suggested is not None:
+            return min(MAXDELAY, suggested)
+        return random.uniform(0, min(MAXDELAY, BACKOFF * (2 ** attempt)))
+    def call(self, func: Callable[[], T], idempotent: bool = True) -> T:
+        for attempt in range(RETRIES + 1):
+            wait = self.reserve()
+            if wait:
+                time.sleep(wait)
+            try:
+                result = func()
+            except Exception as e:
+                if not retryable(e):
+                    self.success()  # the server did answer
+                    raise
+                self.failure()
+                if not retryable(e, idempotent) or attempt >= RETRIES or self.opened:
+                    raise
+                delay = self.delay(attempt, suggested_delay(e))
+                logg.warning("retry %s in %.1fs after %s", self.name, delay, e)
+                time.sleep(delay)
+                continue
+            self.success()
+            return result
+        raise CircuitOpenError(F"no call to {self.name}")  # not reached
+    async def acall(self, func: Callable[[], Awaitable[T]], idempotent: bool = True) -> T:
+        for attempt in range(RETRIES + 1):
+            wait = self.reserve()
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                result = await func()
+            except Exception as e:
+                if not retryable(e):
+                    self.success()
+                    raise
+                self.failure()
+                if not retryable(e, idempotent) or attempt >= RETRIES or self.opened:
+                    raise
+                delay = self.delay(attempt, suggested_delay(e))
+                logg.warning("retry %s in %.1fs after %s", self.name, delay, e)
+                await asyncio.sleep(delay)
+                continue
+            self.success()
+            return result
+        raise CircuitOpenError(F"no call to {self.name}")  # not reached
+    def response(self, func: Callable[[], R], idempotent: bool = True) -> R:
+        """ for calls that return a response with a status_code instead of raising an exception.
+            The last response is returned when the retries are exhausted. """
+        def checked() -> R:
+            reply = func()
+            status = getattr(reply, "status_code", 200)
+            if status in (RETRY_STATUS if idempotent else SAFE_STATUS):
+                raise RetryableError(F"HTTP {status}", retry_after(getattr(reply, "headers", {}).get("Retry-After")), reply)
+            return reply
+        try:
+            return self.call(checked, idempotent)
+        except RetryableError as e:
+            return cast(R, e.reply)
+
+_governors: Dict[str, Governor] = {}
+_governors_lock = threading.Lock()
+
+def governor(url: str) -> Governor:
+    """ the shared Governor for the server of the url """
+    parts = urllib.parse.urlsplit(url)
+    name = F"{parts.scheme}://{parts.netloc}"
+    with _governors_lock:
+        if name not in _governors:
+            _governors[name] = Governor(name)
+        return _governors[name]
+
+def reset() -> None:
+    with _governors_lock:
+        _governors.clear()
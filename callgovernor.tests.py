@@ -0,0 +1,206 @@
+#! /usr/bin/env python3
+
+__copyright__ = "(C) 2022-2025 Guido Draheim, licensed under the Apache License 2.0"""
+__version__ = "0.1.4023"
+
+from typing import List, Dict, Optional, Any
+
+import os
+import sys
+import time
+import asyncio
+import unittest
+import urllib.error
+import email.message
+import email.utils
+from fnmatch import fnmatchcase as fnmatch
+
+import callgovernor
+from callgovernor import Governor, CircuitOpenError, RetryableError
+
+import logging
+logg = logging.getLogger("TEST")
+
+class Reply:
+    def __init__(self, status_code: int, headers: Optional[Dict[str, str]] = None) -> None:
+        self.status_code = status_code
+        self.headers = headers or {}
+
+class Failing:
+    def __init__(self, errors: List[Exception]) -> None:
+        self.errors = errors
+        self.calls = 0
+    def __call__(self) -> str:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "OK"
+
+def http_error(code: int, retry_after: str = "") -> urllib.error.HTTPError:
+    headers = email.message.Message()
+    if retry_after:
+        headers["Retry-After"] = retry_after
+    return urllib.error.HTTPError("http://odoo.host/jsonrpc", code, "failed", headers, None)
+
+class callgovernorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.saved = (callgovernor.RETRIES, callgovernor.BACKOFF, callgovernor.FAILURES, callgovernor.COOLDOWN)
+        callgovernor.BACKOFF = 0.01
+        callgovernor.reset()
+    def tearDown(self) -> None:
+        callgovernor.RETRIES, callgovernor.BACKOFF, callgovernor.FAILURES, callgovernor.COOLDOWN = self.saved
+        callgovernor.reset()
+    def test_101(self) -> None:
+        func = Failing([ConnectionResetError(), http_error(503), http_error(429)])
+        self.assertEqual(Governor("test").call(func), "OK")
+        self.assertEqual(func.calls, 4)
+    def test_102(self) -> None:
+        func = Failing([http_error(500), http_error(503)])
+        with self.assertRaises(urllib.error.HTTPError):
+            Governor("test").call(func)
+        self.assertEqual(func.calls, 1)
+    def test_103(self) -> None:
+        callgovernor.RETRIES = 2
+        func = Failing([http_error(502)] * 5)
+        with self.assertRaises(urllib.error.HTTPError):
+            Governor("test").call(func)
+        self.assertEqual(func.calls, 3)
+    def test_104(self) -> None:
+        gov = Governor("test")
+        for attempt in range(8):
+            self.assertLessEqual(gov.delay(attempt), callgovernor.BACKOFF * 2 ** attempt)
+        self.assertEqual(gov.delay(3, 2.0), 2.0)
+        self.assertEqual(gov.delay(3, 1000.), callgovernor.MAXDELAY)
+    def test_105(self) -> None:
+        self.assertEqual(callgovernor.retry_after("7"), 7.0)
+        self.assertEqual(callgovernor.retry_after(""), None)
+        self.assertEqual(callgovernor.retry_after("soon"), None)
+        later = email.utils.formatdate(time.time() + 20, usegmt=True)
+        self.assertAlmostEqual(callgovernor.retry_after(later) or 0, 20, delta=2)
+        past = email.utils.formatdate(time.time() - 20, usegmt=True)
+        self.assertEqual(callgovernor.retry_after(past), 0.)
+    def test_106(self) -> None:
+        func = Failing([http_error(429, "0")])
+        started = time.monotonic()
+        self.assertEqual(Governor("test").call(func), "OK")
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(func.calls, 2)
+    def test_107(self) -> None:
+        func = Failing([http_error(503, "0"), ConnectionRefusedError(), http_error(429, "0")])
+        self.assertEqual(Governor("test").call(func, idempotent=False), "OK")
+        self.assertEqual(func.calls, 4)
+        for error in [http_error(502), http_error(504), ConnectionResetError(), urllib.error.URLError(ConnectionResetError())]:
+            func = Failing([error])
+            with self.assertRaises(type(error)):
+                Governor("test").call(func, idempotent=False)
+            self.assertEqual(func.calls, 1)
+        func = Failing([urllib.error.URLError(ConnectionRefusedError())])
+        self.assertEqual(Governor("test").call(func, idempotent=False), "OK")
+    def test_201(self) -> None:
+        replies = [Reply(503, {"Retry-After": "0"}), Reply(429), Reply(200)]
+        self.assertEqual(Governor("test").response(lambda: replies.pop(0)).status_code, 200)
+        self.assertEqual(replies, [])
+    def test_202(self) -> None:
+        callgovernor.RETRIES = 1
+        replies = [Reply(503), Reply(503), Reply(200)]
+        self.assertEqual(Governor("test").response(lambda: replies.pop(0)).status_code, 503)
+        self.assertEqual(len(replies), 1)
+    def test_203(self) -> None:
+        replies = [Reply(404), Reply(200)]
+        self.assertEqual(Governor("test").response(lambda: replies.pop(0)).status_code, 404)
+    def test_204(self) -> None:
+        replies = [Reply(503, {"Retry-After": "0"}), Reply(502), Reply(200)]
+        self.assertEqual(Governor("test").response(lambda: replies.pop(0), idempotent=False).status_code, 502)
+        self.assertEqual(len(replies), 1)
+    def test_301(self) -> None:
+        gov = Governor("test", rate=50, burst=5)
+        started = time.monotonic()
+        for attempt in range(15):
+            gov.call(lambda: "OK")
+        elapsed = time.monotonic() - started
+        logg.info("elapsed %.3fs", elapsed)
+        self.assertGreater(elapsed, 10 / 50 - 0.02)
+        self.assertLess(elapsed, 10 / 50 + 0.2)
+    def test_302(self) -> None:
+        gov = Governor("test")
+        started = time.monotonic()
+        for attempt in range(100):
+            gov.call(lambda: "OK")
+        self.assertLess(time.monotonic() - started, 0.1)
+    def test_401(self) -> None:
+        callgovernor.FAILURES = 3
+        callgovernor.COOLDOWN = 0.2
+        gov = Governor("test")
+        func = Failing([ConnectionRefusedError()] * 10)
+        with self.assertRaises(ConnectionRefusedError):
+            gov.call(func)
+        self.assertEqual(func.calls, 3)
+        with self.assertRaises(CircuitOpenError):
+            gov.call(func)
+        self.assertEqual(func.calls, 3)
+        time.sleep(0.25)
+        with self.assertRaises(ConnectionRefusedError):
+            gov.call(func)  # the trial call fails
+        self.assertEqual(func.calls, 4)
+        with self.assertRaises(CircuitOpenError):
+            gov.call(func)
+        func.errors = []
+        time.sleep(0.25)
+        self.assertEqual(gov.call(func), "OK")
+        self.assertEqual(gov.call(func), "OK")
+        self.assertEqual(gov.failures, 0)
+        self.assertEqual(func.calls, 6)
+    def test_402(self) -> None:
+        self.assertIs(callgovernor.governor("http://odoo.host/jsonrpc"), callgovernor.governor("http://odoo.host/web/session"))
+        self.assertIsNot(callgovernor.governor("http://odoo.host/jsonrpc"), callgovernor.governor("https://odoo.host/jsonrpc"))
+    def test_501(self) -> None:
+        errors: List[Exception] = [RetryableError("HTTP 503", 0.), ConnectionResetError()]
+        async def func() -> str:
+            if errors:
+                raise errors.pop(0)
+            return "OK"
+        self.assertEqual(asyncio.run(Governor("test").acall(func)), "OK")
+        self.assertEqual(errors, [])
+
+if __name__ == "__main__":
+    from optparse import OptionParser
+    cmdline = OptionParser("%prog [-options] [test_xxx]")
+    cmdline.add_option("-v", "--verbose", action="count", default=0, help="more verbose logging")
+    cmdline.add_option("-^", "--quiet", action="count", default=0, help="less verbose logging")
+    cmdline.add_option("--failfast", action="store_true", default=False,
+                       help="Stop the test run on the first error or failure. [%default]")
+    cmdline.add_option("--xmlresults", metavar="FILE", default=None,
+                       help="capture results as a junit xml file [%default]")
+    opt, args = cmdline.parse_args()
+    logging.basicConfig(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
+    if not args:
+        args = ["test_*"]
+    suite = unittest.TestSuite()
+    for arg in args:
+        if len(arg) > 2 and arg[0].isalpha() and arg[1] == "_":
+            arg = "test_" + arg[2:]
+        for classname in sorted(globals()):
+            if not classname.endswith("Test"):
+                continue
+            testclass = globals()[classname]
+            for method in sorted(dir(testclass)):
+                if "*" not in arg: arg += "*"
+                if arg.startswith("_"): arg = arg[1:]
+                if fnmatch(method, arg):
+                    suite.addTest(testclass(method))
+    # running
+    xmlresults = None
+    if opt.xmlresults:
+        if os.path.exists(opt.xmlresults):
+            os.remove(opt.xmlresults)
+        xmlresults = open(opt.xmlresults, "wb")
+        logg.info("xml results into %s", opt.xmlresults)
+    if xmlresults:
+        import xmlrunner  # type: ignore[import]
+        Runner = xmlrunner.XMLTestRunner
+        result = Runner(xmlresults).run(suite)
+    else:
+        Runner = unittest.TextTestRunner
+        result = Runner(verbosity=opt.verbose, failfast=opt.failfast).run(suite)
+    if not result.wasSuccessful():
+        sys.exit(1)
@@ -16,12 +16,15 @@ import os
 import re
 import sys
 import datetime
+import callgovernor
+import jira2data_api
+from concurrent.futures import ThreadPoolExecutor
 from odootopic import OdooValues, OdooValuesForTopic
 from urllib.parse import quote_plus as qq
 from timerange import get_date, is_dayrange, dayrange, last_sunday, next_sunday
 from tabtotext import tabtoJSON, print_tabtotext, JSONDict, JSONList, JSONItem, viewFMT, setNoRight, tabWithDateHour
 
-from jira2data_api import JiraFrontend, jiraGetWorklog, setJiraUser, setJiraURL
+from jira2data_api import JiraFrontend, jiraGetWorklog, each_jiraGetWorklogs, setJiraUser, setJiraURL
 
 logg = logging.getLogger("JIRA2DATA")
 DONE = (logging.WARNING + logging.ERROR) // 2
@@ -34,6 +37,12 @@ DAYS = dayrange()
 
 MAXROUNDS = 1000
 LIMIT = 1000
+SEARCH_THREADS = 4  # parallel requests for the pages of a jira search
+SEARCH_FIELDS = ["project", "summary", "updated", "issuetype"]
+ACTIVITY_FIELDS = ["summary", "issuetype", "comment", "worklog"]
+ACTIVITY_SKIPFIELDS = ["self", "author", "updateAuthor", "body", "items"]
+CHANGELOG_LIMIT = 100  # histories per page
+_changelogs: Dict[str, bool] = {}  # per jira server - False when it has no /changelog resource
 
 PROJECTS: List[str] = []
 PROJECTDEFAULT = "ASO"
@@ -93,49 +102,7 @@ def jiraGetProjectsIssuesInDays(api: JiraFrontend, projects: List[str], days: Op
     jql = f"""project in ({projectlist})"""
     if days:
         jql += f""" and 'updated' > {days.daysafter}d and 'updated' <= {days.daysbefore}d """
-    req = "/rest/api/2/search"
-    url = api.jira() + req
-    http = api.session(api.jira())
-    headers = {"Content-Type": "application/json"}
-    result = []
-    totals = 0
-    starts = 0
-    for attempt in range(MAXROUNDS):
-        post = {
-            "jql": jql,
-            "startAt": starts,
-            "maxResults": LIMIT,
-        }
-        r = http.post(url, headers=headers, verify=api.verify, json=post)
-        if api.error(r):
-            logg.error("%s => %s\n  query was %s", req, r.text, post)
-            logg.warning("    %s", api.pwinfo())
-            raise HTTPError(r)
-        else:
-            logg.debug("%s => %s", req, r.text)
-            data: JSONDict = json.loads(r.text)
-            logg.info("%s => %s", jql, data.keys())
-            if "total" in data:
-                totals = cast(int, data["total"])
-            if "issues" not in data or not data["issues"]:
-                break
-            issues = cast(JSONList, data["issues"])
-            logg.info("%s => %i issues (starts %i)", jql, len(issues), starts)
-            for item in issues:
-                # logg.info(" ..\n\n%s", item)
-                if False:
-                    logg.debug(" ..%s", [name for name in sorted(item["fields"].keys())
-                                         if not name.startswith("customfield")])  # type: ignore[union-attr]
-                issuetype = item["fields"].get("issuetype", {}).get("name", "")  # type: ignore[union-attr,index]
-                res = {"issueId": item["id"], "issue": item["key"], "proj": item["fields"]["project"]["key"], "summary": item["fields"]["summary"],  # type: ignore[union-attr,index,call-overload]
-                       "last_updated": get_date(cast(str, item["fields"]["updated"])), "issuetype": issuetype}  # type: ignore[union-attr,index,call-overload]
-                result.append(res)
-            if totals and totals == len(issues):
-                break
-            starts += LIMIT
-    logg.info("have %s issues, but return %s issues", totals, len(result))
-    return result
-
+    return [jiraIssueInfo(item) for item in each_jiraSearchIssues(api, jql)]
 
 def jiraGetUserIssuesInDays(api: JiraFrontend, user: str = NIX, days: Optional[dayrange] = None) -> JSONList:
     days = days or DAYS
@@ -144,123 +111,129 @@ def jiraGetUserIssuesInDays(api: JiraFrontend, user: str = NIX, days: Optional[d
     if days:
         jql += f""" and 'updated' > {days.daysafter}d and 'updated' <= {days.daysbefore}d """
     logg.warning("jql = %s", jql)
+    return [jiraIssueInfo(item) for item in each_jiraSearchIssues(api, jql)]
+
+def jiraIssueInfo(item: JSONDict) -> JSONDict:
+    fields = cast(JSONDict, item["fields"])
+    issuetype = cast(JSONDict, fields.get("issuetype") or {}).get("name", "")
+    return {"issueId": item["id"], "issue": item["key"], "proj": cast(JSONDict, fields["project"])["key"], "summary": fields["summary"],
+            "last_updated": get_date(cast(str, fields["updated"])), "issuetype": issuetype}
+
+def jiraSearchIssues(api: JiraFrontend, jql: str, fields: Optional[List[str]] = None) -> JSONList:
+    return list(each_jiraSearchIssues(api, jql, fields))
+def each_jiraSearchIssues(api: JiraFrontend, jql: str, fields: Optional[List[str]] = None) -> Iterator[JSONDict]:
+    """ the first page tells the total - the other pages are fetched in parallel (SEARCH_THREADS) """
+    fields = fields or SEARCH_FIELDS
+    data = jiraSearchPage(api, jql, 0, fields)
+    issues = cast(JSONList, data.get("issues") or [])
+    totals = cast(int, data.get("total", len(issues)))
+    logg.info("%s => %i issues of %i", jql, len(issues), totals)
+    yield from issues
+    if not issues or len(issues) >= totals:
+        return
+    starts = list(range(len(issues), totals, len(issues)))[:MAXROUNDS - 1]
+    if SEARCH_THREADS <= 1 or len(starts) <= 1:
+        pages = map(lambda startAt: jiraSearchPage(api, jql, startAt, fields), starts)
+        for page in pages:
+            yield from cast(JSONList, page.get("issues") or [])
+        return
+    with ThreadPoolExecutor(max_workers=min(SEARCH_THREADS, len(starts))) as pool:
+        for page in pool.map(lambda startAt: jiraSearchPage(api, jql, startAt, fields), starts):
+            yield from cast(JSONList, page.get("issues") or [])
+
+def jiraSearchPage(api: JiraFrontend, jql: str, startAt: int = 0, fields: Optional[List[str]] = None) -> JSONDict:
     req = "/rest/api/2/search"
     url = api.jira() + req
     http = api.session(api.jira())
     headers = {"Content-Type": "application/json"}
-    result = []
-    totals = 0
-    starts = 0
-    for attempt in range(MAXROUNDS):
-        post = {
-            "jql": jql,
-            "startAt": starts,
-            "maxResults": LIMIT,
-        }
-        r = http.post(url, headers=headers, verify=api.verify, json=post)
-        if api.error(r):
-            logg.error("%s => %s\n  query was %s", req, r.text, post)
-            logg.warning("    %s", api.pwinfo())
-            raise HTTPError(r)
-        else:
-            logg.debug("%s => %s", req, r.text)
-            data: JSONDict = json.loads(r.text)
-            logg.info("%s => %s", jql, data.keys())
-            if "total" in data:
-                totals = cast(int, data["total"])
-            if "issues" not in data or not data["issues"]:
-                break
-            issues = cast(JSONList, data["issues"])
-            logg.info("%s => %i issues (starts %i)", jql, len(issues), starts)
-            for item in issues:
-                # logg.info(" ..\n\n%s", item)
-                if False:
-                    logg.debug(" ..%s", [name for name in sorted(item["fields"].keys())
-                                         if not name.startswith("customfield")])  # type: ignore[union-attr]
-                issuetype = item["fields"].get("issuetype", {}).get("name", "")  # type: ignore[union-attr,index]
-                res = {"issueId": item["id"], "issue": item["key"], "proj": item["fields"]["project"]["key"], "summary": item["fields"]["summary"],  # type: ignore[union-attr,index,call-overload]
-                       "last_updated": get_date(cast(str, item["fields"]["updated"])), "issuetype": issuetype}  # type: ignore[union-attr,index,call-overload]
-                result.append(res)
-            if totals and totals == len(issues):
-                break
-            starts += LIMIT
-    logg.info("have %s issues, but return %s issues", totals, len(result))
-    return result
+    post: Dict[str, Any] = {
+        "jql": jql,
+        "startAt": startAt,
+        "maxResults": LIMIT,
+    }
+    if fields:
+        post["fields"] = fields
+    r = http.post(url, headers=headers, verify=api.verify, json=post)
+    if api.error(r):
+        logg.error("%s => %s\n  query was %s", req, r.text, post)
+        logg.warning("    %s", api.pwinfo())
+        raise HTTPError(r)
+    logg.debug("%s => %s", req, r.text)
+    data: JSONDict = json.loads(r.text)
+    logg.debug("%s => %i issues (starts %i)", jql, len(cast(JSONList, data.get("issues") or [])), startAt)
+    return data
 
 def jiraGetIssueActivity(api: JiraFrontend, issue: str) -> JSONList:
     return list(each_jiraGetIssueActivity(api, issue))
 def each_jiraGetIssueActivity(api: JiraFrontend, issue: str) -> Iterator[JSONDict]:
-    skipfields = ["self", "author", "updateAuthor", "body"]
-    # req = f"/rest/api/2/issue/{issue}?expand=changelog&fields=summary"
-    req = f"/rest/api/2/issue/{issue}?expand=changelog"
+    """ the histories, comments and worklogs of the issue - the changelog is paged, and only
+        the ACTIVITY_FIELDS of the issue are requested. A jira server without the /changelog
+        resource gets them with one (unpaged) ?expand=changelog request. """
+    fields = ",".join(ACTIVITY_FIELDS)
+    histories = jiraGetIssueChangelog(api, issue)
+    if histories is None:
+        data = jiraGetIssueData(api, f"/rest/api/2/issue/{issue}?expand=changelog&fields={fields}")
+        histories = cast(JSONList, cast(JSONDict, data["changelog"])["histories"])
+        _changelogs[api.jira()] = False  # the issue exists, so the 404 was for the resource
+    else:
+        data = jiraGetIssueData(api, f"/rest/api/2/issue/{issue}?fields={fields}")
+    issuefields = cast(JSONDict, data["fields"])
+    issuetype = cast(JSONDict, issuefields.get("issuetype") or {}).get("name", "")
+    for item in histories:
+        res = jiraActivity(item, issue, issuetype, "history")
+        for change in cast(JSONList, item["items"]):
+            res["change.field"] = change.get("field")
+            res["change.fromString"] = change.get("fromString")
+            res["change.toString"] = change.get("toString")
+        yield res
+    for item in cast(JSONList, cast(JSONDict, issuefields["comment"])["comments"]):
+        yield jiraActivity(item, issue, issuetype, "comment")
+    for item in cast(JSONList, cast(JSONDict, issuefields["worklog"])["worklogs"]):
+        yield jiraActivity(item, issue, issuetype, "worklog")
+
+def jiraActivity(item: JSONDict, issue: str, issuetype: JSONItem, itemtype: str) -> JSONDict:
+    res = dict((name, value) for name, value in item.items() if name not in ACTIVITY_SKIPFIELDS)
+    res["issue"] = issue
+    res["issuetype"] = issuetype
+    res["itemAuthor"] = cast(JSONDict, item.get("author") or {}).get("name", "")
+    res["type"] = itemtype
+    return res
+
+def jiraGetIssueChangelog(api: JiraFrontend, issue: str) -> Optional[JSONList]:
+    """ the histories of the issue page by page (CHANGELOG_LIMIT) - or None when
+        the jira server has no /changelog resource (not asked again after that) """
+    if not _changelogs.get(api.jira(), True):
+        return None
+    histories: JSONList = []
+    starts = 0
+    for attempt in range(MAXROUNDS):
+        req = f"/rest/api/2/issue/{issue}/changelog?startAt={starts}&maxResults={CHANGELOG_LIMIT}"
+        data = jiraGetIssueData(api, req, missing=(attempt == 0))
+        if not data:
+            logg.debug("%s not available, using the expand=changelog", req)
+            return None
+        values = cast(JSONList, data.get("values") or [])
+        histories += values
+        starts += len(values)
+        if data.get("isLast", True) or not values or starts >= cast(int, data.get("total", starts)):
+            break
+    return histories
+
+def jiraGetIssueData(api: JiraFrontend, req: str, missing: bool = False) -> JSONDict:
+    """ get the json of the request - or an empty dict on a 404 if the resource may be 'missing' """
     url = api.jira() + req
     http = api.session(api.jira())
     headers = {"Content-Type": "application/json"}
     r = http.get(url, headers=headers, verify=api.verify)
+    if missing and r.status_code == 404:
+        return {}
     if api.error(r):
         logg.error("%s => %s\n", req, r.text)
         logg.warning("    %s", api.pwinfo())
         raise HTTPError(r)
-    else:
-        logg.debug("%s => %s", req, r.text)
-        data = json.loads(r.text)
-        # ['aggregateprogress', 'aggregatetimeestimate', 'aggregatetimeoriginalestimate', 'aggregatetimespent', 'assignee', 'components',
-        # 'created', 'creator', 'description', 'duedate', 'environment', 'issuelinks', 'issuetype', 'labels', 'lastViewed', 'priority',
-        # 'progress', 'project', 'reporter', 'resolution', 'resolutiondate', 'status', 'subtasks', 'summary',
-        # 'timeestimate', 'timeoriginalestimate', 'timespent', 'updated', 'votes', 'watches', 'workratio']
-        if False:
-            logg.info("%s => %s", req, [name for name in data.keys() if "customfield" not in name])
-            logg.info("%s fields -> %s", req, [name for name in data["fields"].keys() if "customfield" not in name])
-            logg.info("%s fields comment -> %s", req, [name for name in data["fields"]
-                                                       ["comment"].keys() if "customfield" not in name])
-            logg.info("%s fields worklog -> %s", req, [name for name in data["fields"]
-                                                       ["worklog"].keys() if "customfield" not in name])
-            logg.info("%s changelog -> %s", req, [name for name in data["changelog"].keys() if "customfield" not in name])
-        issuetype = data["fields"].get("issuetype", {}).get("name", "")
-        for item in data["changelog"]["histories"]:
-            # logg.info(" ..\n\n%s", item)
-            # res = {"id": item["id"], "key": item["key"], "proj": item["fields"]["project"]["key"], "summary": item["fields"]["summary"], "type": issuetype}
-            itemAuthor = item.get("author", {}).get("name", "")
-            res = item.copy()
-            res["issue"] = issue
-            res["issuetype"] = issuetype
-            res["itemAuthor"] = itemAuthor
-            res["type"] = "history"
-            for field in skipfields:
-                if field in res:
-                    del res[field]
-            for item in item["items"]:
-                res["change.field"] = item.get("field")
-                res["change.fromString"] = item.get("fromString")
-                res["change.toString"] = item.get("toString")
-            del res["items"]
-            yield res
-        for item in data["fields"]["comment"]["comments"]:
-            # logg.info(" ..\n\n%s", item)
-            # res = {"id": item["id"], "key": item["key"], "proj": item["fields"]["project"]["key"], "summary": item["fields"]["summary"], "type": issuetype}
-            itemAuthor = item.get("author", {}).get("name", "")
-            res = item.copy()
-            res["issue"] = issue
-            res["issuetype"] = issuetype
-            res["itemAuthor"] = itemAuthor
-            res["type"] = "comment"
-            for field in skipfields:
-                if field in res:
-                    del res[field]
-            yield res
-        for item in data["fields"]["worklog"]["worklogs"]:
-            # logg.info(" ..\n\n%s", item)
-            # res = {"id": item["id"], "key": item["key"], "proj": item["fields"]["project"]["key"], "summary": item["fields"]["summary"], "type": issuetype}
-            itemAuthor = item.get("author", {}).get("name", "")
-            res = item.copy()
-            res["issue"] = issue
-            res["issuetype"] = issuetype
-            res["itemAuthor"] = itemAuthor
-            res["type"] = "worklog"
-            for field in skipfields:
-                if field in res:
-                    del res[field]
-            yield res
+    logg.debug("%s => %s", req, r.text)
+    data: JSONDict = json.loads(r.text)
+    return data
 
 def only_shorterActivity(data: Iterable[JSONDict]) -> Iterator[JSONDict]:
     for item in data:
@@ -293,10 +266,10 @@ def jiraOdooData(api: JiraFrontend, user: str = NIX, days: Optional[dayrange] =
 def each_jiraOdooData(api: JiraFrontend, user: str = NIX, days: Optional[dayrange] = None) -> Iterator[JSONDict]:
     days = days or DAYS
     later = dayrange(days.after)
-    for ticket in jiraGetUserIssuesInDays(api, user, later):
-        user = user or api.user()
-        issue = cast(str, ticket["issue"])
-        for record in jiraGetWorklog(api, issue):
+    tickets = [cast(str, ticket["issue"]) for ticket in jiraGetUserIssuesInDays(api, user, later)]
+    user = user or api.user()
+    for issue, worklogs in each_jiraGetWorklogs(api, tickets, ordered=True, since=days.after):
+        for record in worklogs:
             if user:
                 author = cast(str, record["authorname"])
                 if user != author:
@@ -367,10 +340,10 @@ def each_jiraZeitData(api: JiraFrontend, user: str = NIX, days: Optional[dayrang
     data: Dict[Tuple[str, str], List[str]] = {}
     mapping: Dict[str, Dict[str, Optional[OdooValues]]] = {}
     weekstart = None
-    for ticket in jiraGetUserIssuesInDays(api, user, later):
-        user = user or api.user()
-        issue = cast(str, ticket["issue"])
-        for record in jiraGetWorklog(api, issue):
+    tickets = [cast(str, ticket["issue"]) for ticket in jiraGetUserIssuesInDays(api, user, later)]
+    user = user or api.user()
+    for issue, worklogs in each_jiraGetWorklogs(api, tickets, ordered=True, since=days.after):
+        for record in worklogs:
             if user:
                 author = cast(str, record["authorname"])
                 if user != author:
@@ -525,11 +498,17 @@ if __name__ == "__main__":
                        help="present short lines for description [%default]")
     cmdline.add_option("-U", "--user", metavar="NAME", default=NIX,
                        help="filter for user [%default]")
+    cmdline.add_option("--since-updated", action="store_true", default=jira2data_api.WORKLOG_UPDATED,
+                       help="fetch only the worklogs updated since the start day [%default]")
+    cmdline.add_option("--maxrate", metavar="RPS", type="float", default=callgovernor.RATE,
+                       help="requests per second to the server (0=no cap) [%default]")
     opt, args = cmdline.parse_args()
     logging.basicConfig(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
     warnings.simplefilter("once", InsecureRequestWarning)
     SHORTDESC = opt.shortdesc
     DRYRUN = opt.dryrun
+    callgovernor.RATE = opt.maxrate
+    jira2data_api.WORKLOG_UPDATED = opt.since_updated
     DAYS = dayrange(opt.after, opt.before)
     PROJECTS = opt.project
     LABELS = opt.labels
@@ -0,0 +1,397 @@
+#! /usr/bin/env python3
+
+__copyright__ = "(C) 2022-2025 Guido Draheim, licensed under the Apache License 2.0"""
+__version__ = "0.4.4023"
+
+import jira2data
+import jira2data_api
+import dotnetrc
+from typing import Optional, Any, List, Dict, Tuple, cast
+from tabtotext import JSONList, JSONDict
+from timerange import dayrange
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import threading
+import datetime
+import json
+import time
+
+import os
+import sys
+import unittest
+from fnmatch import fnmatchcase as fnmatch
+
+import logging
+logg = logging.getLogger("TEST")
+
+Day = datetime.date
+
+STANDIN_USER = "max"
+STANDIN_PASS = "secret"
+
+class JiraStandinDB:
+    """ an in-memory jira answering the rest calls of jira2data """
+    def __init__(self) -> None:
+        self.issues: List[JSONDict] = []
+        self.maxresults = 1000  # the server caps the page size
+        self.requests: List[Tuple[str, str]] = []  # (method, path)
+        self.bodies: List[JSONDict] = []
+        self.worklogs: Dict[str, JSONList] = {}
+        self.delay = 0.  # seconds for each worklog request
+        self.updatedpage = 1000  # values per /worklog/updated page
+        self.histories: Dict[str, JSONList] = {}
+        self.comments: Dict[str, JSONList] = {}
+        self.changelogs = True  # the server has the paged /changelog resource
+        self.lock = threading.Lock()
+    def add_issue(self, key: str, summary: str = "", updated: str = "2022-01-03T12:00:00.000+0000") -> JSONDict:
+        issue: JSONDict = {"id": str(10000 + len(self.issues)), "key": key, "self": "http://jira.host/" + key,
+                           "fields": {"project": {"key": key.split("-")[0]}, "summary": summary or key, "updated": updated,
+                                      "issuetype": {"name": "Task"}, "description": "x" * 100}}
+        self.issues.append(issue)
+        return issue
+    def issue(self, key: str) -> Optional[JSONDict]:
+        for issue in self.issues:
+            if issue["key"] == key:
+                return issue
+        return None
+    def add_worklog(self, key: str, started: str, hours: float, comment: str, author: str = STANDIN_USER, updated: str = "") -> JSONDict:
+        if key not in self.worklogs:
+            self.worklogs[key] = []
+        issue = self.issue(key) or self.add_issue(key)
+        worklog: JSONDict = {"id": str(20000 + sum(len(logs) for logs in self.worklogs.values())), "self": "http://jira.host/worklog",
+                             "author": {"name": author}, "updateAuthor": {"name": author}, "comment": comment, "issueId": issue["id"],
+                             "created": started, "updated": updated or started, "started": started, "timeSpentSeconds": int(hours * 3600)}
+        self.worklogs[key].append(worklog)
+        return worklog
+    def add_history(self, key: str, created: str, field: str, toString: str, author: str = STANDIN_USER) -> None:
+        if key not in self.histories:
+            self.histories[key] = []
+        self.histories[key].append({"id": str(30000 + len(self.histories[key])), "author": {"name": author}, "created": created,
+                                    "items": [{"field": field, "fromString": "old", "toString": toString}]})
+    def add_comment(self, key: str, created: str, body: str, author: str = STANDIN_USER) -> None:
+        if key not in self.comments:
+            self.comments[key] = []
+        self.comments[key].append({"id": str(40000 + len(self.comments[key])), "self": "http://jira.host/comment",
+                                   "author": {"name": author}, "updateAuthor": {"name": author}, "body": body, "created": created})
+    def issue_data(self, key: str, query: Dict[str, List[str]]) -> Optional[JSONDict]:
+        issue = self.issue(key)
+        if not issue:
+            return None
+        fields = dict(cast(JSONDict, issue["fields"]), comment={"comments": self.comments.get(key, [])},
+                      worklog={"worklogs": self.worklogs.get(key, [])})
+        if "fields" in query:
+            wanted = query["fields"][0].split(",")
+            fields = dict((name, value) for name, value in fields.items() if name in wanted)
+        data: JSONDict = {"id": issue["id"], "key": key, "fields": fields}
+        if query.get("expand") == ["changelog"]:
+            histories = self.histories.get(key, [])
+            data["changelog"] = {"startAt": 0, "maxResults": len(histories), "total": len(histories), "histories": histories}
+        return data
+    def changelog(self, key: str, query: Dict[str, List[str]]) -> JSONDict:
+        histories = self.histories.get(key, [])
+        startAt = int(query.get("startAt", ["0"])[0])
+        maxResults = int(query.get("maxResults", ["100"])[0])
+        values = histories[startAt:startAt + maxResults]
+        return {"startAt": startAt, "maxResults": maxResults, "total": len(histories),
+                "isLast": startAt + maxResults >= len(histories), "values": values}
+    def count(self, path: str) -> int:
+        return len([req for req in self.requests if req[1].startswith(path)])
+    def search(self, post: JSONDict) -> JSONDict:
+        startAt = cast(int, post.get("startAt", 0))
+        maxResults = min(self.maxresults, cast(int, post.get("maxResults", 50)))
+        issues = self.issues
+        jql = cast(str, post.get("jql", ""))
+        warnings: List[str] = []
+        if jql.startswith("issuekey in ("):
+            keys = jql[len("issuekey in ("):-1].split(",")
+            issues = [issue for issue in issues if issue["key"] in keys]
+            found_keys = [issue["key"] for issue in issues]
+            warnings = ["An issue with key '%s' does not exist for field 'issuekey'." % key for key in keys if key not in found_keys]
+            if warnings and post.get("validateQuery", "strict") in ["strict", True]:
+                return {"errorMessages": warnings, "status": 400}
+        found = issues[startAt:startAt + maxResults]
+        fields = cast(Optional[List[str]], post.get("fields"))
+        if fields:
+            found = [dict(issue, fields=dict((name, value) for name, value in cast(JSONDict, issue["fields"]).items() if name in fields))
+                     for issue in found]
+        data: JSONDict = {"startAt": startAt, "maxResults": maxResults, "total": len(issues), "issues": found}
+        if warnings:
+            data["warningMessages"] = warnings  # type: ignore[assignment]
+        return data
+    def updated(self, since: int) -> JSONDict:
+        values: JSONList = []
+        for worklogs in self.worklogs.values():
+            for worklog in worklogs:
+                updated = int(datetime.datetime.strptime(cast(str, worklog["updated"]), "%Y-%m-%dT%H:%M:%S.%f%z").timestamp() * 1000)
+                if updated >= since:
+                    values.append({"worklogId": int(cast(str, worklog["id"])), "updatedTime": updated})
+        values.sort(key=lambda value: cast(int, value["updatedTime"]))
+        page = values[:self.updatedpage]
+        until = cast(int, page[-1]["updatedTime"]) + 1 if page else since
+        return {"values": page, "since": since, "until": until, "lastPage": len(values) <= self.updatedpage}
+    def worklog_list(self, ids: List[int]) -> JSONList:
+        return [worklog for worklogs in self.worklogs.values() for worklog in worklogs if int(cast(str, worklog["id"])) in ids]
+
+class JiraStandin(BaseHTTPRequestHandler):
+    db: JiraStandinDB
+    protocol_version = "HTTP/1.1"
+    def reply(self, data: Any, status: int = 200) -> None:
+        text = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(text)))
+        self.end_headers()
+        self.wfile.write(text)
+    def do_GET(self) -> None:
+        path = urlsplit(self.path).path
+        with self.db.lock:
+            self.db.requests.append(("GET", self.path))
+        parts = path.split("/")
+        if path.startswith("/rest/api/2/issue/") and parts[-1] == "worklog":
+            time.sleep(self.db.delay)
+            key = parts[-2]
+            if key not in self.db.worklogs:
+                self.reply({"errorMessages": ["Issue Does Not Exist"]}, 404)
+                return
+            worklogs = self.db.worklogs[key]
+            self.reply({"startAt": 0, "maxResults": len(worklogs), "total": len(worklogs), "worklogs": worklogs})
+            return
+        query = parse_qs(urlsplit(self.path).query)
+        if path.startswith("/rest/api/2/issue/") and parts[-1] == "changelog" and self.db.changelogs:
+            self.reply(self.db.changelog(parts[-2], query))
+            return
+        if path.startswith("/rest/api/2/issue/") and len(parts) == 6:
+            data = self.db.issue_data(parts[-1], query)
+            if data is None:
+                self.reply({"errorMessages": ["Issue Does Not Exist"]}, 404)
+            else:
+                self.reply(data)
+            return
+        if path == "/rest/api/2/worklog/updated":
+            since = int(parse_qs(urlsplit(self.path).query).get("since", ["0"])[0])
+            self.reply(self.db.updated(since))
+            return
+        self.reply({"errorMessages": ["no such path"]}, 404)
+    def do_POST(self) -> None:
+        size = int(self.headers.get("Content-Length", "0"))
+        post = json.loads(self.rfile.read(size).decode("utf-8"))
+        path = urlsplit(self.path).path
+        with self.db.lock:
+            self.db.requests.append(("POST", self.path))
+            self.db.bodies.append(post)
+        if path == "/rest/api/2/search":
+            found = self.db.search(post)
+            self.reply(found, cast(int, found.get("status", 200)))
+            return
+        if path == "/rest/api/2/worklog/list":
+            self.reply(self.db.worklog_list(post["ids"]))
+            return
+        self.reply({"errorMessages": ["no such path"]}, 404)
+    def log_message(self, format: str, *args: Any) -> None:
+        logg.debug("standin: " + format, *args)
+
+class jira2dataTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.saved = (jira2data.LIMIT, jira2data.SEARCH_THREADS, jira2data.CHANGELOG_LIMIT)
+        jira2data._changelogs.clear()
+        self.saved_threads = jira2data_api.WORKLOG_THREADS
+        self.saved_updated = (jira2data_api.WORKLOG_UPDATED, jira2data_api.WORKLOG_LISTSIZE)
+        self.db = JiraStandinDB()
+        handler = type("Handler", (JiraStandin,), {"db": self.db})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = "http://127.0.0.1:%i" % self.server.server_address[1]
+        dotnetrc.set_username_password(STANDIN_USER, STANDIN_PASS)
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        jira2data.LIMIT, jira2data.SEARCH_THREADS, jira2data.CHANGELOG_LIMIT = self.saved
+        jira2data._changelogs.clear()
+        jira2data_api.WORKLOG_THREADS = self.saved_threads
+        jira2data_api.WORKLOG_UPDATED, jira2data_api.WORKLOG_LISTSIZE = self.saved_updated
+    def api(self) -> jira2data_api.JiraFrontend:
+        return jira2data_api.JiraFrontend(self.url)
+    def test_101(self) -> None:
+        self.db.add_issue("SAND-4", "extending frontend")
+        self.db.add_issue("BUGS-5", "analyzed problem")
+        data = jira2data.jiraGetProjectsIssuesInDays(self.api(), ["SAND", "BUGS"], dayrange("2022-01-01", "2022-01-31"))
+        self.assertEqual([item["issue"] for item in data], ["SAND-4", "BUGS-5"])
+        self.assertEqual(data[0]["proj"], "SAND")
+        self.assertEqual(data[0]["summary"], "extending frontend")
+        self.assertEqual(data[0]["issuetype"], "Task")
+        self.assertEqual(data[0]["last_updated"], Day(2022, 1, 3))
+        self.assertEqual(self.db.count("/rest/api/2/search"), 1)
+        self.assertEqual(self.db.bodies[0]["fields"], jira2data.SEARCH_FIELDS)
+        self.assertIn("project in (SAND,BUGS)", cast(str, self.db.bodies[0]["jql"]))
+    def test_102(self) -> None:
+        for num in range(1, 24):
+            self.db.add_issue("SAND-%i" % num)
+        self.db.maxresults = 5
+        data = jira2data.jiraGetUserIssuesInDays(self.api(), "max", dayrange("2022-01-01", "2022-01-31"))
+        self.assertEqual([item["issue"] for item in data], ["SAND-%i" % num for num in range(1, 24)])
+        self.assertEqual(self.db.count("/rest/api/2/search"), 5)
+        self.assertEqual(sorted(cast(int, body["startAt"]) for body in self.db.bodies), [0, 5, 10, 15, 20])
+    def test_103(self) -> None:
+        for num in range(1, 24):
+            self.db.add_issue("SAND-%i" % num)
+        jira2data.LIMIT = 10
+        jira2data.SEARCH_THREADS = 1
+        data = jira2data.jiraSearchIssues(self.api(), "project = SAND", ["summary"])
+        self.assertEqual([item["key"] for item in data], ["SAND-%i" % num for num in range(1, 24)])
+        self.assertEqual(list(cast(JSONDict, data[0]["fields"]).keys()), ["summary"])
+        self.assertEqual(self.db.count("/rest/api/2/search"), 3)
+    def test_104(self) -> None:
+        data = jira2data.jiraSearchIssues(self.api(), "project = NONE")
+        self.assertEqual(data, [])
+        self.assertEqual(self.db.count("/rest/api/2/search"), 1)
+    def test_201(self) -> None:
+        issues = ["SAND-%i" % num for num in range(1, 9)]
+        for issue in issues:
+            self.db.add_worklog(issue, "2022-01-03T12:00:00.000+0000", 1.5, "local %s" % issue)
+        self.db.delay = 0.2
+        api = self.api()
+        started = time.monotonic()
+        done = dict(jira2data_api.each_jiraGetWorklogs(api, issues))
+        elapsed = time.monotonic() - started
+        logg.info("elapsed %.3fs", elapsed)
+        self.assertLess(elapsed, 8 * 0.2 / 2)
+        self.assertEqual(sorted(done), sorted(issues))
+        self.assertEqual(done["SAND-3"][0]["comment"], "local SAND-3")
+        self.assertEqual(done["SAND-3"][0]["authorname"], STANDIN_USER)
+        self.assertNotIn("author", done["SAND-3"][0])
+        ordered = list(jira2data_api.each_jiraGetWorklogs(api, issues, ordered=True))
+        self.assertEqual([issue for issue, worklogs in ordered], issues)
+    def test_202(self) -> None:
+        jira2data_api.WORKLOG_THREADS = 1
+        self.db.add_worklog("SAND-1", "2022-01-03T12:00:00.000+0000", 1.5, "local started")
+        done = list(jira2data_api.each_jiraGetWorklogs(self.api(), ["SAND-1", "BUGS-404"]))
+        self.assertEqual([(issue, len(worklogs)) for issue, worklogs in done], [("SAND-1", 1), ("BUGS-404", 0)])
+    def test_203(self) -> None:
+        self.db.add_issue("SAND-4")
+        self.db.add_issue("BUGS-5")
+        self.db.add_worklog("SAND-4", "2022-01-03T12:00:00.000+0000", 1.5, "local extending frontend")
+        self.db.add_worklog("SAND-4", "2022-01-04T12:00:00.000+0000", 1.0, "local someone else", author="erika")
+        self.db.add_worklog("BUGS-5", "2022-01-05T12:00:00.000+0000", 2.0, "local analyzed problem")
+        self.db.add_worklog("BUGS-5", "2022-02-05T12:00:00.000+0000", 2.0, "local too late")
+        data = jira2data.jiraOdooData(self.api(), STANDIN_USER, dayrange("2022-01-01", "2022-01-31"))
+        self.assertEqual([(item["Ticket"], item["Date"], item["Quantity"]) for item in data],
+                         [("SAND-4", Day(2022, 1, 3), 1.5), ("BUGS-5", Day(2022, 1, 5), 2.0)])
+        zeit = jira2data.jiraZeitData(self.api(), STANDIN_USER, dayrange("2022-01-01", "2022-01-31"))
+        lines = [item["# zeit.txt"] for item in zeit]
+        self.assertIn(">> local BUGS-5 SAND-4", lines)
+        self.assertIn("mo 1:30 local extending frontend", lines)
+    def test_204(self) -> None:
+        for num in range(1, 4):
+            self.db.add_worklog("SAND-%i" % num, "2022-01-03T12:00:00.000+0000", 1.5, "local %i" % num)
+        worklogs = jira2data_api.Worklogs(STANDIN_USER, self.url)
+        done = dict(worklogs.timesheets(["SAND-1", "SAND-2", "SAND-3"], Day(2022, 1, 1), Day(2022, 1, 31)))
+        self.assertEqual(sorted(done), ["SAND-1", "SAND-2", "SAND-3"])
+        self.assertEqual(done["SAND-2"][0]["entry_desc"], "local 2")
+        self.assertEqual(done["SAND-2"][0]["entry_size"], 1.5)
+        self.assertEqual(done["SAND-2"], list(worklogs.timesheet("SAND-2", Day(2022, 1, 1), Day(2022, 1, 31))))
+    def test_301(self) -> None:
+        self.db.add_worklog("SAND-4", "2021-12-03T12:00:00.000+0000", 4.0, "local very old")
+        self.db.add_worklog("SAND-4", "2022-01-03T12:00:00.000+0000", 1.5, "local extending frontend")
+        self.db.add_worklog("SAND-4", "2022-01-04T12:00:00.000+0000", 1.0, "local someone else", author="erika")
+        self.db.add_worklog("BUGS-5", "2022-01-05T12:00:00.000+0000", 2.0, "local analyzed problem")
+        self.db.add_worklog("BUGS-5", "2022-01-06T12:00:00.000+0000", 1.0, "local fixed problem")
+        self.db.add_worklog("OTHER-6", "2022-01-05T12:00:00.000+0000", 8.0, "local not asked for")
+        self.db.updatedpage = 2
+        jira2data_api.WORKLOG_LISTSIZE = 3
+        jira2data_api.WORKLOG_UPDATED = True
+        worklogs = jira2data_api.Worklogs(STANDIN_USER, self.url)
+        done = list(worklogs.timesheets(["SAND-4", "BUGS-5"], Day(2022, 1, 1), Day(2022, 1, 31)))
+        self.assertEqual([(issue, [item["entry_desc"] for item in items]) for issue, items in done],
+                         [("SAND-4", ["local extending frontend"]), ("BUGS-5", ["local analyzed problem", "local fixed problem"])])
+        self.assertEqual(self.db.count("/rest/api/2/issue/"), 0)
+        self.assertEqual(self.db.count("/rest/api/2/worklog/updated"), 3)
+        self.assertEqual(self.db.count("/rest/api/2/worklog/list"), 2)
+        jira2data_api.WORKLOG_UPDATED = False
+        self.assertEqual(done, list(worklogs.timesheets(["SAND-4", "BUGS-5"], Day(2022, 1, 1), Day(2022, 1, 31), ordered=True)))
+        self.assertEqual(self.db.count("/rest/api/2/issue/"), 2)
+    def test_302(self) -> None:
+        self.db.add_worklog("SAND-4", "2022-01-03T12:00:00.000+0000", 1.5, "local extending frontend")
+        self.db.add_worklog("BUGS-5", "2022-01-05T12:00:00.000+0000", 2.0, "local analyzed problem")
+        jira2data_api.WORKLOG_UPDATED = True
+        data = jira2data.jiraOdooData(self.api(), STANDIN_USER, dayrange("2022-01-01", "2022-01-31"))
+        self.assertEqual([(item["Ticket"], item["Date"], item["Quantity"]) for item in data],
+                         [("SAND-4", Day(2022, 1, 3), 1.5), ("BUGS-5", Day(2022, 1, 5), 2.0)])
+        self.assertEqual(self.db.count("/rest/api/2/worklog/list"), 1)
+    def test_303(self) -> None:
+        self.db.add_worklog("SAND-4", "2022-01-03T12:00:00.000+0000", 1.5, "local extending frontend")
+        jira2data_api.WORKLOG_UPDATED = True
+        worklogs = jira2data_api.Worklogs(STANDIN_USER, self.url)
+        done = list(worklogs.timesheets(["SAND-4", "GONE-7"], Day(2022, 1, 1), Day(2022, 1, 31)))
+        self.assertEqual([(issue, [item["entry_desc"] for item in items]) for issue, items in done],
+                         [("SAND-4", ["local extending frontend"]), ("GONE-7", [])])
+        self.assertEqual(self.db.bodies[0]["validateQuery"], "warn")
+    def test_401(self) -> None:
+        for num in range(1, 8):
+            self.db.add_history("SAND-4", "2022-01-0%iT12:00:00.000+0000" % num, "status", "step %i" % num)
+        self.db.add_comment("SAND-4", "2022-01-03T13:00:00.000+0000", "looks good")
+        self.db.add_worklog("SAND-4", "2022-01-03T12:00:00.000+0000", 1.5, "local extending frontend")
+        jira2data.CHANGELOG_LIMIT = 3
+        data = jira2data.jiraGetIssueActivity(self.api(), "SAND-4")
+        self.assertEqual([item["type"] for item in data], ["history"] * 7 + ["comment", "worklog"])
+        self.assertEqual([item.get("change.toString") for item in data[:7]], ["step %i" % num for num in range(1, 8)])
+        self.assertEqual(data[0]["itemAuthor"], STANDIN_USER)
+        self.assertEqual(data[0]["issuetype"], "Task")
+        self.assertEqual(data[0]["issue"], "SAND-4")
+        for name in ["self", "author", "updateAuthor", "body", "items"]:
+            self.assertNotIn(name, data[0])
+            self.assertNotIn(name, data[7])
+        self.assertEqual(data[7]["created"], "2022-01-03T13:00:00.000+0000")
+        self.assertEqual(data[8]["comment"], "local extending frontend")
+        self.assertEqual(self.db.count("/rest/api/2/issue/SAND-4/changelog"), 3)
+        self.assertEqual(self.db.count("/rest/api/2/issue/SAND-4?fields=summary,issuetype,comment,worklog"), 1)
+        self.db.changelogs = False
+        self.assertEqual(jira2data.jiraGetIssueActivity(self.api(), "SAND-4"), data)
+        self.assertEqual(self.db.count("/rest/api/2/issue/SAND-4?expand=changelog&fields=summary,issuetype,comment,worklog"), 1)
+        self.assertEqual(self.db.count("/rest/api/2/issue/SAND-4?fields="), 1)  # not again with the expand=changelog
+        self.assertEqual(jira2data.jiraGetIssueActivity(self.api(), "SAND-4"), data)
+        self.assertEqual(self.db.count("/rest/api/2/issue/SAND-4/changelog"), 4)  # the 404 is remembered
+        self.assertEqual(self.db.count("/rest/api/2/issue/SAND-4?expand=changelog"), 2)
+
+if __name__ == "__main__":
+    from optparse import OptionParser
+    cmdline = OptionParser("%prog [-options] [test_xxx]")
+    cmdline.add_option("-v", "--verbose", action="count", default=0, help="more verbose logging")
+    cmdline.add_option("-^", "--quiet", action="count", default=0, help="less verbose logging")
+    cmdline.add_option("--failfast", action="store_true", default=False,
+                       help="Stop the test run on the first error or failure. [%default]")
+    cmdline.add_option("--xmlresults", metavar="FILE", default=None,
+                       help="capture results as a junit xml file [%default]")
+    opt, args = cmdline.parse_args()
+    logging.basicConfig(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
+    if not args:
+        args = ["test_*"]
+    suite = unittest.TestSuite()
+    for arg in args:
+        if len(arg) > 2 and arg[0].isalpha() and arg[1] == "_":
+            arg = "test_" + arg[2:]
+        for classname in sorted(globals()):
+            if not classname.endswith("Test"):
+                continue
+            testclass = globals()[classname]
+            for method in sorted(dir(testclass)):
+                if "*" not in arg: arg += "*"
+                if arg.startswith("_"): arg = arg[1:]
+                if fnmatch(method, arg):
+                    suite.addTest(testclass(method))
+    # running
+    xmlresults = None
+    if opt.xmlresults:
+        if os.path.exists(opt.xmlresults):
+            os.remove(opt.xmlresults)
+        xmlresults = open(opt.xmlresults, "wb")
+        logg.info("xml results into %s", opt.xmlresults)
+    if xmlresults:
+        import xmlrunner  # type: ignore[import]
+        Runner = xmlrunner.XMLTestRunner
+        result = Runner(xmlresults).run(suite)
+    else:
+        Runner = unittest.TextTestRunner
+        result = Runner(verbosity=opt.verbose, failfast=opt.failfast).run(suite)
+    if not result.wasSuccessful():
+        sys.exit(1)
@@ -15,9 +15,12 @@ import os
 import re
 import sys
 import datetime
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import quote_plus as qq
 from dotnetrc import get_username_password, str_get_username_password
 from dotgitconfig import git_config_value
+from callgovernor import governor
 from timerange import get_date
 from tabtotext import JSONDict, JSONList, JSONItem
 
@@ -36,6 +39,9 @@ url_timeout: Optional[int] = 20
 
 MAXROUNDS = 1000
 LIMIT = 1000
+WORKLOG_THREADS = 8  # parallel requests for the worklogs of multiple tickets
+WORKLOG_UPDATED = False  # fetch only the worklogs updated since the start day (instead of all worklogs per ticket)
+WORKLOG_LISTSIZE = 1000  # ids per /worklog/list request (the jira maximum)
 
 USER = NIX
 JIRADEFAULT = "http://jira.host"  # RFC2606
@@ -50,6 +56,15 @@ def setJiraURL(url: FrontendUrl) -> None:
     global JIRADEFAULT
     JIRADEFAULT = url
 
+READ_POSTS = ["/search", "/worklog/list"]  # jira endpoints that take a post but do not write
+
+class GovernedSession(Session):
+    """ a requests Session whose requests go through the callgovernor of the server.
+        A post that is not a search is not sent again after a 502/504 or a lost connection. """
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> Response:  # type: ignore[override]
+        idempotent = method.upper() != "POST" or urllib.parse.urlsplit(url).path.endswith(tuple(READ_POSTS))
+        return governor(url).response(lambda: Session.request(self, method, url, *args, **kwargs), idempotent)
+
 class JiraFrontend:
     url_verify: Verify
     url_timeout: Optional[int]
@@ -109,7 +124,7 @@ class JiraFrontend:
     def session(self, url: Optional[str] = None) -> Session:
         url = url or self.url()
         if url not in self._sessions:
-            session = Session()
+            session = GovernedSession()
             session.auth = get_username_password(url)
             self._sessions[url] = session
         return self._sessions[url]
@@ -178,6 +193,115 @@ def _jiraGetWorklog(api: JiraFrontend, issue: str) -> Iterator[JSONDict]:
                     del res[field]
             yield res
 
+def each_jiraGetWorklogs(api: JiraFrontend, issues: Iterable[str], ordered: bool = False, since: Optional[Day] = None) -> Iterator[Tuple[str, JSONList]]:
+    """ the worklogs of many tickets fetched in parallel (WORKLOG_THREADS). The (issue, worklogs)
+        are yielded as they complete - or in the order of the issues when 'ordered'.
+        With WORKLOG_UPDATED only the worklogs updated 'since' are fetched. """
+    issuelist = list(issues)
+    if WORKLOG_UPDATED and since and issuelist:
+        yield from each_jiraGetWorklogsUpdated(api, issuelist, since)
+        return
+    if WORKLOG_THREADS <= 1 or len(issuelist) <= 1:
+        for issue in issuelist:
+            yield issue, jiraGetWorklog(api, issue)
+        return
+    api.session(api.jira())  # shared by the threads
+    with ThreadPoolExecutor(max_workers=min(WORKLOG_THREADS, len(issuelist))) as pool:
+        if ordered:
+            yield from zip(issuelist, pool.map(lambda issue: jiraGetWorklog(api, issue), issuelist))
+        else:
+            futures = dict((pool.submit(jiraGetWorklog, api, issue), issue) for issue in issuelist)
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+def each_jiraGetWorklogsUpdated(api: JiraFrontend, issues: List[str], since: Day) -> Iterator[Tuple[str, JSONList]]:
+    """ the worklogs of the tickets that were updated since the day - using the ids from /worklog/updated
+        and the bulk /worklog/list, instead of downloading all worklogs of each ticket. Note that a
+        worklog that was last updated before that day is not seen (even if it was started later). """
+    issueids = jiraGetIssueIds(api, issues)
+    wanted = dict((issueid, issue) for issue, issueid in issueids.items())
+    found: Dict[str, JSONList] = dict((issue, []) for issue in issues)
+    for record in each_jiraGetWorklogList(api, jiraGetWorklogsUpdatedIds(api, since)):
+        issueid = str(record.get("issueId", ""))
+        if issueid in wanted:
+            found[wanted[issueid]].append(record)
+    for issue in issues:
+        yield issue, found[issue]
+
+def jiraGetWorklogsUpdatedIds(api: JiraFrontend, since: Day) -> List[int]:
+    """ the ids of all the worklogs (visible to the user) updated since the day """
+    since_ms = int(datetime.datetime.combine(since, datetime.time()).timestamp() * 1000)
+    http = api.session(api.jira())
+    headers = {"Content-Type": "application/json"}
+    result: List[int] = []
+    for attempt in range(MAXROUNDS):
+        req = f"/rest/api/2/worklog/updated?since={since_ms}"
+        url = api.jira() + req
+        r = http.get(url, headers=headers, verify=api.verify)
+        if api.error(r):
+            logg.error("%s => %s\n", req, r.text)
+            logg.warning("    %s", api.pwinfo())
+            raise HTTPError(r)
+        logg.debug("%s => %s", req, r.text)
+        data = json.loads(r.text)
+        result += [int(value["worklogId"]) for value in data.get("values", [])]
+        if data.get("lastPage", True) or not data.get("values"):
+            break
+        since_ms = int(data["until"])
+    logg.info("%s worklogs updated since %s", len(result), since)
+    return result
+
+def each_jiraGetWorklogList(api: JiraFrontend, ids: List[int]) -> Iterator[JSONDict]:
+    """ the worklogs for the ids (in chunks of WORKLOG_LISTSIZE) """
+    skipfields = ["self", "author", "updateAuthor", "body"]
+    req = "/rest/api/2/worklog/list"
+    url = api.jira() + req
+    http = api.session(api.jira())
+    headers = {"Content-Type": "application/json"}
+    for start in range(0, len(ids), WORKLOG_LISTSIZE):
+        post = {"ids": ids[start:start + WORKLOG_LISTSIZE]}
+        r = http.post(url, headers=headers, verify=api.verify, json=post)
+        if api.error(r):
+            logg.error("%s => %s\n", req, r.text)
+            logg.warning("    %s", api.pwinfo())
+            raise HTTPError(r)
+        logg.debug("%s => %s", req, r.text)
+        for res in json.loads(r.text):
+            if "author" in res:
+                res["authorname"] = res["author"]["name"]
+            for field in skipfields:
+                if field in res:
+                    del res[field]
+            yield res
+
+def jiraGetIssueIds(api: JiraFrontend, issues: List[str]) -> Dict[str, str]:
+    """ the numeric ids of the ticket keys (the worklogs only know the issueId) - a key
+        that does not exist (anymore) is left out, so that it has no worklogs """
+    req = "/rest/api/2/search"
+    url = api.jira() + req
+    http = api.session(api.jira())
+    headers = {"Content-Type": "application/json"}
+    result: Dict[str, str] = {}
+    for start in range(0, len(issues), 100):
+        keys = issues[start:start + 100]
+        post: Dict[str, Any] = {"jql": "issuekey in (%s)" % ",".join(keys), "startAt": 0, "maxResults": len(keys), "fields": ["key"],
+                                "validateQuery": "warn"}  # a 400 for a deleted or moved ticket otherwise
+        r = http.post(url, headers=headers, verify=api.verify, json=post)
+        if api.error(r):
+            logg.error("%s => %s\n  query was %s", req, r.text, post)
+            logg.warning("    %s", api.pwinfo())
+            raise HTTPError(r)
+        logg.debug("%s => %s", req, r.text)
+        data = json.loads(r.text)
+        for item in data.get("issues", []):
+            result[item["key"]] = str(item["id"])
+        for warning in data.get("warningMessages", []):
+            logg.warning("%s => %s", req, warning)
+    for issue in issues:
+        if issue not in result:
+            logg.warning("%s: no such issue, no worklogs", issue)
+    return result
+
 def jiraAddWorklog(api: JiraFrontend, issue: str, ondate: Day, size: float, desc: str) -> JSONDict:
     req = f"/rest/api/2/issue/{issue}/worklog"
     url = api.jira() + req
@@ -227,19 +351,22 @@ class Worklogs:
         self.remote = JiraFrontend(remote)
         self.user = user
     def timesheet(self, issue: str, on_or_after: Day, on_or_before: Day) -> Iterator[JSONDict]:
-        session = self.remote.session()
+        yield from self.worklogs(issue, jiraGetWorklog(self.remote, issue), on_or_after, on_or_before)
+    def timesheets(self, issues: Iterable[str], on_or_after: Day, on_or_before: Day, ordered: bool = False) -> Iterator[Tuple[str, JSONList]]:
+        """ the timesheet of many tickets - fetched in parallel, yielded as they complete """
+        self.remote.user()
+        for issue, records in each_jiraGetWorklogs(self.remote, issues, ordered, since=on_or_after):
+            yield issue, list(self.worklogs(issue, records, on_or_after, on_or_before))
+    def worklogs(self, issue: str, records: Iterable[JSONDict], on_or_after: Day, on_or_before: Day) -> Iterator[JSONDict]:
         user = self.user or self.remote.user()
-        for record in jiraGetWorklog(self.remote, issue):
+        for record in records:
             if user:
                 author = cast(str, record["authorname"])
                 if user != author:
                     logg.debug("ignore author %s (we are %s)", author, user)
                     continue
             logg.debug("jira %s worklog %s", issue, record)
-            created = get_date(cast(str, record["created"]))
-            updated = get_date(cast(str, record["updated"]))
-            started = get_date(cast(str, record["started"]))
-            worktime = started or updated or created
+            worktime = get_date(cast(str, record.get("started") or record.get("updated") or record["created"]))
             logg.debug("check %s on %s (%s .. %s)", record, worktime, on_or_after, on_or_before)
             if on_or_after > worktime or worktime > on_or_before:
                 continue
@@ -57,6 +57,9 @@ class Worklogs:
             if on_or_after > worktime or worktime > on_or_before:
                 continue
             yield record.copy()
+    def timesheets(self, issues: Iterable[str], on_or_after: Day, on_or_before: Day, ordered: bool = False) -> Iterator[Tuple[str, JSONList]]:
+        for issue in issues:
+            yield issue, list(self.timesheet(issue, on_or_after, on_or_before))
     def worklog_create(self, issue: str, ondate: Day, size: float, desc: str) -> JSONDict:
         global db_next_id, db_tickets
         if issue not in db_tickets:
@@ -6,28 +6,38 @@ Read and format Odoo timesheet entries. Provides extra reports.
 __copyright__ = "(C) 2021-2025 Guido Draheim, licensed under the Apache License 2.0"""
 __version__ = "1.1.4023"
 
-from typing import Optional, Union, Dict, List, Tuple, cast, Iterable, Iterator, NamedTuple
+from typing import Optional, Union, Dict, List, Tuple, cast, Iterable, Iterator, NamedTuple, Sequence
 
 import logging
 import re
 import os
 import csv
 import datetime
+from array import array
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 import tabtotext
 import zeit2json
 from timerange import get_date, first_of_month, last_of_month, last_sunday, next_sunday, dayrange, is_dayrange
 from dotgitconfig import git_config_value, git_config_override
 import odoo2data_api as odoo_api
+import callgovernor
 import dotnetrc
 
+try:
+    import numpy  # type: ignore[import-not-found]  # optional, for the sums over many TimesheetColumns rows
+except ImportError:  # pragma: no cover
+    numpy = None
+
 # from math import round
 from fnmatch import fnmatchcase as fnmatch
 from tabtotext import JSONList, JSONDict, JSONBase, JSONItem, viewFMT
-from odoo2data_api import EntryID, ProjID, TaskID
+from odoo2data_api import EntryID, ProjID, TaskID, TimesheetEntry, TimesheetItem, timesheet_entries
 
 Day = datetime.date
 Num = float
+OdooData = Sequence[TimesheetItem]  # timesheet dicts or TimesheetEntry objects
 
 logg = logging.getLogger("odoo2data")
 DONE = (logging.WARNING + logging.ERROR) // 2
@@ -37,6 +47,7 @@ DAYS = dayrange()
 
 PRICES: List[str] = []
 PRICE10 = 10
+PRICECACHE = 4096  # (proj, task) rates remembered by the compiled PRICES
 PRICEVAT = 0.19
 
 SHORTNAME = 0
@@ -48,6 +59,9 @@ ODOO_PROJONLY = ""
 ODOO_SUMMARY = ""
 
 FOR_USER: List[str] = []
+FOR_USER_THREADS = 4
+ODOO_GROUPED = 0
+NUMPY_ROWS = 10000  # use numpy (if installed) for the report sums from this many rows, 0 = never
 
 LABELS: List[str] = []
 OUTPUT = ""
@@ -67,37 +81,62 @@ def strName(value: JSONItem) -> str:
             return val[:17] + "..." + val[-7:]
     return val
 
-def get_proj_price_rate(proj: str, task: str = NIX) -> int:
-    rate = 0
-    if task:
-        for price in PRICES:
+class PriceRules:
+    """ the PRICES compiled once - "proj@task:rate", "proj:rate" or a plain "rate".
+        The last matching rule wins, the rate per (proj, task) is cached. """
+    def __init__(self, prices: Sequence[str]) -> None:
+        self.prices = list(prices)
+        self.taskrules: List[Tuple[str, str, int]] = []  # (proj_pattern, task_pattern, rate) in reverse order
+        self.projrules: List[Tuple[str, int]] = []  # (proj_pattern, rate) in reverse order
+        for price in reversed(self.prices):
             if ":" in price:
                 proj_task, proj_rate = price.split(":", 1)
-                if "@" not in proj_task: continue
-                proj_name, task_name = proj_task.split("@", 1)
-                proj_pattern = (proj_name if "*" in proj_name else proj_name + "*")
-                task_pattern = (task_name if "*" in task_name else "*" + task_name + "*")
-                if fnmatches(proj, proj_pattern) and fnmatches(task, task_pattern):
-                    rate = int(proj_rate)
+                if "@" in proj_task:
+                    proj_name, task_name = proj_task.split("@", 1)
+                    proj_pattern = (proj_name if "*" in proj_name else proj_name + "*")
+                    task_pattern = (task_name if "*" in task_name else "*" + task_name + "*")
+                    self.taskrules.append((proj_pattern, task_pattern, int(proj_rate)))
+                else:
+                    proj_pattern = (proj_task if "*" in proj_task else proj_task + "*")
+                    self.projrules.append((proj_pattern, int(proj_rate)))
             else:
-                rate = int(price)
-    if not rate:
-        for price in PRICES:
-            if ":" in price:
-                proj_name, proj_rate = price.split(":", 1)
-                if "@" in proj_name: continue
-                proj_pattern = (proj_name if "*" in proj_name else proj_name + "*")
+                self.taskrules.append(("*", "*", int(price)))
+                self.projrules.append(("*", int(price)))
+        self.default: Optional[int] = None
+        self.rate = lru_cache(maxsize=PRICECACHE)(self._rate)
+    def _rate(self, proj: str, task: str = NIX) -> int:
+        rate = 0
+        if task:
+            for proj_pattern, task_pattern, task_rate in self.taskrules:
+                if fnmatches(proj, proj_pattern) and fnmatches(task, task_pattern):
+                    rate = task_rate
+                    break
+        if not rate:
+            for proj_pattern, proj_rate in self.projrules:
                 if fnmatches(proj, proj_pattern):
-                    rate = int(proj_rate)
-            else:
-                rate = int(price)
-    if not rate:
-        gitrc_price = git_config_value("zeit.price")
-        if gitrc_price:
-            rate = int(gitrc_price)
-    if not rate:
-        rate = PRICE10  # ensure that price is not a copy of hours
-    return rate
+                    rate = proj_rate
+                    break
+        if not rate:
+            rate = self.default_rate()
+        return rate
+    def default_rate(self) -> int:
+        """ zeit.price from the gitconfig (read only once) or PRICE10 """
+        if self.default is None:
+            gitrc_price = git_config_value("zeit.price")
+            self.default = int(gitrc_price) if gitrc_price else 0
+        return self.default or PRICE10  # ensure that price is not a copy of hours
+
+_price_rules: Optional[PriceRules] = None
+
+def price_rules() -> PriceRules:
+    """ the compiled PRICES - compiled again when PRICES was changed """
+    global _price_rules
+    if _price_rules is None or _price_rules.prices != PRICES:
+        _price_rules = PriceRules(PRICES)
+    return _price_rules
+
+def get_proj_price_rate(proj: str, task: str = NIX) -> int:
+    return price_rules().rate(proj, task)
 
 def get_price_vat() -> float:
     gitrc_vat = git_config_value("zeit.vat")
@@ -121,6 +160,11 @@ def odoo_all_projects_tasks() -> JSONList:
     data = odoo.projects_tasks()
     return data
 
+def odoo_refresh(full: bool = False) -> JSONList:
+    odoo = odoo_api.Odoo()
+    data = odoo.refresh(full)
+    return data
+
 def odoo_users() -> JSONList:
     return list(each_odoo_users())
 def each_odoo_users() -> Iterator[JSONDict]:
@@ -217,42 +261,42 @@ def _as_odoo(odoodata: Iterable[JSONDict]) -> Iterator[JSONDict]:
         info["User"] = (FOR_USER[0] if FOR_USER else "")
         yield info
 
-def work_data(odoodata: Optional[JSONList] = None) -> JSONList:
+def work_data(odoodata: Optional[OdooData] = None) -> JSONList:
     if not odoodata:
         odoo = odoo_api.Odoo().for_user(FOR_USER[0] if FOR_USER else "")
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+        odoodata = odoo.timesheet_entries(DAYS.after, DAYS.before)
     # return list(odoodata)
     return list(_work_data(odoodata))
-def _work_data(odoodata: JSONList) -> Iterator[JSONDict]:
-    for item in odoodata:
-        proj_name: str = cast(str, item["proj_name"])
-        task_name: str = cast(str, item["task_name"])
-        odoo_date: Day = get_date(cast(str, item["entry_date"]))  # in case we use raw zeit
-        odoo_size: Num = cast(Num, item["entry_size"])
-        odoo_desc: str = cast(str, item["entry_desc"])
+def _work_data(odoodata: OdooData) -> Iterator[JSONDict]:
+    for item in timesheet_entries(odoodata):
+        proj_name: str = item.proj_name
+        task_name: str = item.task_name
+        odoo_date: Day = get_date(item.entry_date)  # in case we use raw zeit
+        odoo_size: Num = item.entry_size
+        odoo_desc: str = item.entry_desc
         yield {"at proj": proj_name, "at task": task_name,
                "at date": odoo_date, "odoo": odoo_size, "worked on": odoo_desc}
 
 WEEKDAYS = ["so", "mo", "di", "mi", "do", "fr", "sa", "so"]
 
-def work_zeit(odoodata: Optional[JSONList] = None) -> JSONList:
+def work_zeit(odoodata: Optional[OdooData] = None) -> JSONList:
     if not odoodata:
         odoo = odoo_api.Odoo().for_user(FOR_USER[0] if FOR_USER else "")
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+        odoodata = odoo.timesheet_entries(DAYS.after, DAYS.before)
     # return list(odoodata)
     return list(_work_zeit(odoodata))
-def _work_zeit(odoodata: JSONList) -> Iterator[JSONDict]:
+def _work_zeit(odoodata: OdooData) -> Iterator[JSONDict]:
     data: Dict[Tuple[str, str], List[str]] = {}
     mapping: Dict[str, str] = {}
     projnames: Dict[str, str] = {}
     tasknames: Dict[str, str] = {}
     weekstart = None
-    for item in odoodata:
-        proj_name: str = cast(str, item["proj_name"])
-        task_name: str = cast(str, item["task_name"])
-        odoo_date: Day = get_date(cast(str, item["entry_date"]))  # in case we use raw zeit
-        odoo_size: Num = cast(Num, item["entry_size"])
-        odoo_desc: str = cast(str, item["entry_desc"])
+    for item in timesheet_entries(odoodata):
+        proj_name: str = item.proj_name
+        task_name: str = item.task_name
+        odoo_date: Day = get_date(item.entry_date)  # in case we use raw zeit
+        odoo_size: Num = item.entry_size
+        odoo_desc: str = item.entry_desc
         prefix = odoo_desc.split(" ", 1)[0]
         mapping[prefix] = ""
         projnames[prefix] = proj_name
@@ -294,22 +338,129 @@ def _work_zeit(odoodata: JSONList) -> Iterator[JSONDict]:
             yield {zeit_txt: line}
 
 # ========================================================================
-def summary_per_day(odoodata: Optional[JSONList] = None) -> JSONList:
+class TimesheetColumns:
+    """ the timesheet records converted once into columns for the summary reports -
+        dates as ordinals, project/task/topic names interned as indexes into 'names',
+        and the hours as doubles. The sums() are grouped by any of the columns. """
+    def __init__(self, odoodata: Iterable[TimesheetItem] = ()) -> None:
+        self.names: List[str] = []
+        self.nameindex: Dict[str, int] = {}
+        self.dates = array("l")  # date.toordinal()
+        self.months = array("l")  # year * 100 + month
+        self.monthofyear = array("l")  # month
+        self.projs = array("l")
+        self.tasks = array("l")
+        self.topics = array("l")
+        self.sizes = array("d")
+        self.datecache: Dict[str, Tuple[int, int, int]] = {}
+        for item in timesheet_entries(odoodata):
+            self.append(item)
+    def __len__(self) -> int:
+        return len(self.sizes)
+    def name(self, text: str) -> int:
+        if text not in self.nameindex:
+            self.nameindex[text] = len(self.names)
+            self.names.append(text)
+        return self.nameindex[text]
+    def append(self, item: TimesheetEntry) -> None:
+        entry_date = item.entry_date
+        if entry_date not in self.datecache:
+            day = get_date(entry_date)
+            self.datecache[entry_date] = (day.toordinal(), day.year * 100 + day.month, day.month)
+        ordinal, month, monthofyear = self.datecache[entry_date]
+        self.dates.append(ordinal)
+        self.months.append(month)
+        self.monthofyear.append(monthofyear)
+        self.projs.append(self.name(item.proj_name))
+        self.tasks.append(self.name(item.task_name))
+        self.topics.append(self.name(pref_desc(item.entry_desc)))
+        self.sizes.append(item.entry_size)
+    def month(self, value: int) -> str:
+        """ the 'am' value of a 'months' or 'monthofyear' key """
+        if value > 100:
+            return "M%02i.%04i" % (value % 100, value // 100)
+        return "M%02i" % value
+    def monthcolumn(self) -> str:
+        return "months" if ADDFOOTER > 1 else "monthofyear"
+    def projfilter(self) -> Optional[List[bool]]:
+        """ the ODOO_PROJONLY / ODOO_PROJSKIP selection per name index (None = all) """
+        if not ODOO_PROJONLY and not ODOO_PROJSKIP:
+            return None
+        selected: List[bool] = []
+        for name in self.names:
+            if ODOO_PROJONLY and not fnmatches(name, ODOO_PROJONLY):
+                selected.append(False)
+            elif ODOO_PROJSKIP and fnmatches(name, ODOO_PROJSKIP):
+                selected.append(False)
+            else:
+                selected.append(True)
+        return selected
+    def sums(self, columns: List[str], projfilter: bool = False) -> Dict[Tuple[int, ...], float]:
+        """ the sum of the sizes per distinct key of the columns, in the order of first occurrence """
+        keys = [cast(Sequence[int], getattr(self, column)) for column in columns]
+        selected = self.projfilter() if projfilter else None
+        if numpy is not None and NUMPY_ROWS and len(self) >= NUMPY_ROWS:
+            return self._numpy_sums(keys, selected)
+        sums: Dict[Tuple[int, ...], float] = {}
+        projs, sizes = self.projs, self.sizes
+        for row, key in enumerate(zip(*keys)):
+            if selected is not None and not selected[projs[row]]:
+                continue
+            sums[key] = sums.get(key, 0.) + sizes[row]
+        return sums
+    def _numpy_sums(self, keys: List[Sequence[int]], selected: Optional[List[bool]]) -> Dict[Tuple[int, ...], float]:
+        rows = numpy.ones(len(self), dtype=bool)
+        if selected is not None:
+            rows = numpy.array(selected, dtype=bool)[numpy.array(self.projs, dtype=numpy.int64)]
+        if not rows.any():
+            return {}
+        table = numpy.stack([numpy.array(key, dtype=numpy.int64)[rows] for key in keys], axis=1)
+        uniq, first, inverse = numpy.unique(table, axis=0, return_index=True, return_inverse=True)
+        totals = numpy.bincount(inverse.ravel(), weights=numpy.array(self.sizes)[rows], minlength=len(uniq))
+        return dict((tuple(int(val) for val in uniq[n]), float(totals[n])) for n in numpy.argsort(first, kind="stable"))
+
+OdooColumns = Union[OdooData, TimesheetColumns]
+
+def timesheet_columns(odoodata: OdooColumns) -> TimesheetColumns:
+    """ convert the timesheet records once - the reports can be run off the result """
+    if isinstance(odoodata, TimesheetColumns):
+        return odoodata
+    return TimesheetColumns(odoodata)
+
+# ========================================================================
+def odoo_timesheet_groups(groupby: List[str]) -> JSONList:
+    """ the summary reports need only the sums - let the server do the grouping """
+    odoo = odoo_api.Odoo().for_user(FOR_USER[0] if FOR_USER else "")
+    return odoo.timesheet_groups(DAYS.after, DAYS.before, groupby)
+
+def summary_per_day(odoodata: Optional[OdooColumns] = None) -> JSONList:
+    if not odoodata and ODOO_GROUPED:
+        odoodata = odoo_timesheet_groups(["date:day"])
     if not odoodata:
         odoo = odoo_api.Odoo().for_user(FOR_USER[0] if FOR_USER else "")
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+        odoodata = odoo.timesheet_entries(DAYS.after, DAYS.before)
     return _summary_per_day(odoodata)
-def _summary_per_day(odoodata: JSONList) -> JSONList:
-    daydata: Dict[Day, JSONDict] = {}
-    for item in odoodata:
-        odoo_date: Day = get_date(cast(str, item["entry_date"]))
-        odoo_size: Num = cast(Num, item["entry_size"])
-        weekday = odoo_date.isoweekday()
-        weekday_name = WEEKDAYS[weekday]
-        if odoo_date not in daydata:
-            daydata[odoo_date] = {"date": odoo_date, "day": weekday_name, "odoo": 0}
-        daydata[odoo_date]["odoo"] += odoo_size  # type: ignore
-    return list(daydata.values())
+def _summary_per_day(odoodata: OdooColumns) -> JSONList:
+    columns = timesheet_columns(odoodata)
+    daydata: JSONList = []
+    for (ordinal,), odoo_size in columns.sums(["dates"]).items():
+        odoo_date = Day.fromordinal(ordinal)
+        weekday_name = WEEKDAYS[odoo_date.isoweekday()]
+        daydata.append({"date": odoo_date, "day": weekday_name, "odoo": odoo_size})
+    return daydata
+
+def odoo_timesheet(user: str) -> JSONList:
+    odoo = odoo_api.Odoo().for_user(user)
+    return odoo.timesheet(DAYS.after, DAYS.before)
+def odoo_timesheets(users: List[str]) -> List[JSONList]:
+    """ fetch the timesheets of multiple users, in parallel if FOR_USER_THREADS allows it.
+        The result list is in the order of the users list."""
+    for m, user in enumerate(users):
+        logg.info("%i: %s", m + 1, user)
+    if FOR_USER_THREADS <= 1 or len(users) <= 1:
+        return [odoo_timesheet(user) for user in users]
+    with ThreadPoolExecutor(max_workers=min(FOR_USER_THREADS, len(users))) as pool:
+        return list(pool.map(odoo_timesheet, users))
 
 def user2(name: str, m: int) -> str:
     if " " in name:
@@ -317,7 +468,7 @@ def user2(name: str, m: int) -> str:
         return n[0][0] + n[-1][0]
     else:
         return str(m) + name[0]
-def reports_per_day(odoodata: Optional[JSONList] = None) -> JSONList:
+def reports_per_day(odoodata: Optional[OdooData] = None) -> JSONList:
     if odoodata:
         m = 0
         logg.info("%s: zeit", m)
@@ -326,21 +477,18 @@ def reports_per_day(odoodata: Optional[JSONList] = None) -> JSONList:
     else:
         result = []
         users = FOR_USER if FOR_USER else [""]
-    for m, user in enumerate(users):
-        logg.info("%i: %s", m + 1, user)
-        odoo = odoo_api.Odoo().for_user(user)
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+    for m, (user, odoodata) in enumerate(zip(users, odoo_timesheets(users))):
         result += _report_per_day(odoodata, user=user2(user, m + 1))
     return sorted(result, key=lambda r: (r["date"], r["at proj"], r["user"]))
-def _report_per_day(odoodata: JSONList, user: str = ":") -> JSONList:
+def _report_per_day(odoodata: OdooData, user: str = ":") -> JSONList:
     work_sep = " / "
     daydata: Dict[Tuple[Day, str], JSONDict] = {}
-    for item in odoodata:
-        odoo_date: Day = get_date(cast(str, item["entry_date"]))
-        odoo_size: Num = cast(Num, item["entry_size"])
-        odoo_work: str = cast(str, item["entry_desc"])
-        odoo_proj: str = cast(str, item["proj_name"])
-        odoo_task: str = cast(str, item["task_name"])
+    for item in timesheet_entries(odoodata):
+        odoo_date: Day = get_date(item.entry_date)
+        odoo_size: Num = item.entry_size
+        odoo_work: str = item.entry_desc
+        odoo_proj: str = item.proj_name
+        odoo_task: str = item.task_name
         if ODOO_PROJONLY:
             if not fnmatches(odoo_proj, ODOO_PROJONLY): continue
         if ODOO_PROJSKIP:
@@ -358,34 +506,29 @@ def _report_per_day(odoodata: JSONList, user: str = ":") -> JSONList:
         daydata[key]["work"] += odoo_work  # type: ignore
     return list(daydata.values())
 
-def summary_per_project_task(odoodata: Optional[JSONList] = None) -> JSONList:
+def summary_per_project_task(odoodata: Optional[OdooColumns] = None) -> JSONList:
+    if not odoodata and ODOO_GROUPED:
+        odoodata = odoo_timesheet_groups(["project_id", "task_id"])
     if not odoodata:
         odoo = odoo_api.Odoo().for_user(FOR_USER[0] if FOR_USER else "")
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+        odoodata = odoo.timesheet_entries(DAYS.after, DAYS.before)
     return _summary_per_project_task(odoodata)
-def _summary_per_project_task(odoodata: JSONList) -> JSONList:
-    sumdata: Dict[Tuple[str, str], JSONDict] = {}
-    for item in odoodata:
-        proj_name: str = cast(str, item["proj_name"])
-        task_name: str = cast(str, item["task_name"])
-        odoo_date: Day = get_date(cast(str, item["entry_date"]))
-        odoo_size: Num = cast(Num, item["entry_size"])
-        odoo_key = (proj_name, task_name)
-        if ODOO_PROJONLY:
-            if not fnmatches(proj_name, ODOO_PROJONLY): continue
-        if ODOO_PROJSKIP:
-            if fnmatches(proj_name, ODOO_PROJSKIP): continue
-        if odoo_key not in sumdata:
-            sumdata[odoo_key] = {"at proj": proj_name, "at task": task_name, "odoo": 0}
-        sumdata[odoo_key]["odoo"] += odoo_size  # type: ignore
-    return list(sumdata.values())
-
-def summary_per_project(odoodata: Optional[JSONList] = None) -> JSONList:
+def _summary_per_project_task(odoodata: OdooColumns) -> JSONList:
+    columns = timesheet_columns(odoodata)
+    names = columns.names
+    sumdata: JSONList = []
+    for (proj, task), odoo_size in columns.sums(["projs", "tasks"], projfilter=True).items():
+        sumdata.append({"at proj": names[proj], "at task": names[task], "odoo": odoo_size})
+    return sumdata
+
+def summary_per_project(odoodata: Optional[OdooColumns] = None) -> JSONList:
+    if not odoodata and ODOO_GROUPED:
+        odoodata = odoo_timesheet_groups(["project_id", "task_id"])
     if not odoodata:
         odoo = odoo_api.Odoo().for_user(FOR_USER[0] if FOR_USER else "")
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+        odoodata = odoo.timesheet_entries(DAYS.after, DAYS.before)
     return _summary_per_project(odoodata)
-def _summary_per_project(odoodata: JSONList) -> JSONList:
+def _summary_per_project(odoodata: OdooColumns) -> JSONList:
     sumdata = _summary_per_project_task(odoodata)
     sumproj: Dict[str, JSONDict] = {}
     for item in sumdata:
@@ -396,7 +539,7 @@ def _summary_per_project(odoodata: JSONList) -> JSONList:
         sumproj[proj_name]["odoo"] += item["odoo"]  # type: ignore
     return list(sumproj.values())
 
-def reports_per_project(odoodata: Optional[JSONList] = None) -> JSONList:
+def reports_per_project(odoodata: Optional[OdooData] = None) -> JSONList:
     if odoodata:
         m = 0
         logg.info("%s: zeit", m)
@@ -405,18 +548,15 @@ def reports_per_project(odoodata: Optional[JSONList] = None) -> JSONList:
     else:
         result = []
         users = FOR_USER if FOR_USER else [""]
-    for m, user in enumerate(users):
-        logg.info("%i: %s", m + 1, user)
-        odoo = odoo_api.Odoo().for_user(user)
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+    for m, (user, odoodata) in enumerate(zip(users, odoo_timesheets(users))):
         result += _report_per_project(odoodata, focus=m + 1)
     return sorted(result, key=lambda r: (r["am"], r["at proj"], r["m"]))
-def report_per_project(odoodata: Optional[JSONList] = None) -> JSONList:
+def report_per_project(odoodata: Optional[OdooColumns] = None) -> JSONList:
     if not odoodata:
         odoo = odoo_api.Odoo().for_user(FOR_USER[0] if FOR_USER else "")
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+        odoodata = odoo.timesheet_entries(DAYS.after, DAYS.before)
     return _report_per_project(odoodata)
-def _report_per_project(odoodata: JSONList, focus: int = 0) -> JSONList:
+def _report_per_project(odoodata: OdooColumns, focus: int = 0) -> JSONList:
     sumdata = _monthly_per_project(odoodata)
     sumvals: JSONList = []
     for item in sumdata:
@@ -429,7 +569,7 @@ def _report_per_project(odoodata: JSONList, focus: int = 0) -> JSONList:
         sumvals.append(elem)
     return sumvals
 
-def reports_per_project_task(odoodata: Optional[JSONList] = None) -> JSONList:
+def reports_per_project_task(odoodata: Optional[OdooData] = None) -> JSONList:
     if odoodata:
         m = 0
         logg.info("%s: zeit", m)
@@ -438,18 +578,15 @@ def reports_per_project_task(odoodata: Optional[JSONList] = None) -> JSONList:
     else:
         result = []
         users = FOR_USER if FOR_USER else [""]
-    for m, user in enumerate(users):
-        logg.info("%i: %s", m + 1, user)
-        odoo = odoo_api.Odoo().for_user(user)
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+    for m, (user, odoodata) in enumerate(zip(users, odoo_timesheets(users))):
         result += _report_per_project_task(odoodata, focus=m + 1)
     return sorted(result, key=lambda r: (r["am"], r["at proj"], r["m"]))
-def report_per_project_task(odoodata: Optional[JSONList] = None) -> JSONList:
+def report_per_project_task(odoodata: Optional[OdooColumns] = None) -> JSONList:
     if not odoodata:
         odoo = odoo_api.Odoo().for_user(FOR_USER[0] if FOR_USER else "")
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+        odoodata = odoo.timesheet_entries(DAYS.after, DAYS.before)
     return _report_per_project_task(odoodata)
-def _report_per_project_task(odoodata: JSONList, focus: int = 0) -> JSONList:
+def _report_per_project_task(odoodata: OdooColumns, focus: int = 0) -> JSONList:
     sumdata = _monthly_per_project_task(odoodata)
     sumvals: JSONList = []
     for item in sumdata:
@@ -463,7 +600,7 @@ def _report_per_project_task(odoodata: JSONList, focus: int = 0) -> JSONList:
         sumvals.append(elem)
     return sumvals
 
-def reports_per_project_topic(odoodata: Optional[JSONList] = None) -> JSONList:
+def reports_per_project_topic(odoodata: Optional[OdooData] = None) -> JSONList:
     if odoodata:
         m = 0
         logg.info("%s: zeit", m)
@@ -472,18 +609,15 @@ def reports_per_project_topic(odoodata: Optional[JSONList] = None) -> JSONList:
     else:
         result = []
         users = FOR_USER if FOR_USER else [""]
-    for m, user in enumerate(users):
-        logg.info("%i: %s", m + 1, user)
-        odoo = odoo_api.Odoo().for_user(user)
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+    for m, (user, odoodata) in enumerate(zip(users, odoo_timesheets(users))):
         result += _report_per_project_topic(odoodata, focus=m + 1)
     return sorted(result, key=lambda r: (r["am"], r["at proj"], r["m"]))
-def report_per_project_topic(odoodata: Optional[JSONList] = None) -> JSONList:
+def report_per_project_topic(odoodata: Optional[OdooColumns] = None) -> JSONList:
     if not odoodata:
         odoo = odoo_api.Odoo().for_user(FOR_USER[0] if FOR_USER else "")
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+        odoodata = odoo.timesheet_entries(DAYS.after, DAYS.before)
     return _report_per_project_topic(odoodata)
-def _report_per_project_topic(odoodata: JSONList, focus: int = 0) -> JSONList:
+def _report_per_project_topic(odoodata: OdooColumns, focus: int = 0) -> JSONList:
     sumdata = _monthly_per_project_topic(odoodata)
     sumvals: JSONList = []
     for item in sumdata:
@@ -497,12 +631,14 @@ def _report_per_project_topic(odoodata: JSONList, focus: int = 0) -> JSONList:
         sumvals.append(elem)
     return sumvals
 
-def monthly_per_project(odoodata: Optional[JSONList] = None) -> JSONList:
+def monthly_per_project(odoodata: Optional[OdooColumns] = None) -> JSONList:
+    if not odoodata and ODOO_GROUPED:
+        odoodata = odoo_timesheet_groups(["project_id", "task_id", "date:month"])
     if not odoodata:
         odoo = odoo_api.Odoo().for_user(FOR_USER[0] if FOR_USER else "")
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+        odoodata = odoo.timesheet_entries(DAYS.after, DAYS.before)
     return _monthly_per_project(odoodata)
-def _monthly_per_project(odoodata: JSONList) -> JSONList:
+def _monthly_per_project(odoodata: OdooColumns) -> JSONList:
     sumdata = _monthly_per_project_task(odoodata)
     sumproj: Dict[Tuple[str, str], JSONDict] = {}
     for item in sumdata:
@@ -515,58 +651,33 @@ def _monthly_per_project(odoodata: JSONList) -> JSONList:
         sumproj[new_key]["odoo"] += item["odoo"]  # type: ignore
     return list(sumproj.values())
 
-def monthly_per_project_task(odoodata: Optional[JSONList] = None) -> JSONList:
+def monthly_per_project_task(odoodata: Optional[OdooColumns] = None) -> JSONList:
+    if not odoodata and ODOO_GROUPED:
+        odoodata = odoo_timesheet_groups(["project_id", "task_id", "date:month"])
     if not odoodata:
         odoo = odoo_api.Odoo().for_user(FOR_USER[0] if FOR_USER else "")
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+        odoodata = odoo.timesheet_entries(DAYS.after, DAYS.before)
     return _monthly_per_project_task(odoodata)
-def _monthly_per_project_task(odoodata: JSONList) -> JSONList:
-    sumdata: Dict[Tuple[str, str, str], JSONDict] = {}
-    for item in odoodata:
-        proj_name: str = cast(str, item["proj_name"])
-        task_name: str = cast(str, item["task_name"])
-        odoo_date: Day = get_date(cast(str, item["entry_date"]))
-        odoo_size: Num = cast(Num, item["entry_size"])
-        if ADDFOOTER > 1:
-            odoo_month = "M%02i.%04i" % (odoo_date.month, odoo_date.year)
-        else:
-            odoo_month = "M%02i" % odoo_date.month
-        odoo_key = (odoo_month, proj_name, task_name)
-        if ODOO_PROJONLY:
-            if not fnmatches(proj_name, ODOO_PROJONLY): continue
-        if ODOO_PROJSKIP:
-            if fnmatches(proj_name, ODOO_PROJSKIP): continue
-        if odoo_key not in sumdata:
-            sumdata[odoo_key] = {"am": odoo_month, "at proj": proj_name, "at task": task_name, "odoo": 0, "zeit": 0}
-        sumdata[odoo_key]["odoo"] += odoo_size  # type: ignore
-    return list(sumdata.values())
-
-def monthly_per_project_topic(odoodata: Optional[JSONList] = None) -> JSONList:
+def _monthly_per_project_task(odoodata: OdooColumns) -> JSONList:
+    columns = timesheet_columns(odoodata)
+    names = columns.names
+    sumdata: JSONList = []
+    for (month, proj, task), odoo_size in columns.sums([columns.monthcolumn(), "projs", "tasks"], projfilter=True).items():
+        sumdata.append({"am": columns.month(month), "at proj": names[proj], "at task": names[task], "odoo": odoo_size, "zeit": 0})
+    return sumdata
+
+def monthly_per_project_topic(odoodata: Optional[OdooColumns] = None) -> JSONList:
     if not odoodata:
         odoo = odoo_api.Odoo().for_user(FOR_USER[0] if FOR_USER else "")
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+        odoodata = odoo.timesheet_entries(DAYS.after, DAYS.before)
     return _monthly_per_project_topic(odoodata)
-def _monthly_per_project_topic(odoodata: JSONList) -> JSONList:
-    sumdata: Dict[Tuple[str, str, str], JSONDict] = {}
-    for item in odoodata:
-        proj_name: str = cast(str, item["proj_name"])
-        odoo_desc: str = cast(str, item["entry_desc"])
-        odoo_date: Day = get_date(cast(str, item["entry_date"]))
-        odoo_size: Num = cast(Num, item["entry_size"])
-        task_pref: str = pref_desc(odoo_desc)
-        if ADDFOOTER > 1:
-            odoo_month = "M%02i.%04i" % (odoo_date.month, odoo_date.year)
-        else:
-            odoo_month = "M%02i" % odoo_date.month
-        odoo_key = (odoo_month, proj_name, task_pref)
-        if ODOO_PROJONLY:
-            if not fnmatches(proj_name, ODOO_PROJONLY): continue
-        if ODOO_PROJSKIP:
-            if fnmatches(proj_name, ODOO_PROJSKIP): continue
-        if odoo_key not in sumdata:
-            sumdata[odoo_key] = {"am": odoo_month, "at proj": proj_name, "at topic": task_pref, "odoo": 0, "zeit": 0}
-        sumdata[odoo_key]["odoo"] += odoo_size  # type: ignore
-    return list(sumdata.values())
+def _monthly_per_project_topic(odoodata: OdooColumns) -> JSONList:
+    columns = timesheet_columns(odoodata)
+    names = columns.names
+    sumdata: JSONList = []
+    for (month, proj, topic), odoo_size in columns.sums([columns.monthcolumn(), "projs", "topics"], projfilter=True).items():
+        sumdata.append({"am": columns.month(month), "at proj": names[proj], "at topic": names[topic], "odoo": odoo_size, "zeit": 0})
+    return sumdata
 
 def fnmatches(text: str, pattern: str) -> bool:
     for pat in pattern.split("|"):
@@ -584,22 +695,18 @@ def pref_desc(desc: str) -> str:
     else:
         return desc.split(" ", 1)[0]
 
-def summary_per_topic(odoodata: Optional[JSONList] = None) -> JSONList:
+def summary_per_topic(odoodata: Optional[OdooColumns] = None) -> JSONList:
     if not odoodata:
         odoo = odoo_api.Odoo().for_user(FOR_USER[0] if FOR_USER else "")
-        odoodata = odoo.timesheet(DAYS.after, DAYS.before)
+        odoodata = odoo.timesheet_entries(DAYS.after, DAYS.before)
     return _summary_per_topic(odoodata)
-def _summary_per_topic(odoodata: JSONList) -> JSONList:
-    sumdata: Dict[str, JSONDict] = {}
-    for item in odoodata:
-        odoo_desc: str = cast(str, item["entry_desc"])
-        odoo_date: Day = get_date(cast(str, item["entry_date"]))
-        odoo_size: Num = cast(Num, item["entry_size"])
-        odoo_pref = pref_desc(odoo_desc)
-        if odoo_pref not in sumdata:
-            sumdata[odoo_pref] = {"at topic": odoo_pref, "odoo": 0}
-        sumdata[odoo_pref]["odoo"] += odoo_size  # type: ignore
-    return list(sumdata.values())
+def _summary_per_topic(odoodata: OdooColumns) -> JSONList:
+    columns = timesheet_columns(odoodata)
+    names = columns.names
+    sumdata: JSONList = []
+    for (topic,), odoo_size in columns.sums(["topics"]).items():
+        sumdata.append({"at topic": names[topic], "odoo": odoo_size})
+    return sumdata
 
 def json2odoo(data: JSONList) -> JSONList:
     return list(_json2odoo(data))
@@ -645,6 +752,10 @@ def report(arg: str) -> Optional[Report]:
         data = json2odoo(zeit2json.read_zeit(DAYS.after, DAYS.before))
     if arg in ["ou", "odoo-users", "users"]:
         results = odoo_users()  # list all Odoo users
+    elif arg in ["or", "odoo-refresh", "refresh"]:
+        results = odoo_refresh()  # update the local cache of Odoo users, projects and tasks
+    elif arg in ["orr", "odoo-reload", "reload"]:
+        results = odoo_refresh(full=True)  # load the local cache of Odoo users, projects and tasks again
     elif arg in ["op", "odoo-projects", "projects"]:
         results = odoo_projects()  # list all Odoo projects (including unused)
         summary += ["# use 'oo' or 'odoo-projects-tasks' to see task details"]
@@ -814,6 +925,14 @@ if __name__ == "__main__":
     cmdline.add_option("-c", "--config", metavar="NAME=VALUE", action="append", default=[])
     cmdline.add_option("-u", "--user", metavar="NAME", action="append", default=[],
                        help="show data for other users than the login user (use full name or email)")
+    cmdline.add_option("-R", "--grouped", action="count", default=ODOO_GROUPED,
+                       help="summaries are computed by the server (read_group) [%default]")
+    cmdline.add_option("--cachettl", metavar="SECS", type="int", default=odoo_api.ODOO_CACHE_TTL,
+                       help="reuse cached Odoo users/projects/tasks for some time (0=off) [%default]")
+    cmdline.add_option("-j", "--threads", metavar="N", type="int", default=FOR_USER_THREADS,
+                       help="fetch data for multiple users in parallel [%default]")
+    cmdline.add_option("--maxrate", metavar="RPS", type="float", default=callgovernor.RATE,
+                       help="requests per second to the server (0=no cap) [%default]")
     opt, args = cmdline.parse_args()
     logging.basicConfig(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
     logg.setLevel(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
@@ -823,6 +942,10 @@ if __name__ == "__main__":
     dotnetrc.set_password_filename(opt.gitcredentials)
     dotnetrc.add_password_filename(opt.netcredentials, opt.extracredentials)
     FOR_USER = opt.user
+    FOR_USER_THREADS = opt.threads
+    ODOO_GROUPED = opt.grouped
+    odoo_api.ODOO_CACHE_TTL = opt.cachettl
+    callgovernor.RATE = opt.maxrate
     LABELS = opt.labels
     OUTPUT = opt.output
     TEXTFILE = opt.textfile
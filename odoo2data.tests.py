@@ -161,6 +161,116 @@ class odoo2dataTest(unittest.TestCase):
         self.assertEqual(results[0]["odoo"], 1.5)
         self.assertEqual(len(results), 1)
         self.assertEqual(len(results[0]), 3)
+    def test_201(self) -> None:
+        odoo = sync.odoo_api.Odoo()
+        odoo.timesheet_create("Project-1", "Developments", sync.DAYS.after, 1.25, "dev1 started")
+        odoo.timesheet_create("MGMT", "Project Management", sync.DAYS.after, 0.25, "mgmt call")
+        threads = sync.FOR_USER_THREADS
+        users = sync.FOR_USER
+        try:
+            sync.FOR_USER = ["Max Mustermann", "Erika Musterfrau", "John Doe"]
+            sync.FOR_USER_THREADS = 1
+            serial = [sync.reports_per_day(), sync.reports_per_project(),
+                      sync.reports_per_project_task(), sync.reports_per_project_topic()]
+            sync.FOR_USER_THREADS = 4
+            parallel = [sync.reports_per_day(), sync.reports_per_project(),
+                        sync.reports_per_project_task(), sync.reports_per_project_topic()]
+        finally:
+            sync.FOR_USER = users
+            sync.FOR_USER_THREADS = threads
+        logg.info("result:\n%s", tabtotext.tabToGFM(parallel[0]))
+        self.assertEqual(serial, parallel)
+        self.assertEqual(len(parallel[0]), 6)
+        self.assertEqual([r["user"] for r in parallel[0]], ["EM", "JD", "MM"] * 2)
+    def test_301(self) -> None:
+        odoo = sync.odoo_api.Odoo()
+        after = sync.DAYS.after
+        odoo.timesheet_create("Project-1", "Developments", after, 1.25, "dev1 started")
+        odoo.timesheet_create("Project-1", "Developments", after, 0.5, "dev1 continued")
+        odoo.timesheet_create("MGMT", "Project Management", after, 0.25, "mgmt call")
+        odoo.timesheet_create("MGMT", "Project Management", sync.DAYS.before, 2.0, "mgmt meeting")
+        grouped = sync.ODOO_GROUPED
+        try:
+            sync.ODOO_GROUPED = 0
+            lines = [sync.summary_per_day(), sync.summary_per_project_task(), sync.summary_per_project(),
+                     sync.monthly_per_project_task(), sync.monthly_per_project()]
+            sync.ODOO_GROUPED = 1
+            sums = [sync.summary_per_day(), sync.summary_per_project_task(), sync.summary_per_project(),
+                    sync.monthly_per_project_task(), sync.monthly_per_project()]
+        finally:
+            sync.ODOO_GROUPED = grouped
+        logg.info("result:\n%s", tabtotext.tabToGFM(sums[1]))
+        self.assertEqual(lines, sums)
+        self.assertEqual(sums[2], [{"at proj": "Project-1", "odoo": 1.75}, {"at proj": "MGMT", "odoo": 2.25}])
+    def test_401(self) -> None:
+        odoo = sync.odoo_api.Odoo()
+        after = sync.DAYS.after
+        odoo.timesheet_create("Project-1", "Developments", after, 1.25, "dev1 started")
+        odoo.timesheet_create("Project-1", "Developments", after, 0.5, "dev1 continued")
+        odoo.timesheet_create("MGMT", "Project Management", sync.DAYS.before, 2.0, "mgmt meeting")
+        records = odoo.timesheet(after, sync.DAYS.before)
+        entries = odoo.timesheet_entries(after, sync.DAYS.before)
+        self.assertEqual([entry._asdict() for entry in entries], records)
+        self.assertEqual(entries[0]["entry_desc"], "dev1 started")
+        reports = [sync.summary_per_day, sync.summary_per_project_task, sync.summary_per_project, sync.summary_per_topic,
+                   sync.monthly_per_project_task, sync.monthly_per_project, sync.monthly_per_project_topic,
+                   sync.report_per_project, sync.report_per_project_task, sync.work_data, sync.work_zeit]
+        for report in reports:
+            self.assertEqual(report(records), report(entries))
+            self.assertEqual(report(records), report(None))
+        self.assertEqual(tabtotext.tabToGFMx(entries), tabtotext.tabToGFMx(records))  # type: ignore[arg-type]
+    def test_501(self) -> None:
+        records: JSONList = [
+            {"proj_name": "Project-1", "task_name": "Developments", "entry_date": "2022-01-03", "entry_size": 1.25, "entry_desc": "dev1 started"},
+            {"proj_name": "MGMT", "task_name": "Project Management", "entry_date": "2023-01-04", "entry_size": 2.0, "entry_desc": "mgmt meeting"},
+            {"proj_name": "Project-1", "task_name": "Developments", "entry_date": "2023-01-05", "entry_size": 0.5, "entry_desc": "dev1 continued"},
+            {"proj_name": "Project-1", "task_name": "Developments", "entry_date": "2022-02-01", "entry_size": 1.0, "entry_desc": "dev2"}]
+        columns = sync.timesheet_columns(records)
+        self.assertIs(sync.timesheet_columns(columns), columns)
+        self.assertEqual(len(columns), 4)
+        self.assertEqual(columns.names, ["Project-1", "Developments", "dev1", "MGMT", "Project Management", "mgmt", "dev2"])
+        self.assertEqual(columns.sums(["projs"]), {(0,): 2.75, (3,): 2.0})
+        self.assertEqual(columns.sums(["monthofyear", "projs"]), {(1, 0): 1.75, (1, 3): 2.0, (2, 0): 1.0})
+        self.assertEqual(columns.sums(["months"]), {(202201,): 1.25, (202301,): 2.5, (202202,): 1.0})
+        self.assertEqual(columns.sums(["topics"]), {(2,): 1.75, (5,): 2.0, (6,): 1.0})
+        saved = (sync.ADDFOOTER, sync.ODOO_PROJSKIP)
+        try:
+            sync.ADDFOOTER = 2
+            sync.ODOO_PROJSKIP = "MGMT"
+            self.assertEqual(columns.sums(["dates"], projfilter=True), {(738158,): 1.25, (738525,): 0.5, (738187,): 1.0})
+            self.assertEqual(sync.monthly_per_project(columns), [
+                {"am": "M01.2022", "at proj": "Project-1", "odoo": 1.25},
+                {"am": "M01.2023", "at proj": "Project-1", "odoo": 0.5},
+                {"am": "M02.2022", "at proj": "Project-1", "odoo": 1.0}])
+            sync.ADDFOOTER = 0
+            self.assertEqual(sync.summary_per_project_task(columns), [
+                {"at proj": "Project-1", "at task": "Developments", "odoo": 2.75}])
+            self.assertEqual(sync.monthly_per_project_topic(records), [
+                {"am": "M01", "at proj": "Project-1", "at topic": "dev1", "odoo": 1.75, "zeit": 0},
+                {"am": "M02", "at proj": "Project-1", "at topic": "dev2", "odoo": 1.0, "zeit": 0}])
+        finally:
+            sync.ADDFOOTER, sync.ODOO_PROJSKIP = saved
+    def test_502(self) -> None:
+        saved = list(sync.PRICES)
+        try:
+            sync.PRICES[:] = ["60", "Project:70", "Project-1@Dev:80", "MGMT:0"]
+            self.assertEqual(sync.get_proj_price_rate("Project-1", "Developments"), 80)
+            self.assertEqual(sync.get_proj_price_rate("Project-1", "Test"), 60)
+            self.assertEqual(sync.get_proj_price_rate("Project-1"), 70)
+            self.assertEqual(sync.get_proj_price_rate("MGMT", "Meeting"), 60)
+            self.assertEqual(sync.get_proj_price_rate("Other"), 60)
+            rules = sync.price_rules()
+            for attempt in range(10):
+                self.assertEqual(sync.get_proj_price_rate("Project-1", "Developments"), 80)
+            self.assertIs(sync.price_rules(), rules)
+            self.assertEqual(rules.rate.cache_info().misses, 5)
+            self.assertEqual(rules.rate.cache_info().hits, 10)
+            sync.PRICES.append("Project-1:90")
+            self.assertIsNot(sync.price_rules(), rules)
+            self.assertEqual(sync.get_proj_price_rate("Project-1"), 90)
+            self.assertEqual(sync.get_proj_price_rate("Project-1", "Developments"), 80)
+        finally:
+            sync.PRICES[:] = saved
 
 
 if __name__ == "__main__":
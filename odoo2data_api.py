@@ -5,23 +5,31 @@ __version__ = "1.0.4023"
 
 # pylint: disable=unused-import,missing-function-docstring
 import logging
-from typing import List, Dict, Union, Optional, Tuple, Any, cast
+from typing import List, Dict, Union, Optional, Tuple, Iterator, Iterable, Sequence, Set, NamedTuple, Any, cast
 
 import sys
 import re
+import os
 import os.path as path
+import time
 import json
+import codecs
 import requests
 import datetime
 import dotnetrc
 import urllib.request
+import urllib.parse
+import urllib.error
+import http.client
+import threading
 import random
 from dotnetrc import set_password_filename, get_username_password, str_get_username_password, str_username_password
 from dotgitconfig import git_config_value
+from callgovernor import governor
 from fnmatch import fnmatchcase as fnmatch
 
 import tabtotext
-from tabtotext import JSONList, JSONDict
+from tabtotext import JSONList, JSONDict, JSONItem, DataItem
 Cookies = Any
 Day = datetime.date
 Num = float
@@ -41,13 +49,29 @@ ODOO_DB = ""
 ODOO_USERNAME = ""
 JSONRPC = "/jsonrpc"
 
+ODOO_PERDAY = False  # timesheet() with one search_read per day (older style)
+ODOO_KEEPALIVE = True  # reuse the http connection for the next json_rpc
+ODOO_READS = ["login", "version", "search", "read", "search_read", "search_count", "read_group", "fields_get", "name_search"]
+ODOO_STREAM = True  # decode the records of search_read while reading the response
+STREAMCHUNK = 65536
+MAXROUNDS = 1000
+GROUPBY = ["project_id", "task_id", "date:month"]
+TIMESHEET_FIELDS = ["project_id", "task_id", "user_id", "unit_amount", "name", "date"]  # and "id" (always included)
+LIMIT = 1000
+ODOO_CACHE = "~/.cache/timetrack-odoo"  # users, projects and tasks per url+db
+ODOO_CACHE_TTL = 3600  # seconds before asking the server for changes (0 = no cache)
+ODOO_LOGIN_TTL = 86400  # seconds to reuse the uid of a login from the cache directory (0 = only in this process)
+ODOO_CACHED = {"res.users": ['id', 'name', 'email', 'active'],
+               "project.project": ['id', 'name', 'active'],
+               "project.task": ['id', 'name', 'active', 'project_id']}
+
 dotnetrc.NETRC_CLEARTEXT = True
 
 class OdooException(Exception):
     pass
 
 # https://www.odoo.com/documentation/master/developer/howtos/web_services.html
-def json_rpc(url: str, method: str, params: Any) -> Any:
+def json_rpc(url: str, method: str, params: Any, idempotent: bool = False) -> Any:
     data = {
         "jsonrpc": "2.0",
         "method": method,
@@ -55,16 +79,219 @@ def json_rpc(url: str, method: str, params: Any) -> Any:
         "id": random.randint(0, 1000000000),
     }
     logg.debug("json data = %s", data)
-    req = urllib.request.Request(url=url, data=json.dumps(data).encode(), headers={
-        "Content-Type":"application/json",
-    })
-    reply = json.loads(urllib.request.urlopen(req).read().decode('UTF-8'))
+    body = json.dumps(data).encode()
+    if ODOO_KEEPALIVE and not json_proxy(url):
+        text = governor(url).call(lambda: json_post(url, body, idempotent), idempotent)
+    else:
+        req = urllib.request.Request(url=url, data=body, headers={
+            "Content-Type":"application/json",
+        })
+        text = governor(url).call(lambda: cast(bytes, urllib.request.urlopen(req).read()), idempotent)
+    reply = json.loads(text.decode('UTF-8'))
     if reply.get("error"):
         raise OdooException(reply["error"])
     return reply["result"]
 
+_connections = threading.local()  # http.client is not threadsafe, so it is one pool per thread
+
+def json_proxy(url: str) -> bool:
+    """ whether http_proxy/https_proxy (or the system settings) apply to the url - the pooled
+        connections of json_open do not know about proxies, so those requests go through urlopen """
+    parts = urllib.parse.urlsplit(url)
+    return parts.scheme in urllib.request.getproxies() and not urllib.request.proxy_bypass(parts.hostname or NIX)
+
+def json_connections() -> Dict[str, http.client.HTTPConnection]:
+    pool: Optional[Dict[str, http.client.HTTPConnection]] = getattr(_connections, "pool", None)
+    if pool is None:
+        pool = {}
+        _connections.pool = pool
+    return pool
+
+def json_rpc_close() -> None:
+    pool = json_connections()
+    for conn in pool.values():
+        conn.close()
+    pool.clear()
+
+def json_open(url: str, body: bytes, idempotent: bool = False) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+    """ send the request on a pooled connection - the connection is taken out of the pool
+        until the response has been read (see json_done). A write goes on a new connection,
+        as it can not be sent again when a pooled connection turns out to be closed. """
+    parts = urllib.parse.urlsplit(url)
+    host = F"{parts.scheme}://{parts.netloc}"
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+    pool = json_connections()
+    for attempt in range(2):
+        conn = pool.pop(host, None) if idempotent else None
+        reused = conn is not None
+        if conn is None:
+            if parts.scheme == "https":
+                conn = http.client.HTTPSConnection(parts.netloc)
+            else:
+                conn = http.client.HTTPConnection(parts.netloc)
+        try:
+            conn.request("POST", target, body=body, headers=headers)
+            resp = conn.getresponse()
+        except (http.client.HTTPException, ConnectionError) as e:
+            conn.close()
+            if reused and not attempt:
+                logg.debug("reconnecting %s (%s)", host, e)
+                continue
+            raise
+        if resp.status >= 400:
+            resp.read()
+            json_done(url, conn, resp)
+            raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+        return conn, resp
+    raise OdooException(F"no connection to {host}")
+
+def json_done(url: str, conn: http.client.HTTPConnection, resp: http.client.HTTPResponse) -> None:
+    """ put the connection back into the pool (after the response was read completely) """
+    parts = urllib.parse.urlsplit(url)
+    host = F"{parts.scheme}://{parts.netloc}"
+    pool = json_connections()
+    if resp.will_close or not resp.isclosed() or host in pool:
+        conn.close()
+    else:
+        pool[host] = conn
+
+def json_post(url: str, body: bytes, idempotent: bool = False) -> bytes:
+    conn, resp = json_open(url, body, idempotent)
+    try:
+        text = resp.read()
+    except BaseException:
+        conn.close()
+        raise
+    json_done(url, conn, resp)
+    return text
+
+def json_rpc_each(url: str, method: str, params: Any, idempotent: bool = False) -> Iterator[Any]:
+    """ like json_rpc for a list result - the items are decoded while reading the response,
+        so that the raw reply and the full list are never in memory at the same time """
+    data = {
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": params,
+        "id": random.randint(0, 1000000000),
+    }
+    logg.debug("json data = %s", data)
+    body = json.dumps(data).encode()
+    if ODOO_KEEPALIVE and not json_proxy(url):
+        conn, resp = governor(url).call(lambda: json_open(url, body, idempotent), idempotent)
+        try:
+            for item in json_each_result(resp):
+                yield item
+        except BaseException:
+            conn.close()  # GeneratorExit included, the rest of the response was not read
+            raise
+        json_done(url, conn, resp)
+    else:
+        req = urllib.request.Request(url=url, data=body, headers={
+            "Content-Type":"application/json",
+        })
+        with governor(url).call(lambda: urllib.request.urlopen(req), idempotent) as reply:
+            for item in json_each_result(reply):
+                yield item
+
+class JSONStream:
+    """ decodes one json value after the other from a file-like object that is read in chunks """
+    def __init__(self, fp: Any, chunk: int = 0) -> None:
+        self.fp = fp
+        self.chunk = chunk or STREAMCHUNK
+        self.text = NIX
+        self.pos = 0
+        self.eof = False
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json = json.JSONDecoder()
+    def more(self) -> bool:
+        if self.eof:
+            return False
+        data = self.fp.read(self.chunk)
+        if self.pos:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        if not data:
+            self.eof = True
+            self.text += self.decoder.decode(b"", True)
+            return False
+        self.text += self.decoder.decode(data)
+        return True
+    def peek(self) -> str:
+        """ the next non-whitespace char (empty at the end) """
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.more():
+                return NIX
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise OdooException(F"expected one of '{chars}' in json reply but found '{char}'")
+        self.pos += 1
+        return char
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.json.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.more():
+                    continue
+                raise
+            if end == len(self.text) and self.more():
+                continue  # a number may go on in the next chunk
+            self.pos = end
+            return value
+    def drain(self) -> None:
+        while self.more():
+            self.pos = len(self.text)
+
+def json_each_result(fp: Any) -> Iterator[Any]:
+    """ the items of the "result" list in a json-rpc reply """
+    stream = JSONStream(fp)
+    stream.expect("{")
+    while stream.peek() != "}":
+        key = stream.value()
+        stream.expect(":")
+        if key == "result" and stream.peek() == "[":
+            stream.expect("[")
+            if stream.peek() == "]":
+                stream.expect("]")
+            else:
+                while True:
+                    yield stream.value()
+                    if stream.expect(",]") == "]":
+                        break
+        else:
+            value = stream.value()
+            if key == "error" and value:
+                raise OdooException(value)
+            if key == "result":
+                raise OdooException(F"expected a list result but found {type(value).__name__}")
+        if stream.expect(",}") == "}":
+            break
+    stream.drain()
+
+def odoo_idempotent(service: str, method: str, args: Sequence[Any]) -> bool:
+    """ whether the call only reads, so that it can be sent again after a failure """
+    if service == "object" and method in ["execute", "execute_kw"]:
+        return len(args) > 4 and args[4] in ODOO_READS
+    return method in ODOO_READS
+
 def odoo_call(url: str, service: str, method: str, *args: Any) -> Any:
-    return json_rpc(url, "call", {"service": service, "method": method, "args": args})
+    idempotent = odoo_idempotent(service, method, args)
+    return json_rpc(url, "call", {"service": service, "method": method, "args": args}, idempotent)
+
+def odoo_call_each(url: str, service: str, method: str, *args: Any) -> Iterator[Any]:
+    idempotent = odoo_idempotent(service, method, args)
+    if ODOO_STREAM:
+        return json_rpc_each(url, "call", {"service": service, "method": method, "args": args}, idempotent)
+    return iter(cast(List[Any], json_rpc(url, "call", {"service": service, "method": method, "args": args}, idempotent)))
 
 
 def strDate(val: Union[str, Day]) -> str:
@@ -111,6 +338,57 @@ def odoo_login(url: str, db: str,  username: str, password: str) -> UserID:
     uid = odoo_call(F"{url}{JSONRPC}", "common", "login", db, username, password)
     return cast(UserID, uid)
 
+_logins: Dict[str, UserID] = {}  # shared by all Odoo objects for the same url+db+username
+_logins_lock = threading.Lock()
+
+def odoo_login_cached(url: str, db: str, username: str, password: str) -> UserID:
+    key = odoo_login_key(url, db, username)
+    with _logins_lock:
+        uid = odoo_login_known(key)
+        if not uid:
+            uid = odoo_login(url, db, username, password)
+            odoo_login_remember(key, uid)
+        return uid
+
+def odoo_login_key(url: str, db: str, username: str) -> str:
+    return F"{url}|{db}|{username}"
+def odoo_logins_file() -> str:
+    return path.join(path.expanduser(ODOO_CACHE), "logins.json")
+def odoo_logins_stored() -> Dict[str, Tuple[UserID, float]]:
+    filename = odoo_logins_file()
+    if ODOO_LOGIN_TTL and path.exists(filename):
+        try:
+            with open(filename) as f:
+                return cast(Dict[str, Tuple[UserID, float]], json.load(f))
+        except (OSError, ValueError) as e:
+            logg.warning("could not load %s: %s", filename, e)
+    return {}
+def odoo_login_known(key: str) -> UserID:
+    """ the uid of an earlier login in this process or from the cache directory (0 if unknown).
+        To be called with the _logins_lock held. """
+    if key in _logins:
+        return _logins[key]
+    stored = odoo_logins_stored()
+    if key in stored and time.time() - stored[key][1] < ODOO_LOGIN_TTL:
+        uid = stored[key][0]
+        logg.debug("reusing login uid %s from %s", uid, odoo_logins_file())
+        _logins[key] = uid
+        return uid
+    return 0
+def odoo_login_remember(key: str, uid: UserID) -> None:
+    """ To be called with the _logins_lock held. """
+    if uid and ODOO_LOGIN_TTL:
+        filename = odoo_logins_file()
+        stored = odoo_logins_stored()
+        stored[key] = (uid, time.time())
+        os.makedirs(path.dirname(filename), exist_ok=True)
+        tmpfile = F"{filename}.{os.getpid()}"
+        with open(tmpfile, "w") as f:
+            json.dump(stored, f)
+        os.replace(tmpfile, filename)
+    if uid:
+        _logins[key] = uid
+
 def odoo_get_users(url: str, db:str, usr: UserID, pwd: str) -> JSONList:
     info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "res.users", "search_read", [], ['id', 'name', 'email', 'active'])
     # info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "hr.employee.public", "search_read", [], ['id', 'name', 'work_email', 'active'])
@@ -128,6 +406,18 @@ def odoo_get_projects_tasks(url: str, db:str, usr: UserID, pwd: str) -> JSONList
     info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "project.task", "search_read", [], ['id', 'name', 'active', 'project_id'])
     return cast(JSONList, info)
 
+def odoo_search_read(url: str, db:str, usr: UserID, pwd: str, model: str, domain: List[Any], fields: List[str]) -> JSONList:
+    info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, model, "search_read", domain, fields)
+    return cast(JSONList, info)
+
+def odoo_search_count(url: str, db:str, usr: UserID, pwd: str, model: str, domain: List[Any]) -> int:
+    info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, model, "search_count", domain)
+    return cast(int, info)
+
+def odoo_search(url: str, db:str, usr: UserID, pwd: str, model: str, domain: List[Any]) -> List[int]:
+    info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, model, "search", domain)
+    return cast(List[int], info)
+
 def odoo_get_project_tasks(url: str, db:str, usr: UserID, pwd: str, proj_id: ProjREF) -> JSONList:
     # info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "project.task", "fields_get", [], ['string', 'type'])
     # info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "project.task", "search_read", ['project_id','!=', False], ['id', 'name', 'active', 'project_id'])
@@ -136,7 +426,9 @@ def odoo_get_project_tasks(url: str, db:str, usr: UserID, pwd: str, proj_id: Pro
 
 
 # otter/odoo/rest.py#get_records_json
-def odoo_get_timesheet_records(url: str, db:str, usr: UserID, pwd: str, uid: UserID, entry_date: Optional[Day] = None) -> JSONList:
+def odoo_get_timesheet_records(url: str, db:str, usr: UserID, pwd: str, uid: UserID, entry_date: Optional[Day] = None, fields: Optional[List[str]] = None) -> JSONList:
+    return list(odoo_each_timesheet_records(url, db, usr, pwd, uid, entry_date, fields))
+def odoo_each_timesheet_records(url: str, db:str, usr: UserID, pwd: str, uid: UserID, entry_date: Optional[Day] = None, fields: Optional[List[str]] = None) -> Iterator[JSONDict]:
     dateref = datetime.date.today().strftime("%Y-%m-%d")
     # logg.debug("date ref = %s", dateref)
     if entry_date:
@@ -155,10 +447,43 @@ def odoo_get_timesheet_records(url: str, db:str, usr: UserID, pwd: str, uid: Use
             ["user_id", "=", uid]
         ]
 
-    info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "account.analytic.line", "search_read", searching, [])
-    return info
+    return odoo_call_each(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "account.analytic.line", "search_read", searching,
+                          TIMESHEET_FIELDS if fields is None else fields)
+
+def timesheet_domain(uid: UserID, after: Day, before: Day) -> List[Any]:
+    """ the timesheet entries of a user within the timespan """
+    return [["project_id", "!=", False], ["task_id", "!=", False], ["user_id", "=", uid],
+            ["date", ">=", strDate(after)], ["date", "<=", strDate(before)]]
+
+def odoo_get_timesheet_range(url: str, db:str, usr: UserID, pwd: str, uid: UserID, after: Day, before: Day, offset: int = 0, limit: int = 0, fields: Optional[List[str]] = None, since: str = NIX) -> JSONList:
+    return list(odoo_each_timesheet_range(url, db, usr, pwd, uid, after, before, offset, limit, fields, since))
+def odoo_each_timesheet_range(url: str, db:str, usr: UserID, pwd: str, uid: UserID, after: Day, before: Day, offset: int = 0, limit: int = 0, fields: Optional[List[str]] = None, since: str = NIX) -> Iterator[JSONDict]:
+    logg.debug("range %s .. %s (offset %s limit %s)", strDate(after), strDate(before), offset, limit)
+    searching = timesheet_domain(uid, after, before)
+    if since:
+        searching += [["write_date", ">=", since]]  # ">=" as there may be more changes within the same second
+    # the model default is "date desc, id desc" - so per day it is the same order as in odoo_get_timesheet_records
+    ordering = "date asc, id desc"
+    return odoo_call_each(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "account.analytic.line", "search_read", searching,
+                          TIMESHEET_FIELDS if fields is None else fields, offset, limit or None, ordering)
+
+def odoo_get_timesheet_ids(url: str, db:str, usr: UserID, pwd: str, uid: UserID, after: Day, before: Day) -> List[EntryID]:
+    searching = timesheet_domain(uid, after, before)
+    return odoo_search(url, db, usr, pwd, "account.analytic.line", searching)
+
+def odoo_get_timesheet_count(url: str, db:str, usr: UserID, pwd: str, uid: UserID, after: Day, before: Day) -> int:
+    searching = timesheet_domain(uid, after, before)
+    return odoo_search_count(url, db, usr, pwd, "account.analytic.line", searching)
+
+def odoo_get_timesheet_groups(url: str, db:str, usr: UserID, pwd: str, uid: UserID, after: Day, before: Day, groupby: List[str]) -> JSONList:
+    logg.debug("groups %s .. %s (groupby %s)", strDate(after), strDate(before), groupby)
+    searching = timesheet_domain(uid, after, before)
+    # read_group(domain, fields, groupby, offset, limit, orderby, lazy) - not lazy to get all groupby levels at once
+    info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "account.analytic.line", "read_group", searching,
+                     ["unit_amount:sum"], groupby, 0, None, False, False)
+    return cast(JSONList, info)
 
-def odoo_get_timesheet_record(url: str, db:str, usr: UserID, pwd: str, uid: UserID, proj_id: ProjREF, task_id: TaskREF, entry_date: Optional[Day] = None) -> JSONList:
+def odoo_get_timesheet_record(url: str, db:str, usr: UserID, pwd: str, uid: UserID, proj_id: ProjREF, task_id: TaskREF, entry_date: Optional[Day] = None, fields: Optional[List[str]] = None) -> JSONList:
     dateref = datetime.date.today().strftime("%Y-%m-%d")
     # logg.debug("date ref = %s", dateref)
     if entry_date:
@@ -177,7 +502,8 @@ def odoo_get_timesheet_record(url: str, db:str, usr: UserID, pwd: str, uid: User
             ["user_id", "=", uid]
         ]
 
-    info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "account.analytic.line", "search_read", searching, [])
+    info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "account.analytic.line", "search_read", searching,
+                     TIMESHEET_FIELDS if fields is None else fields)
     return info
 
 
@@ -224,6 +550,18 @@ def odoo_delete_timesheet_record(url: str, db:str, usr: UserID, pwd: str, uid: U
     info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "account.analytic.line", "unlink", args)
     return info
 
+def odoo_add_timesheet_records(url: str, db:str, usr: UserID, pwd: str, vals_list: JSONList) -> List[EntryID]:
+    info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "account.analytic.line", "create", vals_list)
+    return cast(List[EntryID], info)
+
+def odoo_write_timesheet_records(url: str, db:str, usr: UserID, pwd: str, entry_ids: List[EntryID], vals: JSONDict) -> bool:
+    info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "account.analytic.line", "write", entry_ids, vals)
+    return cast(bool, info)
+
+def odoo_delete_timesheet_records(url: str, db:str, usr: UserID, pwd: str, entry_ids: List[EntryID]) -> bool:
+    info = odoo_call(F"{url}{JSONRPC}", "object", "execute", db, usr, pwd, "account.analytic.line", "unlink", entry_ids)
+    return cast(bool, info)
+
 
 
 # https://www.odoo.com/documentation/10.0/api_integration.html
@@ -253,12 +591,254 @@ class OdooConfig:
         self.user = user
         return self
 
+class TimesheetEntry(DataItem):
+    """ a timesheet record with the keys of Odoo.timesheet_entry() as attributes - it takes less
+        memory than the dict and tabtotext can print it as it is a DataItem (item["key"] works too) """
+    __slots__ = ["proj_id", "proj_name", "task_id", "task_name", "user_id", "user_name",
+                 "entry_size", "entry_desc", "entry_id", "entry_date"]
+    proj_id: ProjID
+    proj_name: str
+    task_id: TaskID
+    task_name: str
+    user_id: UserID
+    user_name: str
+    entry_size: Num
+    entry_desc: str
+    entry_id: EntryID
+    entry_date: str
+    def __init__(self, proj_id: ProjID = 0, proj_name: str = NIX, task_id: TaskID = 0, task_name: str = NIX,
+                 user_id: UserID = 0, user_name: str = NIX, entry_size: Num = 0., entry_desc: str = NIX,
+                 entry_id: EntryID = 0, entry_date: str = NIX) -> None:
+        self.proj_id = proj_id
+        self.proj_name = proj_name
+        self.task_id = task_id
+        self.task_name = task_name
+        self.user_id = user_id
+        self.user_name = user_name
+        self.entry_size = entry_size
+        self.entry_desc = entry_desc
+        self.entry_id = entry_id
+        self.entry_date = entry_date
+    @staticmethod
+    def from_odoo(item: JSONDict) -> "TimesheetEntry":
+        """ from a search_read record (see Odoo.timesheet_entry) """
+        proj = cast(List[Any], item["project_id"])
+        task = cast(List[Any], item["task_id"])
+        user = cast(List[Any], item["user_id"])
+        return TimesheetEntry(proj[0], proj[1], task[0], task[1], user[0], user[1],
+                              cast(Num, item["unit_amount"]), cast(str, item["name"]),
+                              cast(EntryID, item["id"]), cast(str, item["date"]))
+    @staticmethod
+    def from_dict(item: JSONDict) -> "TimesheetEntry":
+        """ from a timesheet dict - missing keys (e.g. in zeit data) are left empty """
+        return TimesheetEntry(cast(ProjID, item.get("proj_id", 0)), cast(str, item.get("proj_name", NIX)),
+                              cast(TaskID, item.get("task_id", 0)), cast(str, item.get("task_name", NIX)),
+                              cast(UserID, item.get("user_id", 0)), cast(str, item.get("user_name", NIX)),
+                              cast(Num, item.get("entry_size", 0.)), cast(str, item.get("entry_desc", NIX)),
+                              cast(EntryID, item.get("entry_id", 0)), cast(str, item.get("entry_date", NIX)))
+    def get(self, name: str, default: JSONItem = None) -> JSONItem:
+        return cast(JSONItem, getattr(self, name, default))
+    def _asdict(self) -> JSONDict:
+        return dict((name, cast(JSONItem, getattr(self, name))) for name in self.__slots__)
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, TimesheetEntry):
+            return self._asdict() == other._asdict()
+        return NotImplemented
+    def __repr__(self) -> str:
+        return "TimesheetEntry(%s)" % ", ".join("%s=%r" % (name, getattr(self, name)) for name in self.__slots__)
+
+TimesheetItem = Union[JSONDict, TimesheetEntry]
+
+def timesheet_entries(items: Iterable[TimesheetItem]) -> Iterator[TimesheetEntry]:
+    """ TimesheetEntry objects from a mix of entries and timesheet dicts """
+    for item in items:
+        if isinstance(item, TimesheetEntry):
+            yield item
+        else:
+            yield TimesheetEntry.from_dict(item)
+
+class TimesheetChanges(NamedTuple):
+    changed: JSONList  # timesheet entries (created or written since the last sync)
+    deleted: List[EntryID]  # known entry_ids that are not in the timespan anymore
+    synced: str  # the highest write_date seen, to be used as "since" for the next sync
+
+def users_from_odoo(found: JSONList) -> JSONList:
+    return [{"user_id": item["id"], "user_fullname": item["name"], "user_email": item["email"]} for item in found if item["active"]]
+def projects_from_odoo(found: JSONList) -> JSONList:
+    return [{"proj_id": item["id"], "proj_name": item["name"]} for item in found if item["active"]]
+def tasks_from_odoo(found: JSONList) -> JSONList:
+    return [{"task_id": item["id"], "task_name": item["name"],
+             "proj_id": item["project_id"][0], "proj_name": item["project_id"][1],  # type: ignore
+             } for item in found if item["active"]]
+
+def users_index(users: JSONList) -> Dict[str, UserID]:
+    """ user_id by email, by email name (with a trailing "@") and by full name (lowercase, dots for spaces) """
+    index: Dict[str, UserID] = {}
+    for user in users:
+        uid = cast(UserID, user["user_id"])
+        email = user.get("user_email")
+        if isinstance(email, str) and email:
+            index[email.lower().strip()] = uid
+            index[email.lower().strip().split("@", 1)[0] + "@"] = uid
+        fullname = user.get("user_fullname")
+        if isinstance(fullname, str) and fullname:
+            index[fullname.lower().strip().replace(" ", ".")] = uid
+    return index
+def users_index_key(name: str) -> str:
+    if name.endswith("@") or "@" in name:
+        return name.lower().strip()
+    return name.lower().strip().replace(" ", ".")
+def users_matching(users: JSONList, name: str, default: UserID) -> UserID:
+    """ the (last) user_id whose full name matches the wildcard pattern """
+    uid = default
+    named = name.lower().strip().replace(" ", ".")
+    for user in users:
+        if "user_fullname" not in user: continue
+        attr = cast(str, user["user_fullname"])
+        if fnmatch(attr.lower().strip().replace(" ", "."), named):
+            uid = cast(UserID, user["user_id"])
+    return uid
+
+def projtask_index(data: JSONList) -> Tuple[Dict[str, int], Dict[Tuple[str, str], int]]:
+    """ proj_id by proj_name, and task_id by (proj_name, task_name) and by (str(proj_id), task_name) """
+    projindex: Dict[str, int] = {}
+    taskindex: Dict[Tuple[str, str], int] = {}
+    for item in data:
+        proj_name = cast(str, item["proj_name"])
+        task_name = cast(str, item["task_name"])
+        projindex.setdefault(proj_name, cast(int, item["proj_id"]))
+        taskindex.setdefault((proj_name, task_name), cast(int, item["task_id"]))
+        taskindex.setdefault((str(item["proj_id"]), task_name), cast(int, item["task_id"]))
+    return projindex, taskindex
+
+def timesheet_span(after: Day, before: Optional[Day], name: str) -> Day:
+    """ the before-day of the timespan (default today) """
+    before = before or datetime.date.today()
+    if after > before:
+        logg.error("--after=DAY must be --before=DAY")
+        raise OdooException(F"bad timespan for {name}()")
+    return before
+def timesheet_vals(uid: UserID, proj_id: ProjID, task_id: TaskID, date: Day, time: Num, desc: str) -> JSONDict:
+    return {"date": strDate(date), "unit_amount": time, "name": desc,
+            "project_id": proj_id, "task_id": task_id, "user_id": uid}
+def entry_from_odoo(item: JSONDict) -> JSONDict:
+    """ a search_read record of account.analytic.line (see TIMESHEET_FIELDS) """
+    return {"proj_id": item["project_id"][0], "proj_name": item["project_id"][1],  # type: ignore
+            "task_id": item["task_id"][0], "task_name": item["task_id"][1],  # type: ignore
+            "user_id": item["user_id"][0], "user_name": item["user_id"][1],  # type: ignore
+            "entry_size": item["unit_amount"], "entry_desc": item["name"],  # type: ignore
+            "entry_id": item["id"], "entry_date": item["date"],
+            }
+def group_from_odoo(item: JSONDict, after: Day) -> JSONDict:
+    """ a read_group record - the entry_date is the first date of the group within the timespan """
+    start = strDate(after)
+    for term in cast(JSONList, item.get("__domain", [])):
+        if isinstance(term, list) and term[0] == "date" and term[1] == ">=":
+            start = max(start, cast(str, term[2]))
+    proj = item.get("project_id") or [0, NIX]
+    task = item.get("task_id") or [0, NIX]
+    return {"proj_id": proj[0], "proj_name": proj[1],  # type: ignore
+            "task_id": task[0], "task_name": task[1],  # type: ignore
+            "entry_size": item["unit_amount"], "entry_count": item.get("__count", 0),
+            "entry_date": start,
+            }
+
+class OdooCache:
+    """ keeps the search_read results of the master data models in a json file per url+db.
+        After ODOO_CACHE_TTL the records are refreshed by asking for write_date >= last sync,
+        and deleted records are noticed by comparing search_count (and then the id list).
+        The users are also read again when their res.partner (name, email) has changed. """
+    def __init__(self, odoo: "Odoo"):
+        self.odoo = odoo
+        self._data: Optional[Dict[str, JSONDict]] = None
+    @property
+    def filename(self) -> str:
+        name = re.sub(r"[^\w.-]+", "_", F"{self.odoo.url}-{self.odoo.db}".split("://", 1)[-1])
+        return path.join(path.expanduser(ODOO_CACHE), F"{name}.json")
+    def data(self) -> Dict[str, JSONDict]:
+        if self._data is None:
+            self._data = {}
+            if path.exists(self.filename):
+                try:
+                    with open(self.filename) as f:
+                        self._data = json.load(f)
+                except (OSError, ValueError) as e:
+                    logg.warning("could not load %s: %s", self.filename, e)
+        return self._data
+    def save(self) -> None:
+        filename = self.filename
+        os.makedirs(path.dirname(filename), exist_ok=True)
+        tmpfile = F"{filename}.{os.getpid()}.{threading.get_ident()}"
+        with open(tmpfile, "w") as f:
+            json.dump(self.data(), f)
+        os.replace(tmpfile, filename)
+    def records(self, model: str, fields: List[str]) -> JSONList:
+        cached = self.data().get(model)
+        if not cached or cached["fields"] != fields or time.time() - cast(float, cached["checked"]) >= ODOO_CACHE_TTL:
+            self.refresh(model, fields)
+            cached = self.data()[model]
+        return list(cast(Dict[str, JSONDict], cached["records"]).values())
+    def refresh(self, model: str, fields: List[str], full: bool = False) -> JSONDict:
+        odoo = self.odoo
+        anyactive: List[Any] = [["active", "in", [True, False]]]
+        cached = self.data().get(model)
+        partners = NIX
+        if not cached or cached["fields"] != fields or not cached["synced"] or full:
+            if model == "res.users":
+                partners = self.partners_synced(NIX)[1]
+            found = odoo_search_read(odoo.url, odoo.db, odoo.usr, odoo.pwd, model, anyactive, fields + ["write_date"])
+            records = dict((str(item["id"]), item) for item in found)
+            changed, deleted = len(found), 0
+        else:
+            records = cast(Dict[str, JSONDict], cached["records"])
+            synced = cast(str, cached["synced"])
+            # write_date has a resolution of seconds, the records of the last second are read again
+            found = odoo_search_read(odoo.url, odoo.db, odoo.usr, odoo.pwd, model, anyactive + [["write_date", ">=", synced]], fields + ["write_date"])
+            if model == "res.users":
+                user_ids, partners = self.partners_synced(cast(str, cached.get("partners", NIX)))
+                user_ids = [user_id for user_id in user_ids if user_id not in [item["id"] for item in found]]
+                if user_ids:
+                    found += odoo_search_read(odoo.url, odoo.db, odoo.usr, odoo.pwd, model, anyactive + [["id", "in", user_ids]], fields + ["write_date"])
+            changed, deleted = 0, 0
+            for item in found:
+                if records.get(str(item["id"])) != item:
+                    changed += 1
+                records[str(item["id"])] = item
+            if odoo_search_count(odoo.url, odoo.db, odoo.usr, odoo.pwd, model, anyactive) != len(records):
+                ids = set(str(item) for item in odoo_search(odoo.url, odoo.db, odoo.usr, odoo.pwd, model, anyactive))
+                for old in [item for item in records if item not in ids]:
+                    del records[old]
+                    deleted += 1
+        logg.debug("cache %s: %s records (%s changed, %s deleted)", model, len(records), changed, deleted)
+        write_dates = [cast(str, item["write_date"]) for item in records.values() if item.get("write_date")]
+        self.data()[model] = {"fields": fields, "synced": max(write_dates) if write_dates else NIX,
+                              "checked": time.time(), "records": records}
+        if partners:
+            self.data()[model]["partners"] = partners
+        self.save()
+        return {"model": model, "records": len(records), "changed": changed, "deleted": deleted}
+    def partners_synced(self, since: str) -> Tuple[List[int], str]:
+        """ the users whose res.partner was written since then (all on NIX), and the new partner sync time """
+        odoo = self.odoo
+        domain: List[Any] = [["active", "in", [True, False]], ["user_ids", "!=", False]]
+        if since:
+            domain += [["write_date", ">=", since]]
+        found = odoo_search_read(odoo.url, odoo.db, odoo.usr, odoo.pwd, "res.partner", domain, ["user_ids", "write_date"])
+        user_ids = sorted(set(user_id for item in found for user_id in cast(List[int], item["user_ids"])))
+        write_dates = [cast(str, item["write_date"]) for item in found if item.get("write_date")]
+        return user_ids, max(write_dates + [since])
+
 class Odoo:
     def __init__(self, config: Optional[OdooConfig] = None):
         self.config: OdooConfig = config or OdooConfig()
         self.usr: UserID = 0
         self.pwd: str = NIX
         self._projtasklist: Optional[JSONList] = None
+        self._projindex: Dict[str, int] = {}
+        self._taskindex: Dict[Tuple[str, str], int] = {}
+        self._refreshed: Set[str] = set()
+        self._userindex: Optional[Dict[str, UserID]] = None
+        self.cache = OdooCache(self)
         logg.debug("URL %s DB %s", self.url, self.config.db)
         self.user_name: Optional[str] = None
     @property
@@ -274,7 +854,7 @@ class Odoo:
         return self.config.user or ""
     def setup(self) -> UserID:
         username, password = get_username_password(self.url)
-        self.usr = odoo_login(self.url, self.db, username, password)
+        self.usr = odoo_login_cached(self.url, self.db, username, password)
         self.pwd = password
         if self.user:
             self.usr = self.get_user_id(self.user)
@@ -292,81 +872,79 @@ class Odoo:
         return self
     def get_user_id(self, name: str, default: Optional[UserID] = None) -> UserID:
         uid = default or -1
-        users = self.users()
-        if name.endswith("@"):
-            emailname = name.lower().strip()[:-1]
-            for user in users:
-                if "user_email" not in user: continue
-                attr = cast(str, user["user_email"])
-                if attr.lower().strip().split("@", 1)[0] == emailname:
-                    uid = cast(UserID, user["user_id"])
-        elif "@" in name:
-            email = name.lower().strip()
-            for user in users:
-                if "user_email" not in user: continue
-                attr = cast(str, user["user_email"])
-                if attr.lower().strip() == email:
-                    uid = cast(UserID, user["user_id"])
-        elif "*" in name:
-            named = name.lower().strip().replace(" ", ".")
-            for user in users:
-                if "user_fullname" not in user: continue
-                attr = cast(str, user["user_fullname"])
-                if fnmatch(attr.lower().strip().replace(" ", "."), named):
-                    uid = cast(UserID, user["user_id"])
-        else:
-            named = name.lower().strip().replace(" ", ".")
-            for user in users:
-                if "user_fullname" not in user: continue
-                attr = cast(str, user["user_fullname"])
-                if attr.lower().strip().replace(" ", ".") == named:
-                    uid = cast(UserID, user["user_id"])
-        return uid
+        if "*" in name:
+            return users_matching(self.users(), name, uid)
+        return self.userindex().get(users_index_key(name), uid)
+    def userindex(self) -> Dict[str, UserID]:
+        if self._userindex is None:
+            self._userindex = users_index(self.users())
+        return self._userindex
     def users(self) -> JSONList:
         self.from_login()
-        found = odoo_get_users(self.url, self.db, self.usr, self.pwd)
-        return [{"user_id": item["id"], "user_fullname": item["name"], "user_email": item["email"]} for item in found if item["active"]]
+        if ODOO_CACHE_TTL:
+            found = self.cache.records("res.users", ODOO_CACHED["res.users"])
+        else:
+            found = odoo_get_users(self.url, self.db, self.usr, self.pwd)
+        return users_from_odoo(found)
     def projects(self) -> JSONList:
         self.from_login()
-        found = odoo_get_projects(self.url, self.db, self.usr, self.pwd)
-        return [{"proj_id": item["id"], "proj_name": item["name"]} for item in found if item["active"]]
+        if ODOO_CACHE_TTL:
+            found = self.cache.records("project.project", ODOO_CACHED["project.project"])
+        else:
+            found = odoo_get_projects(self.url, self.db, self.usr, self.pwd)
+        return projects_from_odoo(found)
     def projects_tasks(self) -> JSONList:
         self.from_login()
-        found = odoo_get_projects_tasks(self.url, self.db, self.usr, self.pwd)
-        return [{"task_id": item["id"], "task_name": item["name"],
-                 "proj_id": item["project_id"][0], "proj_name": item["project_id"][1],  # type: ignore
-                 } for item in found if item["active"]]
+        if ODOO_CACHE_TTL:
+            found = self.cache.records("project.task", ODOO_CACHED["project.task"])
+        else:
+            found = odoo_get_projects_tasks(self.url, self.db, self.usr, self.pwd)
+        return tasks_from_odoo(found)
     def project_tasks(self, proj_id: ProjREF = 89) -> JSONList:
         found = odoo_get_project_tasks(self.url, self.db, self.usr, self.pwd, proj_id)
-        return [{"task_id": item["id"], "task_name": item["name"],
-                 "proj_id": item["project_id"][0], "proj_name": item["project_id"][1],  # type: ignore
-                 } for item in found if item["active"]]
+        return tasks_from_odoo(found)
+    def refresh(self, full: bool = False) -> JSONList:
+        """ update the cached users, projects and tasks now (full=True fetches all records again) """
+        self.from_login()
+        return [self.cache.refresh(model, fields, full) for model, fields in ODOO_CACHED.items()]
     def projtasklist(self) -> JSONList:
         if self._projtasklist is None:
             data = self.projects_tasks()
             self._projtasklist = data
+            self._projindex, self._taskindex = projtask_index(data)
             return data
         return self._projtasklist
+    def projtasklist_refresh(self, missing: str) -> None:
+        """ a project or task may have been created after the cache was synced - ask once for each missing name """
+        if not ODOO_CACHE_TTL or missing in self._refreshed:
+            return
+        self._refreshed.add(missing)
+        logg.info("refreshing the cached tasks for '%s'", missing)
+        self.cache.refresh("project.task", ODOO_CACHED["project.task"])
+        self._projtasklist = None
+        self.projtasklist()
     def proj_id(self, proj_id: ProjREF) -> int:
         if isinstance(proj_id, int):
             return proj_id
-        projtask = self.projtasklist()
-        for item in projtask:
-            if item["proj_name"] == proj_id:
-                return cast(int, item["proj_id"])
+        self.projtasklist()
+        if proj_id not in self._projindex:
+            self.projtasklist_refresh(proj_id)
+        if proj_id in self._projindex:
+            return self._projindex[proj_id]
         logg.warning("could not resolve proj_id '%s'", proj_id)
         return proj_id  # type: ignore
     def task_id(self, proj_id: ProjREF, task_id: TaskREF) -> int:
         if isinstance(task_id, int):
             return task_id
-        projtask = self.projtasklist()
-        for item in projtask:
-            if str(proj_id) == item["proj_name"] or str(proj_id) == str(item["proj_id"]):
-                if item["task_name"] == task_id:
-                    return cast(int, item["task_id"])
+        self.projtasklist()
+        if (str(proj_id), task_id) not in self._taskindex:
+            self.projtasklist_refresh(F"{proj_id}@{task_id}")
+        if (str(proj_id), task_id) in self._taskindex:
+            return self._taskindex[(str(proj_id), task_id)]
         logg.warning("could not resolve task_id '%s' for proj_id '%s'", task_id, proj_id)
         return task_id  # type: ignore
     def clean(self, rec: JSONDict) -> JSONDict:
+        """ strip extra fields - only needed for records fetched with all fields (fields=[]) """
         for key in list(rec.keys()):
             if key.startswith("display_"):
                 del rec[key]
@@ -378,33 +956,18 @@ class Odoo:
                 del rec[name]
         return rec
     def timesheet_records(self, date: Optional[datetime.date] = None) -> JSONList:
+        return list(self.each_timesheet_records(date))
+    def each_timesheet_records(self, date: Optional[datetime.date] = None) -> Iterator[JSONDict]:
         uid = self.from_login()
-        found = odoo_get_timesheet_records(self.url, self.db, self.usr, self.pwd, uid, date)
-        # logg.info("%s", found)
-        for rec in found:
-            self.clean(rec)
-        if found:
-            logg.debug("%s", found[0])
-        return [{"proj_id": item["project_id"][0], "proj_name": item["project_id"][1],  # type: ignore
-                 "task_id": item["task_id"][0], "task_name": item["task_id"][1],  # type: ignore
-                 "user_id": item["user_id"][0], "user_name": item["user_id"][1],  # type: ignore
-                 "entry_size": item["unit_amount"], "entry_desc": item["name"],  # type: ignore
-                 "entry_id": item["id"], "entry_date": item["date"],
-                 } for item in found]
+        for item in odoo_each_timesheet_records(self.url, self.db, self.usr, self.pwd, uid, date):
+            yield self.timesheet_entry(item)
     def timesheet_record(self, proj: str, task: str, date: Optional[datetime.date] = None) -> JSONList:
         uid = self.from_login()
         found = odoo_get_timesheet_record(self.url, self.db, self.usr, self.pwd, uid, proj, task, date)
         # logg.info("%s", found)
-        for rec in found:
-            self.clean(rec)
         if found:
             logg.debug("%s", found[0])
-        return [{"proj_id": item["project_id"][0], "proj_name": item["project_id"][1],  # type: ignore
-                 "task_id": item["task_id"][0], "task_name": item["task_id"][1],  # type: ignore
-                 "user_id": item["user_id"][0], "user_name": item["user_id"][1],  # type: ignore
-                 "entry_size": item["unit_amount"], "entry_desc": item["name"],  # type: ignore
-                 "entry_id": item["id"], "entry_date": item["date"],
-                 } for item in found]
+        return [self.timesheet_entry(item) for item in found]
     def timesheet_delete(self, entry_id: EntryID) -> bool:
         uid = self.from_login()
         found = odoo_delete_timesheet_record(self.url, self.db, self.usr, self.pwd, uid,  #
@@ -436,29 +999,172 @@ class Odoo:
                                           entry_date=date, entry_size=time, entry_desc=desc)
         logg.info("updated %s", found)
         return found  # bool
+    def batch(self) -> "OdooBatch":
+        return OdooBatch(self)
     def timesheet(self, after: Day, before: Optional[Day] = None) -> JSONList:
-        if not before:
-            before = datetime.date.today()
-        if after > before:
-            logg.error("--after=DAY must be --before=DAY")
-            raise OdooException("bad timespan for timesheet()")
+        return list(self.each_timesheet(after, before))
+    def each_timesheet(self, after: Day, before: Optional[Day] = None) -> Iterator[JSONDict]:
+        for item in self.each_timesheet_items(after, before):
+            yield self.timesheet_entry(item)
+    def timesheet_entries(self, after: Day, before: Optional[Day] = None) -> List["TimesheetEntry"]:
+        return list(self.each_timesheet_entries(after, before))
+    def each_timesheet_entries(self, after: Day, before: Optional[Day] = None) -> Iterator["TimesheetEntry"]:
+        """ like each_timesheet but with compact TimesheetEntry objects instead of dicts """
+        for item in self.each_timesheet_items(after, before):
+            yield TimesheetEntry.from_odoo(item)
+    def each_timesheet_items(self, after: Day, before: Optional[Day] = None) -> Iterator[JSONDict]:
+        """ the records as returned from search_read (see timesheet_entry) """
+        before = timesheet_span(after, before, "timesheet")
         timespan = before - after
         if timespan.days > 63:
             logg.warning("--after=%s --before=%s is %s days", after.isoformat(), before.isoformat(), timespan.days + 1)
         else:
             logg.info("--after=%s --before=%s is %s days", after.isoformat(), before.isoformat(), timespan.days + 1)
+        if ODOO_PERDAY:
+            for item in self.each_timesheet_perday(after, before):
+                yield item
+        else:
+            for item in self.each_timesheet_range(after, before):
+                yield item
+    def each_timesheet_perday(self, after: Day, before: Day) -> Iterator[JSONDict]:
+        uid = self.from_login()
         ondate = after
-        records: JSONList = []
         for attempt in range(366):
             logg.debug("ondate %s   (after %s before %s)", ondate.isoformat(), after.isoformat(), before.isoformat())
-            found = self.timesheet_records(ondate)
-            if found:
-                for record in found:
-                    records.append(record)
+            for item in odoo_each_timesheet_records(self.url, self.db, self.usr, self.pwd, uid, ondate):
+                yield item
             if ondate == before:
                 break
             ondate += datetime.timedelta(days=1)
-        return records
+    def each_timesheet_range(self, after: Day, before: Day) -> Iterator[JSONDict]:
+        uid = self.from_login()
+        offset = 0
+        for attempt in range(MAXROUNDS):
+            found = 0
+            for item in odoo_each_timesheet_range(self.url, self.db, self.usr, self.pwd, uid, after, before, offset, LIMIT):
+                found += 1
+                yield item
+            logg.debug("range %s .. %s => %s records (offset %s)", after.isoformat(), before.isoformat(), found, offset)
+            if not LIMIT or found < LIMIT:
+                break
+            offset += LIMIT
+        else:
+            logg.warning("range %s .. %s stopped after %s rounds of %s records - the rest is not read", after.isoformat(), before.isoformat(), MAXROUNDS, LIMIT)
+    def timesheet_changes(self, after: Day, before: Optional[Day] = None, since: str = NIX, known: Iterable[EntryID] = ()) -> TimesheetChanges:
+        """ the entries written since the last sync (all entries if no since-watermark is given) and
+            the known entry_ids that have been deleted (or moved out of the timespan) in the meantime """
+        before = before or datetime.date.today()
+        uid = self.from_login()
+        fields = TIMESHEET_FIELDS + ["write_date"]
+        changed: JSONList = []
+        synced = since
+        offset = 0
+        complete = True
+        for attempt in range(MAXROUNDS):
+            found = odoo_get_timesheet_range(self.url, self.db, self.usr, self.pwd, uid, after, before, offset, LIMIT, fields, since)
+            for item in found:
+                synced = max(synced, cast(str, item["write_date"]))
+                changed.append(self.timesheet_entry(item))
+            if not LIMIT or len(found) < LIMIT:
+                break
+            offset += LIMIT
+        else:
+            logg.warning("changes %s .. %s stopped after %s rounds of %s records - the rest is not read", after.isoformat(), before.isoformat(), MAXROUNDS, LIMIT)
+            complete = False
+        knownids = set(known)
+        changedids = set(cast(EntryID, item["entry_id"]) for item in changed)
+        if not since and complete:
+            deleted = knownids - changedids
+        elif not since:  # the unread entries are not deleted
+            deleted = knownids - set(odoo_get_timesheet_ids(self.url, self.db, self.usr, self.pwd, uid, after, before))
+        else:
+            deleted = set()
+            if odoo_get_timesheet_count(self.url, self.db, self.usr, self.pwd, uid, after, before) != len(knownids | changedids):
+                deleted = knownids - set(odoo_get_timesheet_ids(self.url, self.db, self.usr, self.pwd, uid, after, before))
+        logg.debug("changes %s .. %s since '%s' => %s changed, %s deleted", after.isoformat(), before.isoformat(), since, len(changed), len(deleted))
+        return TimesheetChanges(changed, sorted(deleted), synced)
+    def timesheet_groups(self, after: Day, before: Optional[Day] = None, groupby: Optional[List[str]] = None) -> JSONList:
+        """ sum of entry_size per project, task and month (or as given in groupby) computed by the server.
+            The entry_date is the first date of the group within the timespan. """
+        before = timesheet_span(after, before, "timesheet_groups")
+        uid = self.from_login()
+        found = odoo_get_timesheet_groups(self.url, self.db, self.usr, self.pwd, uid, after, before, groupby or GROUPBY)
+        logg.debug("groups %s .. %s => %s groups", after.isoformat(), before.isoformat(), len(found))
+        return [self.timesheet_group(item, after) for item in found]
+    def timesheet_group(self, item: JSONDict, after: Day) -> JSONDict:
+        return group_from_odoo(item, after)
+    def timesheet_entry(self, item: JSONDict) -> JSONDict:
+        return entry_from_odoo(item)
+
+class OdooQueue:
+    """ the timesheet changes of a batch - each queued change returns its index into the results list.
+        The changes are sent with a few create/write/unlink calls (see calls and done). """
+    def __init__(self) -> None:
+        self.queued = 0
+        self.creates: List[Tuple[int, JSONDict]] = []
+        self.writes: Dict[str, Tuple[JSONDict, List[Tuple[int, EntryID]]]] = {}
+        self.deletes: List[Tuple[int, EntryID]] = []
+    def queue_create(self, vals: JSONDict) -> int:
+        self.creates.append((self.queued, vals))
+        self.queued += 1
+        return self.queued - 1
+    def queue_write(self, entry_id: EntryID, vals: JSONDict) -> int:
+        key = json.dumps(vals, sort_keys=True)
+        if key not in self.writes:
+            self.writes[key] = (vals, [])
+        self.writes[key][1].append((self.queued, entry_id))
+        self.queued += 1
+        return self.queued - 1
+    def queue_delete(self, entry_id: EntryID) -> int:
+        self.deletes.append((self.queued, entry_id))
+        self.queued += 1
+        return self.queued - 1
+    def calls(self) -> List[Tuple[str, List[Any], List[int]]]:
+        """ the account.analytic.line method and args for each call, with the queued indexes that it answers """
+        calls: List[Tuple[str, List[Any], List[int]]] = []
+        for start in range(0, len(self.creates), LIMIT or len(self.creates)):
+            creates = self.creates[start:start + (LIMIT or len(self.creates))]
+            calls.append(("create", [[vals for queued, vals in creates]], [queued for queued, vals in creates]))
+        for vals, writes in self.writes.values():
+            calls.append(("write", [[entry_id for queued, entry_id in writes], vals], [queued for queued, entry_id in writes]))
+        for start in range(0, len(self.deletes), LIMIT or len(self.deletes)):
+            deletes = self.deletes[start:start + (LIMIT or len(self.deletes))]
+            calls.append(("unlink", [[entry_id for queued, entry_id in deletes]], [queued for queued, entry_id in deletes]))
+        return calls
+    def done(self, calls: List[Tuple[str, List[Any], List[int]]], replies: List[Any]) -> List[Any]:
+        """ the results in the order of the queued changes (the new entry_id of a create) - the queue is empty again """
+        results: List[Any] = [None] * self.queued
+        for (method, args, queued), reply in zip(calls, replies):
+            logg.info("%s %s", {"create": "created", "write": "written", "unlink": "deleted"}[method], reply)
+            for num, index in enumerate(queued):
+                results[index] = reply[num] if method == "create" else reply
+        self.queued = 0
+        self.creates = []
+        self.writes = {}
+        self.deletes = []
+        return results
+
+class OdooBatch(OdooQueue):
+    """ collects timesheet changes to send them with a few calls at flush() time.
+        Each queued change returns its index into the results list of flush(). """
+    def __init__(self, odoo: Odoo):
+        OdooQueue.__init__(self)
+        self.odoo = odoo
+    def vals(self, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> JSONDict:
+        uid = self.odoo.from_login()
+        return timesheet_vals(uid, self.odoo.proj_id(proj), self.odoo.task_id(proj, task), date, time, desc)
+    def timesheet_create(self, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> int:
+        return self.queue_create(self.vals(proj, task, date, time, desc))
+    def timesheet_write(self, entry_id: EntryID, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> int:
+        return self.queue_write(entry_id, self.vals(proj, task, date, time, desc))
+    def timesheet_delete(self, entry_id: EntryID) -> int:
+        return self.queue_delete(entry_id)
+    def flush(self) -> List[Any]:
+        odoo = self.odoo
+        calls = self.calls()
+        replies = [odoo_call(F"{odoo.url}{JSONRPC}", "object", "execute", odoo.db, odoo.usr, odoo.pwd,
+                             "account.analytic.line", method, *args) for method, args, queued in calls]
+        return self.done(calls, replies)
 
 ###########################################################################################
 def run(arg: str) -> None:
@@ -0,0 +1,706 @@
+#! /usr/bin/env python3
+
+__copyright__ = "(C) 2021-2025 Guido Draheim, licensed under the Apache License 2.0"""
+__version__ = "1.1.4023"
+
+import odoo2data_api as odoo_api
+import dotnetrc
+from typing import Optional, Any, List, Dict, Tuple, cast
+from tabtotext import JSONList, JSONDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import datetime
+import json
+import io
+import time
+import urllib.error
+import urllib.request
+
+import os
+import sys
+import unittest
+import tempfile
+import os.path as path
+from fnmatch import fnmatchcase as fnmatch
+
+import logging
+logg = logging.getLogger("TEST")
+
+Day = datetime.date
+
+STANDIN_USER = "admin"
+STANDIN_PASS = "secret"
+STANDIN_UID = 2
+STANDIN_DB = "standin-db"
+
+class OdooStandinDB:
+    """ an in-memory database answering the /jsonrpc calls of odoo2data_api """
+    def __init__(self) -> None:
+        self.users: Dict[int, str] = {STANDIN_UID: "Max Mustermann", 7: "Erika Musterfrau"}
+        self.emails: Dict[int, str] = {STANDIN_UID: "max@example.com", 7: "erika@example.com"}
+        self.projects: Dict[int, str] = {11: "Project-1", 12: "MGMT"}
+        self.tasks: Dict[int, Tuple[int, str]] = {21: (11, "Developments"), 22: (12, "Project Management")}
+        self.lines: Dict[int, JSONDict] = {}
+        self.write_dates: Dict[Tuple[str, int], str] = {}  # for users, projects, tasks
+        self.next_id = 100
+        self.calls: List[Tuple[str, str, str]] = []  # (service, model, method)
+        self.connections = 0
+        self.dropping = False  # close the connection without telling the client
+        self.unavailable = 0  # the next requests get a "503 Service Unavailable"
+        self.gateway = 0  # the next requests are done but get a "502 Bad Gateway"
+        self.proxied = 0  # requests with an absolute url (as sent to a proxy)
+        self.lock = threading.Lock()
+    def add(self, date: str, size: float, desc: str, task: int = 21, user: int = STANDIN_UID) -> int:
+        proj = self.tasks[task][0]
+        self.next_id += 1
+        self.lines[self.next_id] = {
+            "id": self.next_id, "date": date, "unit_amount": size, "name": desc,
+            "project_id": [proj, self.projects[proj]], "task_id": [task, self.tasks[task][1]],
+            "user_id": [user, self.users[user]], "display_name": desc, "write_date": date + " 12:00:00"}
+        return self.next_id
+    def count(self, model: str, method: str) -> int:
+        return len([call for call in self.calls if call[1] == model and call[2] == method])
+    def records(self, model: str) -> JSONList:
+        if model == "res.users":
+            return [{"id": uid, "name": name, "email": self.emails[uid], "active": True,
+                     "write_date": self.write_dates.get((model, uid), "2021-12-01 12:00:00")} for uid, name in self.users.items()]
+        if model == "project.project":
+            return [{"id": pid, "name": name, "active": True,
+                     "write_date": self.write_dates.get((model, pid), "2021-12-01 12:00:00")} for pid, name in self.projects.items()]
+        if model == "project.task":
+            return [{"id": tid, "name": task[1], "active": True, "project_id": [task[0], self.projects[task[0]]],
+                     "write_date": self.write_dates.get((model, tid), "2021-12-01 12:00:00")} for tid, task in self.tasks.items()]
+        if model == "res.partner":
+            return [{"id": 1000 + uid, "user_ids": [uid], "active": True,
+                     "write_date": self.write_dates.get((model, uid), "2021-12-01 12:00:00")} for uid in self.users]
+        return list(self.lines.values())
+    def matches(self, record: JSONDict, domain: List[Any]) -> bool:
+        for term in domain:
+            if not isinstance(term, list):
+                continue  # "&" is the default anyway
+            field, op, value = term
+            have = record.get(field, False)
+            if isinstance(have, list):
+                have = have[0]
+            if op == "=" and not have == value: return False
+            if op == "!=" and not have != value: return False
+            if op == ">=" and not have >= value: return False
+            if op == "<=" and not have <= value: return False
+            if op == ">" and not have > value: return False
+            if op == "<" and not have < value: return False
+            if op == "in" and have not in value: return False
+        return True
+    def sortkey(self, value: Any) -> str:
+        if isinstance(value, int):
+            return "%09i" % value
+        return str(value)
+    def search_read(self, model: str, domain: List[Any], fields: Optional[List[str]] = None,
+                    offset: int = 0, limit: Optional[int] = None, order: Optional[str] = None) -> JSONList:
+        found = [record for record in self.records(model) if self.matches(record, domain)]
+        if not order:
+            order = "date desc, id desc" if model == "account.analytic.line" else "id asc"
+        for part in reversed(order.split(",")):
+            name, *direction = part.split()
+            found.sort(key=lambda rec: self.sortkey(rec[name]), reverse=(direction == ["desc"]))
+        found = found[offset:]
+        if limit:
+            found = found[:limit]
+        if fields:
+            found = [dict((name, rec[name]) for name in ["id"] + fields if name in rec) for rec in found]
+        return [dict(rec) for rec in found]
+    def read_group(self, model: str, domain: List[Any], fields: List[str], groupby: List[str],
+                   offset: int = 0, limit: Optional[int] = None, orderby: Any = False, lazy: bool = True) -> JSONList:
+        groups: Dict[Tuple[str, ...], JSONDict] = {}
+        for record in self.search_read(model, domain, order="date asc, id asc"):
+            key: List[str] = []
+            group: JSONDict = {}
+            section: List[Any] = []
+            for name in groupby:
+                field, _, interval = name.partition(":")
+                value = record[field]
+                if interval in ["month", "day"]:
+                    start = Day.fromisoformat(cast(str, value))
+                    if interval == "month":
+                        start = start.replace(day=1)
+                        end = (start + datetime.timedelta(days=31)).replace(day=1)
+                    else:
+                        end = start + datetime.timedelta(days=1)
+                    group[name] = start.strftime("%B %Y" if interval == "month" else "%d %b %Y")
+                    section += [[field, ">=", start.isoformat()], [field, "<", end.isoformat()]]
+                    key.append(start.isoformat())
+                else:
+                    group[field] = value
+                    section += [[field, "=", cast(List[Any], value)[0]]]
+                    key.append(str(value))
+            if tuple(key) not in groups:
+                groups[tuple(key)] = dict(group, unit_amount=0, __count=0, __domain=["&"] + section + domain)
+            groups[tuple(key)]["unit_amount"] += record["unit_amount"]  # type: ignore[operator]
+            groups[tuple(key)]["__count"] += 1  # type: ignore[operator]
+        return list(groups.values())
+    def vals(self, vals: JSONDict, record: Optional[JSONDict] = None) -> JSONDict:
+        record = record or {}
+        for name, value in vals.items():
+            if name == "project_id":
+                record[name] = [value, self.projects[value]]  # type: ignore[index]
+            elif name == "task_id":
+                record[name] = [value, self.tasks[value][1]]  # type: ignore[index]
+            elif name == "user_id":
+                record[name] = [value, self.users[value]]  # type: ignore[index]
+            else:
+                record[name] = value
+        return record
+    def execute(self, model: str, method: str, *args: Any) -> Any:
+        if method == "search_read":
+            return self.search_read(model, *args)
+        if method == "read_group":
+            return self.read_group(model, *args)
+        if method == "search":
+            return [record["id"] for record in self.search_read(model, args[0])]
+        if method == "search_count":
+            return len(self.search_read(model, args[0]))
+        if method == "create":
+            if isinstance(args[0], list):
+                return [self.execute(model, method, vals) for vals in args[0]]
+            self.next_id += 1
+            self.lines[self.next_id] = self.vals(args[0], {"id": self.next_id})
+            return self.next_id
+        if method == "write":
+            for entry_id in args[0]:
+                self.vals(args[1], self.lines[entry_id])
+            return True
+        if method == "unlink":
+            for entry_id in args[0]:
+                del self.lines[entry_id]
+            return True
+        raise Exception(f"unknown method {model}.{method}")
+    def call(self, service: str, method: str, args: List[Any]) -> Any:
+        with self.lock:
+            if service == "common" and method == "login":
+                self.calls.append((service, "", method))
+                db, username, password = args
+                if username == STANDIN_USER and password == STANDIN_PASS:
+                    return STANDIN_UID
+                return False
+            if service == "object" and method == "execute":
+                db, uid, password, model, modelmethod = args[:5]
+                self.calls.append((service, model, modelmethod))
+                if uid != STANDIN_UID or password != STANDIN_PASS:
+                    raise Exception("Access Denied")
+                return self.execute(model, modelmethod, *args[5:])
+            raise Exception(f"unknown service {service}.{method}")
+
+class OdooStandin(BaseHTTPRequestHandler):
+    db: OdooStandinDB
+    protocol_version = "HTTP/1.1"
+    def setup(self) -> None:
+        BaseHTTPRequestHandler.setup(self)
+        with self.db.lock:
+            self.db.connections += 1
+    def do_POST(self) -> None:
+        size = int(self.headers.get("Content-Length", "0"))
+        data = json.loads(self.rfile.read(size).decode("utf-8"))
+        if self.path.startswith("http:"):
+            with self.db.lock:
+                self.db.proxied += 1
+        if self.db.unavailable:
+            self.db.unavailable -= 1
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        params = data["params"]
+        try:
+            reply = {"jsonrpc": "2.0", "id": data["id"], "result": self.db.call(params["service"], params["method"], params["args"])}
+        except Exception as e:
+            reply = {"jsonrpc": "2.0", "id": data["id"], "error": {"message": str(e)}}
+        if self.db.gateway:
+            self.db.gateway -= 1
+            self.send_response(502)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        text = json.dumps(reply).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(text)))
+        self.end_headers()
+        self.wfile.write(text)
+        if self.db.dropping:
+            self.close_connection = True
+    def log_message(self, format: str, *args: Any) -> None:
+        logg.debug("standin: " + format, *args)
+
+class odoo2data_apiTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.saved_limit = odoo_api.LIMIT
+        self.saved_maxrounds = odoo_api.MAXROUNDS
+        self.saved_perday = odoo_api.ODOO_PERDAY
+        self.saved_keepalive = odoo_api.ODOO_KEEPALIVE
+        self.saved_streamchunk = odoo_api.STREAMCHUNK
+        self.saved_cache = odoo_api.ODOO_CACHE
+        self.saved_cache_ttl = odoo_api.ODOO_CACHE_TTL
+        self.saved_login_ttl = odoo_api.ODOO_LOGIN_TTL
+        odoo_api._logins.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        odoo_api.ODOO_CACHE = path.join(self.tmp.name, "cache")
+        odoo_api.ODOO_CACHE_TTL = 0
+        self.db = OdooStandinDB()
+        handler = type("Handler", (OdooStandin,), {"db": self.db})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = "http://127.0.0.1:%i" % self.server.server_address[1]
+        dotnetrc.set_username_password(STANDIN_USER, STANDIN_PASS)
+    def tearDown(self) -> None:
+        odoo_api.json_rpc_close()
+        self.server.shutdown()
+        self.server.server_close()
+        odoo_api.LIMIT = self.saved_limit
+        odoo_api.MAXROUNDS = self.saved_maxrounds
+        odoo_api.ODOO_PERDAY = self.saved_perday
+        odoo_api.ODOO_KEEPALIVE = self.saved_keepalive
+        odoo_api.STREAMCHUNK = self.saved_streamchunk
+        odoo_api.ODOO_CACHE = self.saved_cache
+        odoo_api.ODOO_CACHE_TTL = self.saved_cache_ttl
+        odoo_api.ODOO_LOGIN_TTL = self.saved_login_ttl
+        odoo_api._logins.clear()
+        self.tmp.cleanup()
+    def odoo(self) -> odoo_api.Odoo:
+        return odoo_api.Odoo(odoo_api.OdooConfig(self.url, STANDIN_DB))
+    def test_101(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        self.db.add("2022-01-04", 2.0, "dev1 continued")
+        self.db.add("2022-02-01", 3.0, "dev1 too late")
+        data = self.odoo().timesheet(Day(2022, 1, 1), Day(2022, 1, 31))
+        logg.info("data = %s", data)
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[0]["entry_desc"], "dev1 started")
+        self.assertEqual(data[0]["proj_name"], "Project-1")
+        self.assertEqual(data[0]["task_name"], "Developments")
+        self.assertEqual(data[1]["entry_size"], 2.0)
+        self.assertEqual(self.db.count("account.analytic.line", "search_read"), 1)
+    def test_102(self) -> None:
+        for day in range(1, 29):
+            self.db.add("2022-02-%02i" % day, 1.0, "dev1 day %i" % day)
+        odoo_api.LIMIT = 10
+        data = self.odoo().timesheet(Day(2022, 2, 1), Day(2022, 2, 28))
+        self.assertEqual(len(data), 28)
+        self.assertEqual([item["entry_date"] for item in data], ["2022-02-%02i" % day for day in range(1, 29)])
+        self.assertEqual(self.db.count("account.analytic.line", "search_read"), 3)
+    def test_103(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        self.db.add("2022-01-03", 0.5, "mgmt meeting", task=22)
+        self.db.add("2022-01-05", 2.0, "dev1 continued")
+        self.db.add("2022-01-05", 4.0, "dev1 other user", user=7)
+        ranged = self.odoo().timesheet(Day(2022, 1, 1), Day(2022, 1, 7))
+        odoo_api.ODOO_PERDAY = True
+        perday = self.odoo().timesheet(Day(2022, 1, 1), Day(2022, 1, 7))
+        self.assertEqual(ranged, perday)
+        self.assertEqual(len(ranged), 3)
+        self.assertEqual(self.db.count("account.analytic.line", "search_read"), 1 + 7)
+    def test_104(self) -> None:
+        known = [self.db.add("2022-02-%02i" % day, 1.0, "dev1 day %i" % day) for day in range(1, 6)]
+        odoo_api.LIMIT = 2
+        odoo_api.MAXROUNDS = 2
+        odoo = self.odoo()
+        with self.assertLogs(odoo_api.logg, logging.WARNING) as logs:
+            data = odoo.timesheet(Day(2022, 2, 1), Day(2022, 2, 28))
+            changes = odoo.timesheet_changes(Day(2022, 2, 1), Day(2022, 2, 28), known=known)
+        self.assertEqual(len(data), 4)
+        self.assertEqual(len(changes.changed), 4)
+        self.assertEqual(changes.deleted, [])  # the fifth entry was not read but it is not deleted
+        self.assertIn("stopped after 2 rounds of 2 records", logs.output[0])
+        self.assertEqual(len(logs.output), 2)
+    def test_201(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        odoo = self.odoo()
+        users = odoo.users()
+        projects = odoo.projects()
+        data = odoo.timesheet(Day(2022, 1, 1), Day(2022, 1, 31))
+        self.assertEqual(len(users), 2)
+        self.assertEqual(len(projects), 2)
+        self.assertEqual(len(data), 1)
+        self.assertEqual(len(self.db.calls), 4)
+        self.assertEqual(self.db.connections, 1)
+    def test_202(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        odoo_api.ODOO_KEEPALIVE = False
+        odoo = self.odoo()
+        users = odoo.users()
+        projects = odoo.projects()
+        data = odoo.timesheet(Day(2022, 1, 1), Day(2022, 1, 31))
+        self.assertEqual(len(self.db.calls), 4)
+        self.assertEqual(self.db.connections, 4)
+    def test_203(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        self.db.dropping = True
+        odoo = self.odoo()
+        users = odoo.users()
+        projects = odoo.projects()
+        data = odoo.timesheet(Day(2022, 1, 1), Day(2022, 1, 31))
+        self.assertEqual(len(data), 1)
+        self.assertEqual(len(self.db.calls), 4)
+        self.assertEqual(self.db.connections, 4)
+    def test_204(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        saved = dict(os.environ)
+        try:
+            for name in ["http_proxy", "HTTP_PROXY", "no_proxy", "NO_PROXY"]:
+                os.environ.pop(name, None)
+            os.environ["http_proxy"] = self.url  # the standin answers as the proxy of the odoo host
+            urllib.request.install_opener(None)  # the default opener did read the proxies of its time
+            odoo = odoo_api.Odoo(odoo_api.OdooConfig("http://odoo.example.invalid", STANDIN_DB))
+            data = odoo.timesheet(Day(2022, 1, 1), Day(2022, 1, 31))
+            self.assertTrue(odoo_api.json_proxy("http://odoo.example.invalid/jsonrpc"))
+            os.environ["no_proxy"] = "odoo.example.invalid"
+            self.assertFalse(odoo_api.json_proxy("http://odoo.example.invalid/jsonrpc"))
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+            urllib.request.install_opener(None)
+        self.assertEqual(len(data), 1)
+        self.assertEqual(self.db.proxied, len(self.db.calls))
+    def test_301(self) -> None:
+        old1 = self.db.add("2022-01-03", 1.5, "dev1 started")
+        old2 = self.db.add("2022-01-04", 2.5, "dev1 continued")
+        old3 = self.db.add("2022-01-05", 0.5, "dev1 finished")
+        odoo = self.odoo()
+        batch = odoo.batch()
+        new1 = batch.timesheet_create("Project-1", "Developments", Day(2022, 1, 10), 1.0, "dev2 started")
+        upd2 = batch.timesheet_write(old2, "MGMT", "Project Management", Day(2022, 1, 4), 2.0, "mgmt call")
+        del3 = batch.timesheet_delete(old3)
+        new2 = batch.timesheet_create("MGMT", "Project Management", Day(2022, 1, 11), 3.0, "mgmt meeting")
+        self.assertEqual(self.db.count("account.analytic.line", "create"), 0)
+        done = batch.flush()
+        self.assertEqual(len(done), 4)
+        self.assertEqual(self.db.count("account.analytic.line", "create"), 1)
+        self.assertEqual(self.db.count("account.analytic.line", "write"), 1)
+        self.assertEqual(self.db.count("account.analytic.line", "unlink"), 1)
+        self.assertIn(done[new1], self.db.lines)
+        self.assertIn(done[new2], self.db.lines)
+        self.assertEqual(self.db.lines[done[new1]]["name"], "dev2 started")
+        self.assertEqual(self.db.lines[done[new2]]["name"], "mgmt meeting")
+        self.assertEqual(done[upd2], True)
+        self.assertEqual(done[del3], True)
+        self.assertEqual(self.db.lines[old2]["task_id"], [22, "Project Management"])
+        self.assertNotIn(old3, self.db.lines)
+        self.assertIn(old1, self.db.lines)
+    def test_302(self) -> None:
+        old = [self.db.add("2022-01-%02i" % day, 1.0, f"dev{day} started") for day in range(3, 8)]
+        odoo = self.odoo()
+        batch = odoo.batch()
+        for entry_id in old[:3]:
+            batch.timesheet_write(entry_id, "MGMT", "Project Management", Day(2022, 1, 3), 2.0, "mgmt call")
+        for entry_id in old[3:]:
+            batch.timesheet_write(entry_id, "Project-1", "Developments", Day(2022, 1, 4), 2.0, "dev call")
+        done = batch.flush()
+        self.assertEqual(done, [True] * 5)
+        self.assertEqual(self.db.count("account.analytic.line", "write"), 2)
+        self.assertEqual(batch.flush(), [])
+        self.assertEqual(self.db.count("account.analytic.line", "write"), 2)
+    def test_303(self) -> None:
+        odoo_api.LIMIT = 10
+        odoo = self.odoo()
+        batch = odoo.batch()
+        for day in range(1, 26):
+            batch.timesheet_create("Project-1", "Developments", Day(2022, 1, day), 1.0, f"dev{day} started")
+        done = batch.flush()
+        self.assertEqual(len(done), 25)
+        self.assertEqual(len(set(done)), 25)
+        self.assertEqual(self.db.count("account.analytic.line", "create"), 3)
+        data = odoo.timesheet(Day(2022, 1, 1), Day(2022, 1, 31))
+        self.assertEqual(len(data), 25)
+    def test_401(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        self.db.add("2022-01-04", 2.5, "dev1 continued")
+        self.db.add("2022-01-04", 1.0, "mgmt call", task=22)
+        self.db.add("2022-02-07", 0.5, "dev1 finished")
+        self.db.add("2022-02-08", 2.0, "dev2 started", user=7)
+        odoo = self.odoo()
+        data = odoo.timesheet_groups(Day(2022, 1, 2), Day(2022, 2, 28))
+        logg.info("groups %s", data)
+        self.assertEqual(self.db.count("account.analytic.line", "read_group"), 1)
+        self.assertEqual(self.db.count("account.analytic.line", "search_read"), 0)
+        sums = dict(((item["proj_name"], item["task_name"], item["entry_date"]), item["entry_size"]) for item in data)
+        self.assertEqual(sums, {("Project-1", "Developments", "2022-01-02"): 4.0,
+                                ("MGMT", "Project Management", "2022-01-02"): 1.0,
+                                ("Project-1", "Developments", "2022-02-01"): 0.5})
+        counts = [item["entry_count"] for item in data]
+        self.assertEqual(counts, [2, 1, 1])
+    def test_402(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        self.db.add("2022-01-04", 2.5, "dev1 continued")
+        self.db.add("2022-01-04", 1.0, "mgmt call", task=22)
+        odoo = self.odoo()
+        data = odoo.timesheet_groups(Day(2022, 1, 1), Day(2022, 1, 31), ["date:day"])
+        sums = dict((item["entry_date"], item["entry_size"]) for item in data)
+        self.assertEqual(sums, {"2022-01-03": 1.5, "2022-01-04": 3.5})
+        self.assertEqual(data[0]["proj_name"], "")
+    def test_501(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        self.db.add("2022-01-04", 2.5, "dev1 continued")
+        odoo = self.odoo()
+        uid = odoo.from_login()
+        found = odoo_api.odoo_get_timesheet_range(odoo.url, odoo.db, odoo.usr, odoo.pwd, uid, Day(2022, 1, 1), Day(2022, 1, 31))
+        self.assertEqual(len(found), 2)
+        self.assertEqual(sorted(found[0].keys()), sorted(["id"] + odoo_api.TIMESHEET_FIELDS))
+        found = odoo_api.odoo_get_timesheet_records(odoo.url, odoo.db, odoo.usr, odoo.pwd, uid, Day(2022, 1, 3))
+        self.assertEqual(len(found), 1)
+        self.assertEqual(sorted(found[0].keys()), sorted(["id"] + odoo_api.TIMESHEET_FIELDS))
+        found = odoo_api.odoo_get_timesheet_records(odoo.url, odoo.db, odoo.usr, odoo.pwd, uid, Day(2022, 1, 3), fields=[])
+        self.assertIn("write_date", found[0])
+        found = odoo_api.odoo_get_timesheet_record(odoo.url, odoo.db, odoo.usr, odoo.pwd, uid, 11, 21, fields=["date"])
+        self.assertEqual(sorted(found[0].keys()), ["date", "id"])
+        data = odoo.timesheet(Day(2022, 1, 1), Day(2022, 1, 31))
+        self.assertEqual(data[0]["entry_desc"], "dev1 started")
+        self.assertEqual(data[1]["entry_desc"], "dev1 continued")
+    def test_601(self) -> None:
+        odoo = self.odoo()
+        self.assertEqual(odoo.proj_id("Project-1"), 11)
+        self.assertEqual(odoo.proj_id("MGMT"), 12)
+        self.assertEqual(odoo.proj_id(12), 12)
+        self.assertEqual(odoo.task_id("Project-1", "Developments"), 21)
+        self.assertEqual(odoo.task_id(12, "Project Management"), 22)
+        self.assertEqual(odoo.task_id("12", "Project Management"), 22)
+        self.assertEqual(odoo.task_id("MGMT", 22), 22)
+        self.assertEqual(odoo.proj_id("Unknown"), "Unknown")
+        self.assertEqual(odoo.task_id("MGMT", "Developments"), "Developments")
+        self.assertEqual(self.db.count("project.task", "search_read"), 1)
+    def test_602(self) -> None:
+        odoo = self.odoo()
+        self.assertEqual(odoo.get_user_id("erika@example.com"), 7)
+        self.assertEqual(odoo.get_user_id("Erika@Example.com "), 7)
+        self.assertEqual(odoo.get_user_id("erika@"), 7)
+        self.assertEqual(odoo.get_user_id("Erika Musterfrau"), 7)
+        self.assertEqual(odoo.get_user_id("erika.musterfrau"), 7)
+        self.assertEqual(odoo.get_user_id("max*"), STANDIN_UID)
+        self.assertEqual(odoo.get_user_id("John Doe"), -1)
+        self.assertEqual(odoo.get_user_id("John Doe", 5), 5)
+        self.assertEqual(self.db.count("res.users", "search_read"), 2)
+    def test_701(self) -> None:
+        odoo_api.ODOO_CACHE_TTL = 3600
+        odoo = self.odoo()
+        self.assertEqual(odoo.task_id("MGMT", "Project Management"), 22)
+        self.assertEqual(odoo.get_user_id("erika@"), 7)
+        self.assertEqual(self.db.count("project.task", "search_read"), 1)
+        self.assertEqual(self.db.count("res.users", "search_read"), 1)
+        self.assertTrue(os.listdir(odoo_api.ODOO_CACHE))
+        odoo = self.odoo()
+        self.assertEqual(odoo.task_id("MGMT", "Project Management"), 22)
+        self.assertEqual(odoo.get_user_id("erika@"), 7)
+        self.assertEqual(len(odoo.projects()), 2)
+        self.assertEqual(self.db.count("project.task", "search_read"), 1)
+        self.assertEqual(self.db.count("res.users", "search_read"), 1)
+        self.assertEqual(self.db.count("project.project", "search_read"), 1)
+    def test_702(self) -> None:
+        odoo_api.ODOO_CACHE_TTL = 3600
+        odoo = self.odoo()
+        self.assertEqual(len(odoo.projects_tasks()), 2)
+        self.assertEqual(odoo.refresh(), [{"model": "res.users", "records": 2, "changed": 2, "deleted": 0},
+                                          {"model": "project.project", "records": 2, "changed": 2, "deleted": 0},
+                                          {"model": "project.task", "records": 2, "changed": 0, "deleted": 0}])
+        self.assertEqual(self.db.count("project.task", "search"), 0)
+        self.db.tasks[23] = (12, "Meetings")
+        self.db.write_dates[("project.task", 23)] = "2022-01-10 12:00:00"
+        del self.db.tasks[22]
+        done = odoo.refresh()
+        self.assertEqual(done[2], {"model": "project.task", "records": 2, "changed": 1, "deleted": 1})
+        self.assertEqual(self.db.count("project.task", "search"), 1)
+        odoo = self.odoo()
+        tasks = odoo.projects_tasks()
+        self.assertEqual(sorted([item["task_name"] for item in tasks]), ["Developments", "Meetings"])
+        self.assertEqual(odoo.task_id("MGMT", "Meetings"), 23)
+        done = odoo.refresh(full=True)
+        self.assertEqual(done[2], {"model": "project.task", "records": 2, "changed": 2, "deleted": 0})
+    def test_703(self) -> None:
+        odoo_api.ODOO_CACHE_TTL = 3600
+        odoo = self.odoo()
+        self.assertEqual(len(odoo.projects_tasks()), 2)
+        odoo_api.ODOO_CACHE_TTL = 1
+        time.sleep(1.1)
+        self.db.tasks[23] = (12, "Meetings")
+        self.db.write_dates[("project.task", 23)] = "2022-01-10 12:00:00"
+        odoo = self.odoo()
+        self.assertEqual(len(odoo.projects_tasks()), 3)
+        self.assertEqual(self.db.count("project.task", "search_read"), 2)
+        self.assertEqual(self.db.count("project.task", "search_count"), 1)
+    def test_704(self) -> None:
+        odoo_api.ODOO_CACHE_TTL = 3600
+        odoo = self.odoo()
+        self.assertEqual(odoo.task_id("MGMT", "Project Management"), 22)
+        self.db.tasks[23] = (12, "Meetings")
+        self.db.write_dates[("project.task", 23)] = "2021-12-01 12:00:00"  # same second as the last sync
+        self.assertEqual(odoo.task_id("MGMT", "Meetings"), 23)
+        self.assertEqual(self.db.count("project.task", "search_read"), 2)
+        self.assertEqual(odoo.task_id("MGMT", "Unknown"), "Unknown")
+        self.assertEqual(odoo.task_id("MGMT", "Unknown"), "Unknown")
+        self.assertEqual(self.db.count("project.task", "search_read"), 3)
+        self.assertEqual(self.odoo().task_id("MGMT", "Meetings"), 23)
+        self.assertEqual(self.db.count("project.task", "search_read"), 3)
+    def test_705(self) -> None:
+        odoo_api.ODOO_CACHE_TTL = 3600
+        odoo = self.odoo()
+        self.assertEqual(odoo.get_user_id("erika@"), 7)
+        self.db.users[7] = "Erika Mustermann"
+        self.db.emails[7] = "erika.mustermann@example.com"
+        self.db.write_dates[("res.partner", 7)] = "2022-01-10 12:00:00"
+        done = odoo.refresh()
+        self.assertEqual(done[0], {"model": "res.users", "records": 2, "changed": 1, "deleted": 0})
+        odoo = self.odoo()
+        self.assertEqual(odoo.get_user_id("erika.mustermann@"), 7)
+        self.assertEqual(odoo.get_user_id("Erika Mustermann"), 7)
+        done = odoo.refresh()
+        self.assertEqual(done[0], {"model": "res.users", "records": 2, "changed": 0, "deleted": 0})
+    def test_801(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        for attempt in range(3):
+            odoo = self.odoo()
+            data = odoo.timesheet(Day(2022, 1, 1), Day(2022, 1, 31))
+            self.assertEqual(len(data), 1)
+        self.assertEqual(self.db.count("", "login"), 1)
+        self.assertEqual(self.db.count("account.analytic.line", "search_read"), 3)
+    def test_802(self) -> None:
+        odoo = self.odoo()
+        self.assertEqual(odoo.from_login(), STANDIN_UID)
+        self.assertEqual(self.db.count("", "login"), 1)
+        odoo_api._logins.clear()  # like a new process
+        odoo = self.odoo()
+        self.assertEqual(odoo.from_login(), STANDIN_UID)
+        self.assertEqual(self.db.count("", "login"), 1)
+        odoo_api._logins.clear()
+        odoo_api.ODOO_LOGIN_TTL = 0
+        odoo = self.odoo()
+        self.assertEqual(odoo.from_login(), STANDIN_UID)
+        self.assertEqual(self.db.count("", "login"), 2)
+    def test_803(self) -> None:
+        dotnetrc.set_username_password(STANDIN_USER, "wrong")
+        odoo = self.odoo()
+        self.assertFalse(odoo.from_login())
+        dotnetrc.set_username_password(STANDIN_USER, STANDIN_PASS)
+        odoo = self.odoo()
+        self.assertEqual(odoo.from_login(), STANDIN_UID)
+        self.assertEqual(self.db.count("", "login"), 2)
+    def test_901(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        self.db.unavailable = 3
+        data = self.odoo().timesheet(Day(2022, 1, 1), Day(2022, 1, 31))
+        self.assertEqual(len(data), 1)
+        self.assertEqual(self.db.unavailable, 0)
+        self.assertEqual(self.db.count("account.analytic.line", "search_read"), 1)
+    def test_902(self) -> None:
+        odoo_api.ODOO_KEEPALIVE = False
+        self.db.unavailable = 2
+        self.assertEqual(self.odoo().from_login(), STANDIN_UID)
+        self.assertEqual(self.db.unavailable, 0)
+    def test_903(self) -> None:
+        odoo = self.odoo()
+        self.db.gateway = 1
+        self.assertEqual(len(odoo.projects()), 2)
+        self.assertEqual(self.db.gateway, 0)
+        self.assertEqual(odoo.task_id("Project-1", "Developments"), 21)
+        self.db.gateway = 1
+        with self.assertRaises(urllib.error.HTTPError):
+            odoo.timesheet_create("Project-1", "Developments", Day(2022, 1, 3), 1.5, "dev1 started")
+        self.assertEqual(len(self.db.lines), 1)  # not created twice
+        self.db.unavailable = 1
+        odoo.timesheet_create("Project-1", "Developments", Day(2022, 1, 4), 1.5, "dev1 continued")
+        self.assertEqual(len(self.db.lines), 2)
+        self.assertTrue(odoo_api.odoo_idempotent("object", "execute", ["db", 1, "pw", "project.task", "search_read"]))
+        self.assertFalse(odoo_api.odoo_idempotent("object", "execute", ["db", 1, "pw", "account.analytic.line", "unlink"]))
+        self.assertTrue(odoo_api.odoo_idempotent("common", "login", ["db", "user", "pw"]))
+    def test_1001(self) -> None:
+        result = [{"id": 1, "name": "M\u00fcller \u20ac \U0001F600", "unit_amount": 1.25, "task_id": [21, "Dev"]},
+                  {"id": 22, "name": "a \\\"quoted\\\" [text]", "unit_amount": 12345678, "task_id": False},
+                  1234567, "end"]
+        text = json.dumps({"jsonrpc": "2.0", "id": 4711, "result": result}, ensure_ascii=False).encode("utf-8")
+        for chunk in [1, 2, 3, 5, 7, 64, 65536]:
+            odoo_api.STREAMCHUNK = chunk
+            self.assertEqual(list(odoo_api.json_each_result(io.BytesIO(text))), result)
+        self.assertEqual(list(odoo_api.json_each_result(io.BytesIO(b' { "id" : 1 , "result" : [ ] } '))), [])
+    def test_1002(self) -> None:
+        odoo_api.STREAMCHUNK = 3
+        with self.assertRaises(odoo_api.OdooException):
+            list(odoo_api.json_each_result(io.BytesIO(b'{"jsonrpc": "2.0", "id": 1, "error": {"message": "Access Denied"}}')))
+        with self.assertRaises(odoo_api.OdooException):
+            list(odoo_api.json_each_result(io.BytesIO(b'{"jsonrpc": "2.0", "id": 1, "result": 2}')))
+        with self.assertRaises(ValueError):
+            list(odoo_api.json_each_result(io.BytesIO(b'{"jsonrpc": "2.0", "id": 1, "result": [{"id": 1}, {"id"')))
+    def test_1003(self) -> None:
+        for day in range(1, 29):
+            self.db.add("2022-02-%02i" % day, 1.0, "dev1 day %i" % day)
+        odoo_api.STREAMCHUNK = 16
+        odoo = self.odoo()
+        found: List[str] = []
+        for item in odoo.each_timesheet(Day(2022, 2, 1), Day(2022, 2, 28)):
+            found.append(cast(str, item["entry_date"]))
+            self.assertEqual(len(odoo.projects()), 2)  # another call while reading
+        self.assertEqual(found, ["2022-02-%02i" % day for day in range(1, 29)])
+        self.assertEqual(odoo.timesheet(Day(2022, 2, 1), Day(2022, 2, 28))[-1]["entry_date"], "2022-02-28")
+        self.assertEqual(self.db.connections, 2)
+    def test_1004(self) -> None:
+        for day in range(1, 29):
+            self.db.add("2022-02-%02i" % day, 1.0, "dev1 day %i" % day)
+        odoo_api.STREAMCHUNK = 16
+        odoo = self.odoo()
+        for item in odoo.each_timesheet(Day(2022, 2, 1), Day(2022, 2, 28)):
+            break  # the rest of the response is dropped with its connection
+        self.assertEqual(len(odoo.timesheet(Day(2022, 2, 1), Day(2022, 2, 28))), 28)
+        odoo_api.ODOO_KEEPALIVE = False
+        self.assertEqual(len(odoo.timesheet(Day(2022, 2, 1), Day(2022, 2, 28))), 28)
+    def test_1101(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        self.db.add("2022-01-04", 2.0, "dev1 continued")
+        odoo = self.odoo()
+        records = odoo.timesheet(Day(2022, 1, 1), Day(2022, 1, 31))
+        entries = odoo.timesheet_entries(Day(2022, 1, 1), Day(2022, 1, 31))
+        self.assertEqual([entry._asdict() for entry in entries], records)
+        self.assertEqual([odoo_api.TimesheetEntry.from_dict(record) for record in records], entries)
+        self.assertEqual(entries[1].entry_size, 2.0)
+        self.assertEqual(entries[1]["proj_name"], "Project-1")
+        self.assertFalse(hasattr(entries[1], "__dict__"))
+        odoo_api.ODOO_PERDAY = True
+        self.assertEqual(odoo.timesheet_entries(Day(2022, 1, 1), Day(2022, 1, 31)), entries)
+
+if __name__ == "__main__":
+    from optparse import OptionParser
+    cmdline = OptionParser("%prog [-options] [test_xxx]")
+    cmdline.add_option("-v", "--verbose", action="count", default=0, help="more verbose logging")
+    cmdline.add_option("-^", "--quiet", action="count", default=0, help="less verbose logging")
+    cmdline.add_option("--failfast", action="store_true", default=False,
+                       help="Stop the test run on the first error or failure. [%default]")
+    cmdline.add_option("--xmlresults", metavar="FILE", default=None,
+                       help="capture results as a junit xml file [%default]")
+    opt, args = cmdline.parse_args()
+    logging.basicConfig(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
+    if not args:
+        args = ["test_*"]
+    suite = unittest.TestSuite()
+    for arg in args:
+        if len(arg) > 2 and arg[0].isalpha() and arg[1] == "_":
+            arg = "test_" + arg[2:]
+        for classname in sorted(globals()):
+            if not classname.endswith("Test"):
+                continue
+            testclass = globals()[classname]
+            for method in sorted(dir(testclass)):
+                if "*" not in arg: arg += "*"
+                if arg.startswith("_"): arg = arg[1:]
+                if fnmatch(method, arg):
+                    suite.addTest(testclass(method))
+    # running
+    xmlresults = None
+    if opt.xmlresults:
+        if os.path.exists(opt.xmlresults):
+            os.remove(opt.xmlresults)
+        xmlresults = open(opt.xmlresults, "wb")
+        logg.info("xml results into %s", opt.xmlresults)
+    if xmlresults:
+        import xmlrunner  # type: ignore[import]
+        Runner = xmlrunner.XMLTestRunner
+        result = Runner(xmlresults).run(suite)
+    else:
+        Runner = unittest.TextTestRunner
+        result = Runner(verbosity=opt.verbose, failfast=opt.failfast).run(suite)
+    if not result.wasSuccessful():
+        sys.exit(1)
@@ -3,8 +3,8 @@
 __copyright__ = "(C) 2021-2025 Guido Draheim, licensed under the Apache License 2.0"""
 __version__ = "1.1.4023"
 
-from typing import Dict, List, Optional, Generator, cast
-from odoo2data_api import Cookies, UserID, ProjID, ProjREF, TaskID, TaskREF, EntryID, OdooException
+from typing import Dict, List, Optional, Generator, Iterable, Callable, Any, cast
+from odoo2data_api import Cookies, UserID, ProjID, ProjREF, TaskID, TaskREF, EntryID, OdooException, TimesheetChanges, TimesheetEntry
 
 from tabtotext import JSONList, JSONDict, JSONItem, Date, Time
 
@@ -33,15 +33,24 @@ URL = mock_url
 db_projlist = [mock_proj_1, mock_proj_2]
 db_tasklist = {mock_proj_1: [mock_task_1], mock_proj_2: [mock_task_2]}
 db_records: List[Optional[JSONDict]] = []
+db_written: Dict[EntryID, str] = {}  # the write_date per entry_id
+db_clock = 0
 
 def reset() -> None:
     global DB, URL
     DB = mock_db
     URL = mock_url
-    global db_projlist, db_tasklist, db_records
+    global db_projlist, db_tasklist, db_records, db_written, db_clock
     db_projlist = [mock_proj_1, mock_proj_2]
     db_tasklist = {mock_proj_1: [mock_task_1], mock_proj_2: [mock_task_2]}
     db_records = []
+    db_written = {}
+    db_clock = 0
+
+def tick() -> str:
+    global db_clock
+    db_clock += 1
+    return "%09i" % db_clock
 
 class Odoo:
     def __init__(self, url: Optional[str] = None, db: Optional[str] = None):
@@ -53,6 +62,8 @@ class Odoo:
         return mock_uid
     def for_user(self, name: str) -> "Odoo":
         return self
+    def refresh(self, full: bool = False) -> JSONList:
+        return [{"model": "project.task", "records": len(db_projlist), "changed": len(db_projlist) if full else 0, "deleted": 0}]
     def databases(self) -> List[str]:
         return [mock_db]
     def projects(self) -> JSONList:
@@ -126,6 +137,7 @@ class Odoo:
     def timesheet_delete(self, entry_id: EntryID) -> bool:
         old = db_records[entry_id]
         db_records[entry_id] = None
+        db_written[entry_id] = tick()
         return old is not None
     def timesheet_write(self, entry_id: EntryID, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> bool:
         proj_id = self.proj_id(proj)
@@ -139,6 +151,7 @@ class Odoo:
             "entry_size": time, "entry_desc": desc,
             "entry_id": entry_id, "entry_date": date}
         db_records[entry_id] = record
+        db_written[entry_id] = tick()
         return True
     def timesheet_create(self, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> bool:
         proj_id = self.proj_id(proj)
@@ -151,6 +164,7 @@ class Odoo:
             "user_id": mock_uid, "user_name": str(mock_uid),
             "entry_size": time, "entry_desc": desc,
             "entry_id": len(db_records), "entry_date": date}
+        db_written[len(db_records)] = tick()
         db_records.append(record)
         return True
     def timesheet_update(self, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> bool:
@@ -167,6 +181,40 @@ class Odoo:
         if done:
             return True
         return self.timesheet_create(proj, task, date, time, desc)
+    def timesheet_changes(self, after: Day, before: Optional[Day] = None, since: str = "", known: Iterable[EntryID] = ()) -> TimesheetChanges:
+        found = self.timesheet(after, before)
+        changed = [record for record in found if db_written[cast(EntryID, record["entry_id"])] >= since]
+        deleted = set(known) - set(cast(EntryID, record["entry_id"]) for record in found)
+        synced = max([since] + [db_written[cast(EntryID, record["entry_id"])] for record in changed])
+        return TimesheetChanges(changed, sorted(deleted), synced)
+    def timesheet_groups(self, after: Day, before: Optional[Day] = None, groupby: Optional[List[str]] = None) -> JSONList:
+        groups: Dict[str, JSONDict] = {}
+        for record in self.timesheet(after, before):
+            entry_date = cast(Day, record["entry_date"])
+            key: List[str] = []
+            group: JSONDict = {"proj_id": 0, "proj_name": "", "task_id": 0, "task_name": "", "entry_size": 0, "entry_count": 0,
+                               "entry_date": after}
+            for name in (groupby or ["project_id", "task_id", "date:month"]):
+                if name == "project_id":
+                    group["proj_id"] = record["proj_id"]
+                    group["proj_name"] = record["proj_name"]
+                    key.append(str(record["proj_id"]))
+                elif name == "task_id":
+                    group["task_id"] = record["task_id"]
+                    group["task_name"] = record["task_name"]
+                    key.append(str(record["task_id"]))
+                elif name == "date:month":
+                    group["entry_date"] = max(after, entry_date.replace(day=1))
+                    key.append(entry_date.strftime("%Y-%m"))
+                elif name == "date:day":
+                    group["entry_date"] = entry_date
+                    key.append(entry_date.isoformat())
+            found = groups.setdefault(",".join(key), group)
+            found["entry_size"] = cast(Num, found["entry_size"]) + cast(Num, record["entry_size"])
+            found["entry_count"] = cast(int, found["entry_count"]) + 1
+        return list(groups.values())
+    def batch(self) -> "OdooBatch":
+        return OdooBatch(self)
     def timesheet(self, after: Day, before: Optional[Day] = None) -> JSONList:
         if not before:
             before = datetime.date.today()
@@ -190,3 +238,23 @@ class Odoo:
                 break
             ondate += datetime.timedelta(days=1)
         return records
+    def timesheet_entries(self, after: Day, before: Optional[Day] = None) -> List[TimesheetEntry]:
+        return [TimesheetEntry.from_dict(item) for item in self.timesheet(after, before)]
+
+class OdooBatch:
+    def __init__(self, odoo: Odoo):
+        self.odoo = odoo
+        self.queue: List[Callable[[], Any]] = []
+    def timesheet_create(self, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> int:
+        self.queue.append(lambda: self.odoo.timesheet_create(proj, task, date, time, desc))
+        return len(self.queue) - 1
+    def timesheet_write(self, entry_id: EntryID, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> int:
+        self.queue.append(lambda: self.odoo.timesheet_write(entry_id, proj, task, date, time, desc))
+        return len(self.queue) - 1
+    def timesheet_delete(self, entry_id: EntryID) -> int:
+        self.queue.append(lambda: self.odoo.timesheet_delete(entry_id))
+        return len(self.queue) - 1
+    def flush(self) -> List[Any]:
+        results = [call() for call in self.queue]
+        self.queue = []
+        return results
@@ -0,0 +1,441 @@
+#! /usr/bin/env python3
+
+__copyright__ = "(C) 2021-2025 Guido Draheim, licensed under the Apache License 2.0"""
+__version__ = "1.0.4023"
+
+# pylint: disable=unused-import,missing-function-docstring
+import logging
+from typing import List, Dict, Union, Optional, Tuple, Set, Iterable, Any, cast
+
+import sys
+import ssl
+import os.path as path
+import json
+import random
+import asyncio
+import datetime
+import urllib.parse
+
+import odoo2data_api as odoo_api
+from odoo2data_api import OdooConfig, OdooException, OdooQueue, TimesheetChanges, UserID, ProjREF, TaskREF, EntryID, strDate
+from dotnetrc import get_username_password
+from callgovernor import governor, retry_after, RetryableError, RETRY_STATUS, SAFE_STATUS
+from fnmatch import fnmatchcase as fnmatch
+from tabtotext import JSONList, JSONDict
+
+Day = datetime.date
+Num = float
+
+logg = logging.getLogger(__name__ == "__main__" and path.basename(sys.argv[0]) or __name__)
+
+NIX = ""
+JSONRPC = "/jsonrpc"
+ODOO_CONCURRENCY = 16  # requests in flight per AsyncHTTP client
+ODOO_TIMEOUT = 60.  # seconds per request
+
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+class AsyncHTTP:
+    """ a small HTTP/1.1 client for json posts - it keeps the connections open for the next request
+        (one per request in flight) and it limits the number of concurrent requests."""
+    def __init__(self, concurrency: int = 0, timeout: float = 0):
+        self.concurrency = concurrency or ODOO_CONCURRENCY
+        self.timeout = timeout or ODOO_TIMEOUT
+        self.idle: Dict[str, List[Connection]] = {}
+        self.connections = 0  # opened so far
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:  # create it within the running loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+    async def close(self) -> None:
+        for pool in self.idle.values():
+            for reader, writer in pool:
+                writer.close()
+                await writer.wait_closed()
+        self.idle = {}
+    async def post(self, url: str, body: bytes, idempotent: bool = False) -> bytes:
+        async def posting() -> bytes:
+            async with self.semaphore:
+                return await asyncio.wait_for(self.request(url, body, idempotent), self.timeout)
+        return await governor(url).acall(posting, idempotent)
+    async def connect(self, parts: urllib.parse.SplitResult) -> Connection:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        context = ssl.create_default_context() if parts.scheme == "https" else None
+        self.connections += 1
+        return await asyncio.open_connection(parts.hostname, port, ssl=context)
+    async def request(self, url: str, body: bytes, idempotent: bool = False) -> bytes:
+        """ a write is not sent on an idle connection, as it can not be sent again when that was closed """
+        parts = urllib.parse.urlsplit(url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        head = (F"POST {target} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+                F"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+        pool = self.idle.setdefault(F"{parts.scheme}://{parts.netloc}", [])
+        for attempt in range(2):
+            reused = bool(pool) and idempotent
+            reader, writer = pool.pop() if reused else await self.connect(parts)
+            try:
+                writer.write(head.encode("iso-8859-1") + body)
+                await writer.drain()
+                status = await reader.readline()
+                if not status and reused:
+                    writer.close()
+                    continue  # the server did close the idle connection
+                if not status:  # like a worker restart - a read is sent again, a write is not
+                    raise ConnectionResetError(F"no reply from {parts.netloc}")
+                code, headers, data = await self.response(status, reader)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                writer.close()
+                if reused:
+                    logg.debug("reconnect after %s", e)
+                    continue
+                raise
+            except BaseException:
+                writer.close()  # a timeout leaves the connection in an unknown state
+                raise
+            if headers.get("connection", NIX).lower() == "close" or status.startswith(b"HTTP/1.0"):
+                writer.close()
+            elif len(pool) >= self.concurrency:
+                writer.close()  # a write did open another connection
+            else:
+                pool.append((reader, writer))
+            if code in (RETRY_STATUS if idempotent else SAFE_STATUS):
+                raise RetryableError(F"HTTP {code} for {url}", retry_after(headers.get("retry-after")))
+            if code >= 400:
+                raise OdooException(F"HTTP {code} for {url}")
+            return data
+        raise OdooException(F"no connection for {url}")
+    async def response(self, status: bytes, reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bytes]:
+        parts = status.split(b" ", 2)
+        if len(parts) < 2 or not parts[0].startswith(b"HTTP/") or not parts[1].isdigit():
+            raise OdooException(F"bad status line {status!r}")
+        code = int(parts[1])
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in [b"\r\n", b"\n", b""]:
+                break
+            name, value = line.decode("iso-8859-1").split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+        if "content-length" in headers:
+            data = await reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", NIX).lower() == "chunked":
+            chunks: List[bytes] = []
+            while True:
+                size = int((await reader.readline()).split(b";", 1)[0], 16)
+                if not size:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            data = b"".join(chunks)
+        else:
+            data = await reader.read()
+            headers["connection"] = "close"
+        return code, headers, data
+
+async def json_rpc(http: AsyncHTTP, url: str, method: str, params: Any, idempotent: bool = False) -> Any:
+    data = {
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": params,
+        "id": random.randint(0, 1000000000),
+    }
+    logg.debug("json data = %s", data)
+    text = await http.post(url, json.dumps(data).encode(), idempotent)
+    reply = json.loads(text.decode('UTF-8'))
+    if reply.get("error"):
+        raise OdooException(reply["error"])
+    return reply["result"]
+
+async def odoo_call(http: AsyncHTTP, url: str, service: str, method: str, *args: Any) -> Any:
+    idempotent = odoo_api.odoo_idempotent(service, method, args)
+    return await json_rpc(http, url, "call", {"service": service, "method": method, "args": args}, idempotent)
+
+class Odoo:
+    """ the methods of odoo2data_api.Odoo as coroutines. Multiple Odoo objects can share one
+        AsyncHTTP client, so that its concurrency limit applies to all of them. The users, projects
+        and tasks are taken from the OdooCache of a (sync) odoo2data_api.Odoo in a worker thread."""
+    def __init__(self, config: Optional[OdooConfig] = None, http: Optional[AsyncHTTP] = None):
+        self.config: OdooConfig = config or OdooConfig()
+        self.http = http or AsyncHTTP()
+        self.closing = http is None  # a shared client is closed by its owner
+        self.master = odoo_api.Odoo(self.config)  # logged in as the uid, for the cache
+        self.usr: UserID = 0  # the user of the timesheet entries
+        self.uid: UserID = 0  # the user of the login
+        self.pwd: str = NIX
+        self._projtasklist: Optional[JSONList] = None
+        self._projindex: Dict[str, int] = {}
+        self._taskindex: Dict[Tuple[str, str], int] = {}
+        self._refreshed: Set[str] = set()
+        self._userindex: Optional[Dict[str, UserID]] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.user_name: Optional[str] = None
+    async def __aenter__(self) -> "Odoo":
+        return self
+    async def __aexit__(self, *args: Any) -> None:
+        if self.closing:
+            await self.http.close()
+    @property
+    def url(self) -> str:
+        return self.config.url
+    @property
+    def db(self) -> str:
+        return self.config.db
+    @property
+    def user(self) -> str:
+        if self.user_name:
+            return self.user_name
+        return self.config.user or ""
+    @property
+    def lock(self) -> asyncio.Lock:
+        if self._lock is None:  # create it within the running loop
+            self._lock = asyncio.Lock()
+        return self._lock
+    async def execute(self, model: str, method: str, *args: Any) -> Any:
+        return await odoo_call(self.http, F"{self.url}{JSONRPC}", "object", "execute", self.db, self.uid, self.pwd, model, method, *args)
+    async def setup(self) -> UserID:
+        username, password = get_username_password(self.url)
+        key = odoo_api.odoo_login_key(self.url, self.db, username)
+        with odoo_api._logins_lock:
+            uid = odoo_api.odoo_login_known(key)
+        if not uid:
+            uid = cast(UserID, await odoo_call(self.http, F"{self.url}{JSONRPC}", "common", "login", self.db, username, password))
+            with odoo_api._logins_lock:
+                odoo_api.odoo_login_remember(key, uid)
+        self.uid = uid
+        self.usr = uid
+        self.pwd = password
+        self.master.usr = uid
+        self.master.pwd = password
+        if self.user:
+            self.usr = await self.get_user_id(self.user)
+        return self.usr
+    async def from_login(self) -> UserID:
+        if not self.usr:
+            return await self.setup()
+        return self.usr
+    async def for_user(self, name: str) -> "Odoo":
+        if not self.usr:
+            self.usr = await self.setup()
+        if name:
+            self.usr = await self.get_user_id(name)
+            self.user_name = name
+        return self
+    async def get_user_id(self, name: str, default: Optional[UserID] = None) -> UserID:
+        uid = default or -1
+        if "*" in name:
+            return odoo_api.users_matching(await self.users(), name, uid)
+        return (await self.userindex()).get(odoo_api.users_index_key(name), uid)
+    async def userindex(self) -> Dict[str, UserID]:
+        if self._userindex is None:
+            self._userindex = odoo_api.users_index(await self.users())
+        return self._userindex
+    async def records(self, model: str) -> JSONList:
+        """ the search_read of a model in ODOO_CACHED - from the OdooCache if ODOO_CACHE_TTL is set """
+        await self.from_login()
+        fields = odoo_api.ODOO_CACHED[model]
+        if odoo_api.ODOO_CACHE_TTL:
+            async with self.lock:
+                return await asyncio.to_thread(self.master.cache.records, model, fields)
+        return cast(JSONList, await self.execute(model, "search_read", [], fields))
+    async def users(self) -> JSONList:
+        return odoo_api.users_from_odoo(await self.records("res.users"))
+    async def projects(self) -> JSONList:
+        return odoo_api.projects_from_odoo(await self.records("project.project"))
+    async def projects_tasks(self) -> JSONList:
+        return odoo_api.tasks_from_odoo(await self.records("project.task"))
+    async def project_tasks(self, proj_id: ProjREF = 89) -> JSONList:
+        await self.from_login()
+        found = await self.execute("project.task", "search_read", ['project_id', '=', proj_id], ['id', 'name', 'active', 'project_id'])
+        return odoo_api.tasks_from_odoo(found)
+    async def refresh(self, full: bool = False) -> JSONList:
+        """ update the cached users, projects and tasks now (full=True fetches all records again) """
+        await self.from_login()
+        async with self.lock:
+            return await asyncio.to_thread(self.master.refresh, full)
+    async def projtasklist(self) -> JSONList:
+        if self._projtasklist is None:
+            data = await self.projects_tasks()
+            self._projtasklist = data
+            self._projindex, self._taskindex = odoo_api.projtask_index(data)
+            return data
+        return self._projtasklist
+    async def projtasklist_refresh(self, missing: str) -> None:
+        """ a project or task may have been created after the cache was synced - ask once for each missing name """
+        if not odoo_api.ODOO_CACHE_TTL or missing in self._refreshed:
+            return
+        self._refreshed.add(missing)
+        logg.info("refreshing the cached tasks for '%s'", missing)
+        async with self.lock:
+            await asyncio.to_thread(self.master.cache.refresh, "project.task", odoo_api.ODOO_CACHED["project.task"])
+        self._projtasklist = None
+        await self.projtasklist()
+    async def proj_id(self, proj_id: ProjREF) -> int:
+        if isinstance(proj_id, int):
+            return proj_id
+        await self.projtasklist()
+        if proj_id not in self._projindex:
+            await self.projtasklist_refresh(proj_id)
+        if proj_id in self._projindex:
+            return self._projindex[proj_id]
+        logg.warning("could not resolve proj_id '%s'", proj_id)
+        return proj_id  # type: ignore
+    async def task_id(self, proj_id: ProjREF, task_id: TaskREF) -> int:
+        if isinstance(task_id, int):
+            return task_id
+        await self.projtasklist()
+        if (str(proj_id), task_id) not in self._taskindex:
+            await self.projtasklist_refresh(F"{proj_id}@{task_id}")
+        if (str(proj_id), task_id) in self._taskindex:
+            return self._taskindex[(str(proj_id), task_id)]
+        logg.warning("could not resolve task_id '%s' for proj_id '%s'", task_id, proj_id)
+        return task_id  # type: ignore
+    async def timesheet_records(self, date: Optional[Day] = None) -> JSONList:
+        uid = await self.from_login()
+        searching: JSONList = [["project_id", "!=", False], ["task_id", "!=", False], ["user_id", "=", uid]]  # type: ignore[list-item]
+        if date:
+            searching += [["date", "=", strDate(date)]]  # type: ignore[list-item]
+        found = await self.execute("account.analytic.line", "search_read", searching, odoo_api.TIMESHEET_FIELDS)
+        return [self.timesheet_entry(item) for item in found]
+    async def timesheet_record(self, proj: ProjREF, task: TaskREF, date: Optional[Day] = None) -> JSONList:
+        uid = await self.from_login()
+        searching: JSONList = [["project_id", "=", proj], ["task_id", "=", task], ["user_id", "=", uid]]  # type: ignore[list-item]
+        if date:
+            searching += [["date", "=", strDate(date)]]  # type: ignore[list-item]
+        found = await self.execute("account.analytic.line", "search_read", searching, odoo_api.TIMESHEET_FIELDS)
+        return [self.timesheet_entry(item) for item in found]
+    async def timesheet_delete(self, entry_id: EntryID) -> bool:
+        await self.from_login()
+        found = await self.execute("account.analytic.line", "unlink", [entry_id])
+        logg.info("deleted %s", found)
+        return cast(bool, found)
+    async def timesheet_vals(self, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> JSONDict:
+        uid = await self.from_login()
+        return odoo_api.timesheet_vals(uid, await self.proj_id(proj), await self.task_id(proj, task), date, time, desc)
+    async def timesheet_write(self, entry_id: EntryID, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> bool:
+        vals = await self.timesheet_vals(proj, task, date, time, desc)
+        found = await self.execute("account.analytic.line", "write", [entry_id], vals)
+        logg.info("written %s", found)
+        return cast(bool, found)
+    async def timesheet_create(self, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> bool:
+        vals = await self.timesheet_vals(proj, task, date, time, desc)
+        found = await self.execute("account.analytic.line", "create", [vals])
+        logg.info("created %s", found)
+        return bool(found)
+    async def timesheet_update(self, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> bool:
+        """ write the entry of the task on that date, or create it if there is none yet """
+        vals = await self.timesheet_vals(proj, task, date, time, desc)
+        existing = await self.timesheet_record(cast(int, vals["project_id"]), cast(int, vals["task_id"]), date)
+        if not existing:
+            found = await self.execute("account.analytic.line", "create", [vals])
+            logg.info("created %s", found)
+            return bool(found)
+        if len(existing) > 1:
+            logg.error("existing %sx\n%s", len(existing), existing[0])
+            raise OdooException("found multiple records for account&date")
+        entry_id = cast(EntryID, existing[0]["entry_id"])
+        logg.info("update existing record [%s]", entry_id)
+        found = await self.execute("account.analytic.line", "write", [entry_id], vals)
+        logg.info("updated %s", found)
+        return cast(bool, found)
+    def batch(self) -> "OdooBatch":
+        return OdooBatch(self)
+    async def timesheet(self, after: Day, before: Optional[Day] = None) -> JSONList:
+        before = odoo_api.timesheet_span(after, before, "timesheet")
+        if odoo_api.ODOO_PERDAY:  # all days at once
+            days = [after + datetime.timedelta(days=day) for day in range((before - after).days + 1)]
+            found = await asyncio.gather(*[self.timesheet_records(day) for day in days])
+            return [record for records in found for record in records]
+        return [self.timesheet_entry(item) for item in await self.timesheet_range(after, before)]
+    async def timesheet_range(self, after: Day, before: Day, fields: Optional[List[str]] = None, since: str = NIX) -> JSONList:
+        """ the records page by page (LIMIT) - stopping after MAXROUNDS pages with a warning (see incomplete) """
+        uid = await self.from_login()
+        searching = odoo_api.timesheet_domain(uid, after, before)
+        if since:
+            searching += [["write_date", ">=", since]]
+        records: JSONList = []
+        offset = 0
+        for attempt in range(odoo_api.MAXROUNDS):
+            limit = odoo_api.LIMIT
+            found = await self.execute("account.analytic.line", "search_read", searching, fields or odoo_api.TIMESHEET_FIELDS,
+                                       offset, limit or None, "date asc, id desc")
+            records += found
+            if not limit or len(found) < limit:
+                break
+            offset += limit
+        else:
+            logg.warning("range %s .. %s stopped after %s rounds of %s records - the rest is not read", after.isoformat(), before.isoformat(), odoo_api.MAXROUNDS, odoo_api.LIMIT)
+        return records
+    def incomplete(self, records: JSONList) -> bool:
+        """ whether timesheet_range did stop at MAXROUNDS full pages """
+        return bool(odoo_api.LIMIT) and len(records) >= odoo_api.MAXROUNDS * odoo_api.LIMIT
+    async def timesheet_changes(self, after: Day, before: Optional[Day] = None, since: str = NIX, known: Iterable[EntryID] = ()) -> TimesheetChanges:
+        """ see odoo2data_api.Odoo.timesheet_changes """
+        before = before or datetime.date.today()
+        uid = await self.from_login()
+        changed: JSONList = []
+        synced = since
+        found = await self.timesheet_range(after, before, odoo_api.TIMESHEET_FIELDS + ["write_date"], since)
+        for item in found:
+            synced = max(synced, cast(str, item["write_date"]))
+            changed.append(self.timesheet_entry(item))
+        knownids = set(known)
+        changedids = set(cast(EntryID, item["entry_id"]) for item in changed)
+        if not since and not self.incomplete(found):
+            deleted = knownids - changedids
+        elif not since:  # the unread entries are not deleted
+            deleted = knownids - set(await self.execute("account.analytic.line", "search", odoo_api.timesheet_domain(uid, after, before)))
+        else:
+            deleted = set()
+            searching = odoo_api.timesheet_domain(uid, after, before)
+            if await self.execute("account.analytic.line", "search_count", searching) != len(knownids | changedids):
+                deleted = knownids - set(await self.execute("account.analytic.line", "search", searching))
+        logg.debug("changes %s .. %s since '%s' => %s changed, %s deleted", after.isoformat(), before.isoformat(), since, len(changed), len(deleted))
+        return TimesheetChanges(changed, sorted(deleted), synced)
+    async def timesheet_groups(self, after: Day, before: Optional[Day] = None, groupby: Optional[List[str]] = None) -> JSONList:
+        """ see odoo2data_api.Odoo.timesheet_groups """
+        before = odoo_api.timesheet_span(after, before, "timesheet_groups")
+        uid = await self.from_login()
+        found = await self.execute("account.analytic.line", "read_group", odoo_api.timesheet_domain(uid, after, before),
+                                   ["unit_amount:sum"], groupby or odoo_api.GROUPBY, 0, None, False, False)
+        logg.debug("groups %s .. %s => %s groups", after.isoformat(), before.isoformat(), len(found))
+        return [self.timesheet_group(item, after) for item in found]
+    def timesheet_group(self, item: JSONDict, after: Day) -> JSONDict:
+        return odoo_api.group_from_odoo(item, after)
+    def timesheet_entry(self, item: JSONDict) -> JSONDict:
+        return odoo_api.entry_from_odoo(item)
+
+class OdooBatch(OdooQueue):
+    """ the methods of odoo2data_api.OdooBatch as coroutines """
+    def __init__(self, odoo: Odoo):
+        OdooQueue.__init__(self)
+        self.odoo = odoo
+    async def timesheet_create(self, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> int:
+        return self.queue_create(await self.odoo.timesheet_vals(proj, task, date, time, desc))
+    async def timesheet_write(self, entry_id: EntryID, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> int:
+        return self.queue_write(entry_id, await self.odoo.timesheet_vals(proj, task, date, time, desc))
+    async def timesheet_delete(self, entry_id: EntryID) -> int:
+        return self.queue_delete(entry_id)
+    async def flush(self) -> List[Any]:
+        await self.odoo.from_login()
+        calls = self.calls()
+        replies = [await self.odoo.execute("account.analytic.line", method, *args) for method, args, queued in calls]
+        return self.done(calls, replies)
+
+async def timesheets(users: List[str], after: Day, before: Optional[Day] = None,
+                     config: Optional[OdooConfig] = None, http: Optional[AsyncHTTP] = None) -> List[JSONList]:
+    """ the timesheets of multiple users fetched concurrently, in the order of the users list """
+    client = http or AsyncHTTP()
+    async def timesheet(user: str) -> JSONList:
+        odoo = await Odoo(config, client).for_user(user)
+        return await odoo.timesheet(after, before)
+    try:
+        await Odoo(config, client).from_login()  # only one login for all of them
+        return list(await asyncio.gather(*[timesheet(user) for user in users]))
+    finally:
+        if not http:
+            await client.close()
@@ -0,0 +1,527 @@
+#! /usr/bin/env python3
+
+__copyright__ = "(C) 2021-2025 Guido Draheim, licensed under the Apache License 2.0"""
+__version__ = "1.1.4023"
+
+import odoo2data_api as odoo_api
+import odoo2data_async_api as aodoo_api
+import dotnetrc
+from typing import Optional, Any, List, Dict, Tuple, Awaitable, TypeVar, cast
+from tabtotext import JSONList, JSONDict
+import asyncio
+import datetime
+import json
+import time
+import tempfile
+
+import os
+import sys
+import unittest
+import os.path as path
+from fnmatch import fnmatchcase as fnmatch
+
+import logging
+logg = logging.getLogger("TEST")
+
+Day = datetime.date
+T = TypeVar("T")
+
+STANDIN_USER = "admin"
+STANDIN_PASS = "secret"
+STANDIN_UID = 2
+STANDIN_DB = "standin-db"
+
+class OdooStandinDB:
+    """ an in-memory database answering the /jsonrpc calls as an asyncio server """
+    def __init__(self) -> None:
+        self.users: Dict[int, str] = {STANDIN_UID: "Max Mustermann", 7: "Erika Musterfrau"}
+        self.emails: Dict[int, str] = {STANDIN_UID: "max@example.com", 7: "erika@example.com"}
+        self.projects: Dict[int, str] = {11: "Project-1"}
+        self.tasks: Dict[int, Tuple[int, str]] = {21: (11, "Developments")}
+        self.lines: Dict[int, JSONDict] = {}
+        self.next_id = 100
+        self.calls: List[Tuple[str, str]] = []  # (model, method)
+        self.connections = 0
+        self.serving = 0
+        self.running = 0
+        self.maxrunning = 0
+        self.delay = 0.  # seconds per request
+        self.chunked = False  # Transfer-Encoding: chunked replies
+        self.closing = False  # Connection: close after each reply
+        self.dropping = False  # close the connection without telling the client
+        self.unavailable = 0  # the next requests get a "503 Service Unavailable"
+        self.gateway = 0  # the next requests are processed but get a "502 Bad Gateway"
+        self.hangup = 0  # the next requests are read but the connection is closed without a reply
+        self.garbled = 0  # the next requests get a reply without a valid status line
+        self.now = "2022-02-01 10:00:00"  # the write_date of changes
+    def add(self, date: str, size: float, desc: str, task: int = 21, user: int = STANDIN_UID) -> int:
+        proj = self.tasks[task][0]
+        self.next_id += 1
+        self.lines[self.next_id] = {
+            "id": self.next_id, "date": date, "unit_amount": size, "name": desc,
+            "project_id": [proj, self.projects[proj]], "task_id": [task, self.tasks[task][1]],
+            "user_id": [user, self.users[user]], "write_date": self.now}
+        return self.next_id
+    def count(self, model: str, method: str) -> int:
+        return len([call for call in self.calls if call == (model, method)])
+    def records(self, model: str) -> JSONList:
+        if model == "res.users":
+            return [{"id": uid, "name": name, "email": self.emails[uid], "active": True} for uid, name in self.users.items()]
+        if model == "res.partner":
+            return [{"id": 100 + uid, "name": name, "active": True, "user_ids": [uid]} for uid, name in self.users.items()]
+        if model == "project.project":
+            return [{"id": pid, "name": name, "active": True} for pid, name in self.projects.items()]
+        if model == "project.task":
+            return [{"id": tid, "name": task[1], "active": True, "project_id": [task[0], self.projects[task[0]]]}
+                    for tid, task in self.tasks.items()]
+        return sorted(self.lines.values(), key=lambda rec: (rec["date"], rec["id"]))
+    def search_read(self, model: str, domain: List[Any], fields: Optional[List[str]] = None,
+                    offset: int = 0, limit: Optional[int] = None, order: Optional[str] = None) -> JSONList:
+        found: JSONList = []
+        for record in self.records(model):
+            for field, op, value in domain:
+                have = record.get(field, False)
+                if isinstance(have, list):
+                    have = have[1] if isinstance(value, str) else have[0]
+                if op == "=" and not have == value: break
+                if op == "!=" and not have != value: break
+                if op == ">=" and not have >= value: break
+                if op == "<=" and not have <= value: break
+            else:
+                found.append(dict(record))
+        return found[offset:offset + limit] if limit else found[offset:]
+    def execute(self, model: str, method: str, *args: Any) -> Any:
+        if method == "search_read":
+            return self.search_read(model, *args)
+        if method == "search_count":
+            return len(self.search_read(model, args[0]))
+        if method == "search":
+            return [record["id"] for record in self.search_read(model, args[0])]
+        if method == "read_group":  # only plain fields in groupby
+            groups: Dict[str, JSONDict] = {}
+            for record in self.search_read(model, args[0]):
+                group = groups.setdefault(json.dumps([record[name] for name in args[2]]),
+                                          dict([(name, record[name]) for name in args[2]], unit_amount=0., __count=0))
+                group["unit_amount"] += record["unit_amount"]  # type: ignore
+                group["__count"] += 1  # type: ignore
+            return list(groups.values())
+        if method == "create":
+            created: List[int] = []
+            for vals in args[0]:
+                self.next_id += 1
+                self.lines[self.next_id] = dict(vals, id=self.next_id)
+                for name, names in [("project_id", self.projects), ("user_id", self.users)]:
+                    self.lines[self.next_id][name] = [vals[name], names[vals[name]]]
+                self.lines[self.next_id]["task_id"] = [vals["task_id"], self.tasks[vals["task_id"]][1]]
+                self.lines[self.next_id]["write_date"] = self.now
+                created.append(self.next_id)
+            return created
+        if method == "write":
+            for entry_id in args[0]:
+                self.lines[entry_id]["unit_amount"] = args[1]["unit_amount"]
+                self.lines[entry_id]["name"] = args[1]["name"]
+                self.lines[entry_id]["write_date"] = self.now
+            return True
+        if method == "unlink":
+            for entry_id in args[0]:
+                del self.lines[entry_id]
+            return True
+        raise Exception(f"unknown method {model}.{method}")
+    def call(self, service: str, method: str, args: List[Any]) -> Any:
+        if service == "common" and method == "login":
+            self.calls.append(("", method))
+            return STANDIN_UID if args[1:] == [STANDIN_USER, STANDIN_PASS] else False
+        db, uid, password, model, modelmethod = args[:5]
+        self.calls.append((model, modelmethod))
+        if uid != STANDIN_UID or password != STANDIN_PASS:
+            raise Exception("Access Denied")
+        return self.execute(model, modelmethod, *args[5:])
+    async def serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self.serving += 1
+        try:
+            while True:
+                status = await reader.readline()
+                if not status:
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    line = (await reader.readline()).decode("iso-8859-1")
+                    if not line.strip():
+                        break
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                data = json.loads(await reader.readexactly(int(headers["content-length"])))
+                if self.hangup:
+                    self.hangup -= 1
+                    break
+                if self.garbled:
+                    self.garbled -= 1
+                    writer.write(b"HTTP/1.1 OK\r\n\r\n")
+                    await writer.drain()
+                    break
+                self.running += 1
+                self.maxrunning = max(self.maxrunning, self.running)
+                try:
+                    await asyncio.sleep(self.delay)
+                finally:
+                    self.running -= 1
+                if self.unavailable:
+                    self.unavailable -= 1
+                    writer.write(b"HTTP/1.1 503 Service Unavailable\r\nRetry-After: 0\r\nContent-Length: 0\r\n\r\n")
+                    await writer.drain()
+                    continue
+                params = data["params"]
+                try:
+                    reply = {"jsonrpc": "2.0", "id": data["id"], "result": self.call(params["service"], params["method"], params["args"])}
+                except Exception as e:
+                    reply = {"jsonrpc": "2.0", "id": data["id"], "error": {"message": str(e)}}
+                text = json.dumps(reply).encode("utf-8")
+                head = "HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                if self.gateway:
+                    self.gateway -= 1
+                    text = b""
+                    head = "HTTP/1.1 502 Bad Gateway\r\n"
+                if self.closing:
+                    head += "Connection: close\r\n"
+                if self.chunked:
+                    half = len(text) // 2
+                    body = b"".join(b"%x\r\n%s\r\n" % (len(part), part) for part in [text[:half], text[half:]]) + b"0\r\n\r\n"
+                    writer.write((head + "Transfer-Encoding: chunked\r\n\r\n").encode() + body)
+                else:
+                    writer.write((head + F"Content-Length: {len(text)}\r\n\r\n").encode() + text)
+                await writer.drain()
+                if self.closing or self.dropping:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.serving -= 1
+            writer.close()
+
+class odoo2data_async_apiTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.saved_limit = odoo_api.LIMIT
+        self.saved_maxrounds = odoo_api.MAXROUNDS
+        self.saved_perday = odoo_api.ODOO_PERDAY
+        self.saved_timeout = aodoo_api.ODOO_TIMEOUT
+        self.saved_keepalive = odoo_api.ODOO_KEEPALIVE
+        self.saved_cache = odoo_api.ODOO_CACHE
+        self.saved_cache_ttl = odoo_api.ODOO_CACHE_TTL
+        odoo_api._logins.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        odoo_api.ODOO_CACHE = path.join(self.tmp.name, "cache")
+        odoo_api.ODOO_CACHE_TTL = 0
+        self.db = OdooStandinDB()
+        dotnetrc.set_username_password(STANDIN_USER, STANDIN_PASS)
+    def tearDown(self) -> None:
+        odoo_api.LIMIT = self.saved_limit
+        odoo_api.MAXROUNDS = self.saved_maxrounds
+        odoo_api.ODOO_PERDAY = self.saved_perday
+        aodoo_api.ODOO_TIMEOUT = self.saved_timeout
+        odoo_api.ODOO_KEEPALIVE = self.saved_keepalive
+        odoo_api.ODOO_CACHE = self.saved_cache
+        odoo_api.ODOO_CACHE_TTL = self.saved_cache_ttl
+        odoo_api._logins.clear()
+        self.tmp.cleanup()
+    def run_standin(self, coro: Awaitable[T]) -> T:
+        async def serving() -> T:
+            server = await asyncio.start_server(self.db.serve, "127.0.0.1", 0)
+            self.url = "http://127.0.0.1:%i" % server.sockets[0].getsockname()[1]
+            try:
+                return await coro
+            finally:
+                for attempt in range(100):  # let the open connections see the client closing them
+                    if not self.db.serving:
+                        break
+                    await asyncio.sleep(0.02)
+                server.close()
+                await server.wait_closed()
+        return asyncio.run(serving())
+    def config(self) -> odoo_api.OdooConfig:
+        return odoo_api.OdooConfig(self.url, STANDIN_DB)
+    def test_101(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        self.db.add("2022-01-04", 2.0, "dev1 continued")
+        self.db.add("2022-02-01", 3.0, "dev1 too late")
+        async def check() -> JSONList:
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                return await odoo.timesheet(Day(2022, 1, 1), Day(2022, 1, 31))
+        data = self.run_standin(check())
+        logg.info("data = %s", data)
+        self.assertEqual(len(data), 2)
+        self.assertEqual(data[0]["entry_desc"], "dev1 started")
+        self.assertEqual(data[0]["proj_name"], "Project-1")
+        self.assertEqual(data[0]["task_name"], "Developments")
+        self.assertEqual(data[1]["entry_size"], 2.0)
+        self.assertEqual(self.db.count("account.analytic.line", "search_read"), 1)
+        self.assertEqual(self.db.connections, 1)
+    def test_102(self) -> None:
+        for day in range(1, 29):
+            self.db.add("2022-02-%02i" % day, 1.0, "dev1 day %i" % day)
+        odoo_api.LIMIT = 10
+        async def check() -> JSONList:
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                return await odoo.timesheet(Day(2022, 2, 1), Day(2022, 2, 28))
+        data = self.run_standin(check())
+        self.assertEqual([item["entry_date"] for item in data], ["2022-02-%02i" % day for day in range(1, 29)])
+        self.assertEqual(self.db.count("account.analytic.line", "search_read"), 3)
+    def test_103(self) -> None:
+        for day in range(1, 29):
+            self.db.add("2022-02-%02i" % day, 1.0, "dev1 day %i" % day)
+        odoo_api.ODOO_PERDAY = True
+        self.db.delay = 0.1
+        async def check() -> JSONList:
+            http = aodoo_api.AsyncHTTP(concurrency=7)
+            try:
+                async with aodoo_api.Odoo(self.config(), http) as odoo:
+                    await odoo.from_login()
+                    return await odoo.timesheet(Day(2022, 2, 1), Day(2022, 2, 28))
+            finally:
+                await http.close()
+        started = time.monotonic()
+        data = self.run_standin(check())
+        elapsed = time.monotonic() - started
+        logg.info("elapsed %.3fs for %s connections", elapsed, self.db.connections)
+        self.assertEqual([item["entry_date"] for item in data], ["2022-02-%02i" % day for day in range(1, 29)])
+        self.assertEqual(self.db.count("account.analytic.line", "search_read"), 28)
+        self.assertEqual(self.db.maxrunning, 7)
+        self.assertEqual(self.db.connections, 7)
+        self.assertLess(elapsed, 28 * 0.1 / 2)
+    def test_104(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        self.db.add("2022-01-03", 2.0, "dev1 erika", user=7)
+        async def check() -> List[JSONList]:
+            return await aodoo_api.timesheets(["max@example.com", "erika@example.com", "nobody@example.com"],
+                                              Day(2022, 1, 1), Day(2022, 1, 31), self.config())
+        data = self.run_standin(check())
+        self.assertEqual([[item["entry_desc"] for item in found] for found in data], [["dev1 started"], ["dev1 erika"], []])
+        self.assertEqual(self.db.count("", "login"), 1)
+    def test_105(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        async def check() -> Tuple[int, int]:
+            http = aodoo_api.AsyncHTTP()
+            try:
+                async with aodoo_api.Odoo(self.config(), http) as odoo:
+                    await odoo.timesheet_records(Day(2022, 1, 3))
+                idle = len(http.idle[self.url])
+                async with aodoo_api.Odoo(self.config(), http) as odoo:
+                    await odoo.timesheet_records(Day(2022, 1, 3))
+                return idle, http.connections
+            finally:
+                await http.close()
+        idle, connections = self.run_standin(check())
+        self.assertEqual(idle, 1)  # not closed by the first Odoo
+        self.assertEqual(connections, 1)
+        self.assertEqual(self.db.count("", "login"), 1)
+    def test_106(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        async def check() -> JSONList:
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                await odoo.timesheet_records(Day(2022, 1, 3))
+            odoo_api._logins.clear()  # like a new process, the uid is in the logins.json of the cache
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                return await odoo.timesheet_records(Day(2022, 1, 3))
+        data = self.run_standin(check())
+        self.assertEqual(len(data), 1)
+        self.assertEqual(self.db.count("", "login"), 1)
+    def test_107(self) -> None:
+        odoo_api.ODOO_CACHE_TTL = 3600
+        odoo_api.ODOO_KEEPALIVE = False  # the cache uses the sync client in a worker thread
+        async def check() -> None:
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                await odoo.timesheet_create("Project-1", "Developments", Day(2022, 1, 3), 1.5, "dev1 started")
+            self.db.tasks[22] = (11, "Documentation")
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                await odoo.timesheet_create("Project-1", "Developments", Day(2022, 1, 4), 1.0, "dev1 continued")
+                await odoo.timesheet_create("Project-1", "Documentation", Day(2022, 1, 4), 0.5, "doc1 started")
+        self.run_standin(check())
+        self.assertEqual(sorted(line["task_id"][0] for line in self.db.lines.values()), [21, 21, 22])  # type: ignore
+        self.assertEqual(self.db.count("project.task", "search_read"), 2)  # the cache, and its refresh on a miss
+        self.assertTrue(path.exists(path.join(odoo_api.ODOO_CACHE, "logins.json")))
+    def test_108(self) -> None:
+        known = [self.db.add("2022-02-%02i" % day, 1.0, "dev1 day %i" % day) for day in range(1, 6)]
+        odoo_api.LIMIT = 2
+        odoo_api.MAXROUNDS = 2
+        async def check() -> Tuple[JSONList, odoo_api.TimesheetChanges]:
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                data = await odoo.timesheet(Day(2022, 2, 1), Day(2022, 2, 28))
+                changes = await odoo.timesheet_changes(Day(2022, 2, 1), Day(2022, 2, 28), known=known)
+                return data, changes
+        with self.assertLogs(aodoo_api.logg, logging.WARNING) as logs:
+            data, changes = self.run_standin(check())
+        self.assertEqual(len(data), 4)
+        self.assertEqual(len(changes.changed), 4)
+        self.assertEqual(changes.deleted, [])  # the fifth entry was not read but it is not deleted
+        self.assertIn("stopped after 2 rounds of 2 records", logs.output[0])
+        self.assertEqual(len(logs.output), 2)
+    def test_201(self) -> None:
+        self.db.delay = 1.0
+        aodoo_api.ODOO_TIMEOUT = 0.2
+        async def check() -> None:
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                await odoo.from_login()
+        with self.assertRaises(asyncio.TimeoutError):
+            self.run_standin(check())
+    def test_202(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        async def check() -> Tuple[JSONList, JSONList, JSONList]:
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                first = await odoo.timesheet_records(Day(2022, 1, 3))
+                self.db.chunked = True
+                second = await odoo.timesheet_records(Day(2022, 1, 3))
+                self.db.closing = True
+                third = await odoo.timesheet_records(Day(2022, 1, 3))
+                return first, second, third
+        first, second, third = self.run_standin(check())
+        self.assertEqual(first, second)
+        self.assertEqual(first, third)
+        self.assertEqual(self.db.connections, 1)
+    def test_203(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        self.db.dropping = True
+        async def check() -> int:
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                for attempt in range(3):
+                    await odoo.timesheet_records(Day(2022, 1, 3))
+                return odoo.http.connections
+        connections = self.run_standin(check())
+        self.assertEqual(connections, 4)
+        self.assertEqual(self.db.count("account.analytic.line", "search_read"), 3)
+    def test_204(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        self.db.unavailable = 3
+        async def check() -> JSONList:
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                return await odoo.timesheet_records(Day(2022, 1, 3))
+        data = self.run_standin(check())
+        self.assertEqual(len(data), 1)
+        self.assertEqual(self.db.unavailable, 0)
+        self.assertEqual(self.db.connections, 1)
+    def test_205(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        async def check() -> JSONList:
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                await odoo.task_id("Project-1", "Developments")
+                self.db.gateway = 1
+                with self.assertRaises(odoo_api.OdooException):
+                    await odoo.timesheet_create("Project-1", "Developments", Day(2022, 1, 4), 1.0, "dev1 continued")
+                self.db.gateway = 1
+                return await odoo.timesheet_records()
+        data = self.run_standin(check())
+        self.assertEqual(len(data), 2)  # the write was processed once, the read was sent again
+        self.assertEqual(self.db.count("account.analytic.line", "create"), 1)
+        self.assertEqual(self.db.count("account.analytic.line", "search_read"), 2)
+    def test_206(self) -> None:
+        self.db.add("2022-01-03", 1.5, "dev1 started")
+        async def check() -> JSONList:
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                await odoo.task_id("Project-1", "Developments")
+                self.db.hangup = 1
+                with self.assertRaises(ConnectionResetError):
+                    await odoo.timesheet_create("Project-1", "Developments", Day(2022, 1, 4), 1.0, "dev1 continued")
+                self.db.garbled = 1
+                with self.assertRaises(odoo_api.OdooException):
+                    await odoo.timesheet_create("Project-1", "Developments", Day(2022, 1, 4), 1.0, "dev1 continued")
+                self.db.hangup = 1
+                return await odoo.timesheet_records()
+        data = self.run_standin(check())
+        self.assertEqual(len(data), 1)  # the writes were not sent again, the read was
+        self.assertEqual(self.db.count("account.analytic.line", "create"), 0)
+        self.assertEqual(self.db.count("account.analytic.line", "search_read"), 1)
+        self.assertEqual(self.db.hangup, 0)
+    def test_301(self) -> None:
+        async def check() -> JSONList:
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                await odoo.timesheet_create("Project-1", "Developments", Day(2022, 1, 3), 1.5, "dev1 started")
+                found = await odoo.timesheet_record("Project-1", "Developments", Day(2022, 1, 3))
+                self.assertEqual(len(found), 1)
+                entry_id = cast(int, found[0]["entry_id"])
+                await odoo.timesheet_write(entry_id, "Project-1", "Developments", Day(2022, 1, 3), 2.5, "dev1 changed")
+                changed = await odoo.timesheet_records(Day(2022, 1, 3))
+                await odoo.timesheet_delete(entry_id)
+                return changed + await odoo.timesheet_records(Day(2022, 1, 3))
+        data = self.run_standin(check())
+        self.assertEqual([(item["entry_size"], item["entry_desc"]) for item in data], [(2.5, "dev1 changed")])
+        self.assertEqual(self.db.lines, {})
+        self.assertEqual(self.db.count("project.task", "search_read"), 1)
+    def test_302(self) -> None:
+        old = self.db.add("2022-01-03", 1.5, "dev1 started")
+        async def check() -> List[Any]:
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                batch = odoo.batch()
+                await batch.timesheet_create("Project-1", "Developments", Day(2022, 1, 4), 1.0, "dev1 continued")
+                await batch.timesheet_create("Project-1", "Developments", Day(2022, 1, 5), 2.0, "dev1 finished")
+                await batch.timesheet_delete(old)
+                results = await batch.flush()
+                await odoo.timesheet_update("Project-1", "Developments", Day(2022, 1, 5), 2.5, "dev1 finished later")
+                await odoo.timesheet_update("Project-1", "Developments", Day(2022, 1, 6), 0.5, "dev1 reviewed")
+                return results
+        results = self.run_standin(check())
+        self.assertEqual(results, [102, 103, True])
+        self.assertEqual(sorted((line["date"], line["unit_amount"], line["name"]) for line in self.db.lines.values()), [
+            ("2022-01-04", 1.0, "dev1 continued"), ("2022-01-05", 2.5, "dev1 finished later"), ("2022-01-06", 0.5, "dev1 reviewed")])
+        self.assertEqual(self.db.count("account.analytic.line", "create"), 2)
+    def test_303(self) -> None:
+        first = self.db.add("2022-01-03", 1.5, "dev1 started")
+        self.db.add("2022-01-04", 2.0, "dev1 continued")
+        async def check() -> Tuple[JSONList, odoo_api.TimesheetChanges, odoo_api.TimesheetChanges]:
+            async with aodoo_api.Odoo(self.config()) as odoo:
+                groups = await odoo.timesheet_groups(Day(2022, 1, 1), Day(2022, 1, 31), ["project_id", "task_id"])
+                synced = await odoo.timesheet_changes(Day(2022, 1, 1), Day(2022, 1, 31))
+                self.db.now = "2022-02-02 10:00:00"
+                del self.db.lines[first]
+                self.db.add("2022-01-05", 0.5, "dev1 reviewed")
+                known = [cast(int, item["entry_id"]) for item in synced.changed]
+                changes = await odoo.timesheet_changes(Day(2022, 1, 1), Day(2022, 1, 31), synced.synced, known)
+                return groups, synced, changes
+        groups, synced, changes = self.run_standin(check())
+        self.assertEqual(groups, [{"proj_id": 11, "proj_name": "Project-1", "task_id": 21, "task_name": "Developments",
+                                   "entry_size": 3.5, "entry_count": 2, "entry_date": "2022-01-01"}])
+        self.assertEqual(synced.synced, "2022-02-01 10:00:00")
+        self.assertEqual([item["entry_desc"] for item in changes.changed], ["dev1 continued", "dev1 reviewed"])  # >= synced
+        self.assertEqual(changes.deleted, [first])
+        self.assertEqual(changes.synced, "2022-02-02 10:00:00")
+
+if __name__ == "__main__":
+    from optparse import OptionParser
+    cmdline = OptionParser("%prog [-options] [test_xxx]")
+    cmdline.add_option("-v", "--verbose", action="count", default=0, help="more verbose logging")
+    cmdline.add_option("-^", "--quiet", action="count", default=0, help="less verbose logging")
+    cmdline.add_option("--failfast", action="store_true", default=False,
+                       help="Stop the test run on the first error or failure. [%default]")
+    cmdline.add_option("--xmlresults", metavar="FILE", default=None,
+                       help="capture results as a junit xml file [%default]")
+    opt, args = cmdline.parse_args()
+    logging.basicConfig(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
+    if not args:
+        args = ["test_*"]
+    suite = unittest.TestSuite()
+    for arg in args:
+        if len(arg) > 2 and arg[0].isalpha() and arg[1] == "_":
+            arg = "test_" + arg[2:]
+        for classname in sorted(globals()):
+            if not classname.endswith("Test"):
+                continue
+            testclass = globals()[classname]
+            for method in sorted(dir(testclass)):
+                if "*" not in arg: arg += "*"
+                if arg.startswith("_"): arg = arg[1:]
+                if fnmatch(method, arg):
+                    suite.addTest(testclass(method))
+    # running
+    xmlresults = None
+    if opt.xmlresults:
+        if os.path.exists(opt.xmlresults):
+            os.remove(opt.xmlresults)
+        xmlresults = open(opt.xmlresults, "wb")
+        logg.info("xml results into %s", opt.xmlresults)
+    if xmlresults:
+        import xmlrunner  # type: ignore[import]
+        Runner = xmlrunner.XMLTestRunner
+        result = Runner(xmlresults).run(suite)
+    else:
+        Runner = unittest.TextTestRunner
+        result = Runner(verbosity=opt.verbose, failfast=opt.failfast).run(suite)
+    if not result.wasSuccessful():
+        sys.exit(1)
@@ -4,16 +4,20 @@ __copyright__ = "(C) 2021-2025 Guido Draheim, licensed under the Apache License
 __version__ = "0.7.4023"
 
 import logging
-from typing import List, Dict, Union, Optional, Tuple, Any, cast
+from typing import List, Dict, Union, Optional, Tuple, Callable, TypeVar, Any, cast
 
 import sys
 import re
+import os
 import os.path as path
+import time
+import threading
 import json
 import requests
 import datetime
 import dotnetrc
 from dotgitconfig import git_config_value
+from callgovernor import governor
 from fnmatch import fnmatchcase as fnmatch
 
 import tabtotext
@@ -28,22 +32,53 @@ TaskID = int
 ProjREF = Union[ProjID, str]
 TaskREF = Union[TaskID, str]
 EntryID = int
+T = TypeVar("T")
 
 logg = logging.getLogger(__name__ == "__main__" and path.basename(sys.argv[0]) or __name__)
 
 ODOO_URL = ""
 ODOO_DB = ""
+ODOO_SESSIONS = "~/.cache/timetrack-odoo/sessions.json"
+ODOO_SESSION_TTL = 600  # seconds to reuse a session_id from ODOO_SESSIONS (0 = only in this process)
 
 dotnetrc.NETRC_CLEARTEXT = True
 
 class OdooException(Exception):
     pass
+class OdooSessionExpired(OdooException):
+    pass
 
 def strDate(val: Union[str, Day]) -> str:
     if isinstance(val, (datetime.date, datetime.datetime)):
         return val.strftime("%Y-%m-%d")
     return val
 
+def http_post(url: str, idempotent: bool = False, **args: Any) -> requests.Response:
+    """ a post is only sent again if it is idempotent (like a search_read) - see callgovernor.
+        A reply that the session is gone raises OdooSessionExpired (see Odoo.call) """
+    response = governor(url).response(lambda: requests.post(url, **args), idempotent)
+    if session_expired(response):
+        raise OdooSessionExpired(F"session expired for {url}")
+    return response
+
+def session_expired(response: requests.Response) -> bool:
+    """ after a logout or a server restart Odoo answers with error code 100 (SessionExpiredException) """
+    if b"Session" not in response.content:
+        return False
+    try:
+        reply = response.json()
+    except ValueError:
+        return False
+    error = reply.get("error") if isinstance(reply, dict) else None
+    if not isinstance(error, dict):
+        return False
+    data = error.get("data")
+    name = data.get("name", "") if isinstance(data, dict) else ""
+    return error.get("code") == 100 or "SessionExpired" in str(name)
+
+def http_get(url: str, **args: Any) -> requests.Response:
+    return governor(url).response(lambda: requests.get(url, **args))
+
 def odoo_url() -> str:
     if ODOO_URL:
         return ODOO_URL
@@ -77,7 +112,7 @@ def odoo_login(url: str, db: str, username: str, password: str) -> Tuple[UserID,
             "password": password
         }
     }
-    response = requests.post(url + '/web/session/authenticate', json=request_json)
+    response = http_post(url + '/web/session/authenticate', idempotent=True, json=request_json)
     logg.debug("%s", response.json())
     # before: and 'result' in response.json():
     if response.status_code != 200 or 'error' in response.json():
@@ -91,6 +126,59 @@ def odoo_login(url: str, db: str, username: str, password: str) -> Tuple[UserID,
     session = cast(SessionID, response.cookies['session_id'])  # type: ignore[redundant-cast]
     return uid, session
 
+_sessions: Dict[str, Tuple[UserID, SessionID]] = {}  # shared by all Odoo objects for the same url+db+username
+_sessions_lock = threading.Lock()
+
+def odoo_login_cached(url: str, db: str, username: str, password: str) -> Tuple[UserID, SessionID]:
+    key = F"{url}|{db}|{username}"
+    with _sessions_lock:
+        if key in _sessions:
+            return _sessions[key]
+        filename = path.expanduser(ODOO_SESSIONS)
+        stored: Dict[str, Tuple[UserID, SessionID, float]] = {}
+        if ODOO_SESSION_TTL and path.exists(filename):
+            try:
+                with open(filename) as f:
+                    stored = json.load(f)
+            except (OSError, ValueError) as e:
+                logg.warning("could not load %s: %s", filename, e)
+        if key in stored and time.time() - stored[key][2] < ODOO_SESSION_TTL:
+            uid, sid = stored[key][0], stored[key][1]
+            logg.debug("reusing session of uid %s from %s", uid, filename)
+        else:
+            uid, sid = odoo_login(url, db, username, password)
+            if ODOO_SESSION_TTL:
+                stored[key] = (uid, sid, time.time())
+                os.makedirs(path.dirname(filename), exist_ok=True)
+                tmpfile = F"{filename}.{os.getpid()}"
+                with open(os.open(tmpfile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+                    json.dump(stored, f)
+                os.replace(tmpfile, filename)
+        _sessions[key] = (uid, sid)
+        return uid, sid
+
+def odoo_login_expired(url: str, db: str, username: str, sid: SessionID) -> None:
+    """ forget the session in this process and in ODOO_SESSIONS - unless it was replaced by a new login already """
+    key = F"{url}|{db}|{username}"
+    with _sessions_lock:
+        if key in _sessions and _sessions[key][1] == sid:
+            del _sessions[key]
+        filename = path.expanduser(ODOO_SESSIONS)
+        if not path.exists(filename):
+            return
+        try:
+            with open(filename) as f:
+                stored: Dict[str, Tuple[UserID, SessionID, float]] = json.load(f)
+        except (OSError, ValueError) as e:
+            logg.warning("could not load %s: %s", filename, e)
+            return
+        if key in stored and stored[key][1] == sid:
+            del stored[key]
+            tmpfile = F"{filename}.{os.getpid()}"
+            with open(os.open(tmpfile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+                json.dump(stored, f)
+            os.replace(tmpfile, filename)
+
 # otter/odoo/rest.py#get_databases_json
 def odoo_get_databases(url: str) -> JSONList:
     request_json = {
@@ -98,7 +186,7 @@ def odoo_get_databases(url: str) -> JSONList:
         "context": {}
     }
     # endpoint only for Odoo version >= 10
-    response = requests.get(url + '/web/database/list', json=request_json)
+    response = http_get(url + '/web/database/list', json=request_json)
     if response.status_code != 200 or 'result' not in response.json():
         logg.error("ERROR FETCHING DATABASES")
         raise OdooException("error databases")
@@ -119,7 +207,7 @@ def odoo_get_projects(url: str, cookies: Cookies) -> JSONList:
             "sort": "id ASC"
         }
     }
-    response = requests.post(f"{url}/web/dataset/search_read", json=request_json, cookies=cookies)
+    response = http_post(f"{url}/web/dataset/search_read", idempotent=True, json=request_json, cookies=cookies)
     if response.status_code != 200 or 'result' not in response.json():
         logg.error("ERROR GET PROJECTS")
         if "error" in response.json():
@@ -146,7 +234,7 @@ def odoo_get_projects_tasks(url: str, cookies: Cookies) -> JSONList:
             "sort": "id ASC"
         }
     }
-    response = requests.post(f"{url}/web/dataset/search_read", json=request_json, cookies=cookies)
+    response = http_post(f"{url}/web/dataset/search_read", idempotent=True, json=request_json, cookies=cookies)
     if response.status_code != 200 or 'result' not in response.json():
         logg.error("ERROR GET PROJECT TASKS")
         if "error" in response.json():
@@ -172,7 +260,7 @@ def odoo_get_project_tasks(url: str, cookies: Cookies, proj_id: ProjREF) -> JSON
             "sort": "id ASC"
         }
     }
-    response = requests.post(f"{url}/web/dataset/search_read", json=request_json, cookies=cookies)
+    response = http_post(f"{url}/web/dataset/search_read", idempotent=True, json=request_json, cookies=cookies)
     if response.status_code != 200 or 'result' not in response.json():
         logg.error("ERROR GET PROJECT TASKS")
         logg.debug("%s", response.json())
@@ -212,7 +300,7 @@ def odoo_get_timesheet_records(url: str, cookies: Cookies, uid: UserID, entry_da
         }
     }
 
-    response = requests.post(f"{url}/web/dataset/search_read", json=request_json, cookies=cookies)
+    response = http_post(f"{url}/web/dataset/search_read", idempotent=True, json=request_json, cookies=cookies)
 
     if response.status_code != 200 or 'result' not in response.json():
         logg.error("ERROR GET TIMESHEET")
@@ -253,7 +341,7 @@ def odoo_get_timesheet_record(url: str, cookies: Cookies, uid: UserID, proj_id:
     }
 
     # logg.debug("request %s", request_json)
-    response = requests.post(f"{url}/web/dataset/search_read", json=request_json, cookies=cookies)
+    response = http_post(f"{url}/web/dataset/search_read", idempotent=True, json=request_json, cookies=cookies)
 
     if response.status_code != 200 or 'result' not in response.json():
         logg.error("ERROR GET TIMESHEET")
@@ -289,7 +377,7 @@ def odoo_add_timesheet_record(url: str, cookies: Cookies, uid: UserID, proj_id:
         }
     }
 
-    response = requests.post(f"{url}/web/dataset/call_kw/account.analytic.line/create", json=request_json,
+    response = http_post(f"{url}/web/dataset/call_kw/account.analytic.line/create", json=request_json,
                              cookies=cookies)
 
     if response.status_code != 200 or 'result' not in response.json():
@@ -337,7 +425,7 @@ def odoo_write_timesheet_record(url: str, cookies: Cookies, uid: UserID, entry_i
         }
     }
 
-    response = requests.post(f"{url}/web/dataset/call_kw/account.analytic.line/write", json=request_json,
+    response = http_post(f"{url}/web/dataset/call_kw/account.analytic.line/write", json=request_json,
                              cookies=cookies)
 
     if response.status_code != 200 or 'result' not in response.json():
@@ -366,7 +454,7 @@ def odoo_delete_timesheet_record(url: str, cookies: Cookies, uid: UserID, entry_
         }
     }
 
-    response = requests.post(f"{url}/web/dataset/call_kw/account.analytic.line/unlink", json=request_json,
+    response = http_post(f"{url}/web/dataset/call_kw/account.analytic.line/unlink", json=request_json,
                              cookies=cookies)
 
     if response.status_code != 200 or 'result' not in response.json():
@@ -393,7 +481,7 @@ def odoo_get_users(url: str, cookies: Cookies) -> JSONList:
             "sort": "id ASC"
         }
     }
-    response = requests.post(f"{url}/web/dataset/search_read", json=request_json, cookies=cookies)
+    response = http_post(f"{url}/web/dataset/search_read", idempotent=True, json=request_json, cookies=cookies)
     if response.status_code != 200 or 'result' not in response.json():
         logg.error("ERROR GET USERS")
         if "error" in response.json():
@@ -434,6 +522,9 @@ class Odoo:
         self.uid: Optional[UserID] = None
         self.sid: Optional[str] = None
         self._projtasklist: Optional[JSONList] = None
+        self._projindex: Dict[str, int] = {}
+        self._taskindex: Dict[Tuple[str, str], int] = {}
+        self._userindex: Optional[Dict[str, UserID]] = None
         logg.debug("URL %s DB %s", self.url, self.config.db)
         self.user_name: Optional[str] = None
     @property
@@ -449,7 +540,7 @@ class Odoo:
         return self.config.user or ""
     def login(self) -> UserID:
         username, password = dotnetrc.get_username_password(self.config.url)
-        uid, sid = odoo_login(self.url, self.db, username, password)
+        uid, sid = odoo_login_cached(self.url, self.db, username, password)
         self.uid = uid
         self.sid = sid
         if self.user:
@@ -468,36 +559,34 @@ class Odoo:
         return self
     def get_user_id(self, name: str, default: Optional[UserID] = None) -> UserID:
         uid = default or -1
-        users = self.users()
-        if name.endswith("@"):
-            emailname = name.lower().strip()[:-1]
-            for user in users:
-                if "user_email" not in user: continue
-                attr = cast(str, user["user_email"])
-                if attr.lower().strip().split("@", 1)[0] == emailname:
-                    uid = cast(UserID, user["user_id"])
-        elif "@" in name:
-            email = name.lower().strip()
-            for user in users:
-                if "user_email" not in user: continue
-                attr = cast(str, user["user_email"])
-                if attr.lower().strip() == email:
-                    uid = cast(UserID, user["user_id"])
-        elif "*" in name:
+        if "*" in name:
             named = name.lower().strip().replace(" ", ".")
-            for user in users:
+            for user in self.users():
                 if "user_fullname" not in user: continue
                 attr = cast(str, user["user_fullname"])
                 if fnmatch(attr.lower().strip().replace(" ", "."), named):
                     uid = cast(UserID, user["user_id"])
+            return uid
+        if name.endswith("@") or "@" in name:
+            key = name.lower().strip()
         else:
-            named = name.lower().strip().replace(" ", ".")
-            for user in users:
-                if "user_fullname" not in user: continue
-                attr = cast(str, user["user_fullname"])
-                if attr.lower().strip().replace(" ", ".") == named:
-                    uid = cast(UserID, user["user_id"])
-        return uid
+            key = name.lower().strip().replace(" ", ".")
+        return self.userindex().get(key, uid)
+    def userindex(self) -> Dict[str, UserID]:
+        """ user_id by email, by email name (with a trailing "@") and by full name (lowercase, dots for spaces) """
+        if self._userindex is None:
+            index: Dict[str, UserID] = {}
+            for user in self.users():
+                uid = cast(UserID, user["user_id"])
+                email = user.get("user_email")
+                if isinstance(email, str) and email:
+                    index[email.lower().strip()] = uid
+                    index[email.lower().strip().split("@", 1)[0] + "@"] = uid
+                fullname = user.get("user_fullname")
+                if isinstance(fullname, str) and fullname:
+                    index[fullname.lower().strip().replace(" ", ".")] = uid
+            self._userindex = index
+        return self._userindex
     def databases(self) -> List[str]:
         found = odoo_get_databases(self.url)
         logg.info("%s", found)
@@ -505,19 +594,30 @@ class Odoo:
     def cookies(self) -> Cookies:
         uid = self.from_login()
         return requests.utils.cookiejar_from_dict({"session_id": self.sid})  # type: ignore
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """ func(url, cookies, *args) - when the session has expired then login again (once) and repeat the call """
+        cookies = self.cookies()
+        try:
+            return func(self.url, cookies, *args, **kwargs)
+        except OdooSessionExpired as e:
+            logg.warning("%s - login again", e)
+            username, password = dotnetrc.get_username_password(self.config.url)
+            odoo_login_expired(self.url, self.db, username, cast(SessionID, self.sid))
+            uid, self.sid = odoo_login_cached(self.url, self.db, username, password)
+            return func(self.url, self.cookies(), *args, **kwargs)
     def users(self) -> JSONList:
-        found = odoo_get_users(self.url, self.cookies())
+        found = self.call(odoo_get_users)
         return [{"user_id": item["id"], "user_fullname": item["name"], "user_email": item["email"]} for item in found if item["active"]]
     def projects(self) -> JSONList:
-        found = odoo_get_projects(self.config.url, self.cookies())
+        found = self.call(odoo_get_projects)
         return [{"proj_id": item["id"], "proj_name": item["name"]} for item in found if item["active"]]
     def projects_tasks(self) -> JSONList:
-        found = odoo_get_projects_tasks(self.config.url, self.cookies())
+        found = self.call(odoo_get_projects_tasks)
         return [{"task_id": item["id"], "task_name": item["name"],
                  "proj_id": item["project_id"][0], "proj_name": item["project_id"][1],  # type: ignore
                  } for item in found if item["active"]]
     def project_tasks(self, proj_id: ProjREF = 89) -> JSONList:
-        found = odoo_get_project_tasks(self.url, self.cookies(), proj_id)
+        found = self.call(odoo_get_project_tasks, proj_id)
         return [{"task_id": item["id"], "task_name": item["name"],
                  "proj_id": item["project_id"][0], "proj_name": item["project_id"][1],  # type: ignore
                  } for item in found if item["active"]]
@@ -525,25 +625,30 @@ class Odoo:
         if self._projtasklist is None:
             data = self.projects_tasks()
             self._projtasklist = data
+            self._projindex = {}
+            self._taskindex = {}
+            for item in data:
+                proj_name = cast(str, item["proj_name"])
+                task_name = cast(str, item["task_name"])
+                self._projindex.setdefault(proj_name, cast(int, item["proj_id"]))
+                self._taskindex.setdefault((proj_name, task_name), cast(int, item["task_id"]))
+                self._taskindex.setdefault((str(item["proj_id"]), task_name), cast(int, item["task_id"]))
             return data
         return self._projtasklist
     def proj_id(self, proj_id: ProjREF) -> int:
         if isinstance(proj_id, int):
             return proj_id
-        projtask = self.projtasklist()
-        for item in projtask:
-            if item["proj_name"] == proj_id:
-                return cast(int, item["proj_id"])
+        self.projtasklist()
+        if proj_id in self._projindex:
+            return self._projindex[proj_id]
         logg.warning("could not resolve proj_id '%s'", proj_id)
         return proj_id  # type: ignore
     def task_id(self, proj_id: ProjREF, task_id: TaskREF) -> int:
         if isinstance(task_id, int):
             return task_id
-        projtask = self.projtasklist()
-        for item in projtask:
-            if str(proj_id) == item["proj_name"] or str(proj_id) == str(item["proj_id"]):
-                if item["task_name"] == task_id:
-                    return cast(int, item["task_id"])
+        self.projtasklist()
+        if (str(proj_id), task_id) in self._taskindex:
+            return self._taskindex[(str(proj_id), task_id)]
         logg.warning("could not resolve task_id '%s' for proj_id '%s'", task_id, proj_id)
         return task_id  # type: ignore
     def clean(self, rec: JSONDict) -> JSONDict:
@@ -559,7 +664,7 @@ class Odoo:
         return rec
     def timesheet_records(self, date: Optional[datetime.date] = None) -> JSONList:
         uid = self.from_login()
-        found = odoo_get_timesheet_records(self.url, self.cookies(), uid, date)
+        found = self.call(odoo_get_timesheet_records, uid, date)
         # logg.info("%s", found)
         for rec in found:
             self.clean(rec)
@@ -573,7 +678,7 @@ class Odoo:
                  } for item in found]
     def timesheet_record(self, proj: str, task: str, date: Optional[datetime.date] = None) -> JSONList:
         uid = self.from_login()
-        found = odoo_get_timesheet_record(self.url, self.cookies(), uid, proj, task, date)
+        found = self.call(odoo_get_timesheet_record, uid, proj, task, date)
         # logg.info("%s", found)
         for rec in found:
             self.clean(rec)
@@ -587,33 +692,31 @@ class Odoo:
                  } for item in found]
     def timesheet_delete(self, entry_id: EntryID) -> bool:
         uid = self.from_login()
-        found = odoo_delete_timesheet_record(self.url, self.cookies(), uid,  #
-                                             entry_id)
+        found = self.call(odoo_delete_timesheet_record, uid, entry_id)
         logg.info("deleted %s", found)
         return found  # bool
     def timesheet_write(self, entry_id: EntryID, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> bool:
         uid = self.from_login()
         proj_id = self.proj_id(proj)
         task_id = self.task_id(proj, task)
-        found = odoo_write_timesheet_record(self.url, self.cookies(), uid,  #
-                                            entry_id, proj_id, task_id,  #
-                                            entry_date=date, entry_size=time, entry_desc=desc)
+        found = self.call(odoo_write_timesheet_record, uid, entry_id, proj_id, task_id,
+                          entry_date=date, entry_size=time, entry_desc=desc)
         logg.info("written %s", found)
         return found  # bool
     def timesheet_create(self, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> bool:
         uid = self.from_login()
         proj_id = self.proj_id(proj)
         task_id = self.task_id(proj, task)
-        found = odoo_add_timesheet_record(self.url, self.cookies(), uid, proj_id, task_id,
-                                          entry_date=date, entry_size=time, entry_desc=desc)
+        found = self.call(odoo_add_timesheet_record, uid, proj_id, task_id,
+                          entry_date=date, entry_size=time, entry_desc=desc)
         logg.info("created %s", found)
         return found  # bool
     def timesheet_update(self, proj: ProjREF, task: TaskREF, date: Day, time: Num, desc: str) -> bool:
         uid = self.from_login()
         proj_id = self.proj_id(proj)
         task_id = self.task_id(proj, task)
-        found = odoo_set_timesheet_record(self.url, self.cookies(), uid, proj_id, task_id,
-                                          entry_date=date, entry_size=time, entry_desc=desc)
+        found = self.call(odoo_set_timesheet_record, uid, proj_id, task_id,
+                          entry_date=date, entry_size=time, entry_desc=desc)
         logg.info("updated %s", found)
         return found  # bool
     def timesheet(self, after: Day, before: Optional[Day] = None) -> JSONList:
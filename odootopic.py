@@ -35,6 +35,7 @@ class OdooValuesForTopic:
     custname: Dict[str, str]
     projname: Dict[str, str]
     ticket4: Dict[str, List[str]]
+    resolved: Dict[Tuple[str, bool], Optional[OdooValues]]
     shortnames: bool
     def __init__(self, shortnames: bool = False) -> None:
         self.shortnames = shortnames
@@ -45,6 +46,7 @@ class OdooValuesForTopic:
         self.projname = {}  # a shorthand for "Task" in Odoo
         self.proj_ids = {}  # obsolete - used for old Odoo to generate foreign-refkey
         self.ticket4 = {}  # allow to sync to jira trackers as well
+        self.resolved = {}  # lookup cache, cleared by each scanline
         self.as_prefixed = re.compile(r'^(\S+)\s+=\s*(\S+)')
         self.as_customer = re.compile(r'^(\S+)\s+\[(.*)\](.*)')
         self.as_project0 = re.compile(r'^(\S+)\s+["](AS-(\d+):.*)["](.*)')  # obsolete
@@ -58,6 +60,7 @@ class OdooValuesForTopic:
         """ expecting a line with >> first two chars, 
             followed by topic name, then definitions to be stored"""
         check = False
+        self.resolved.clear()
         m = self.as_prefixed.match(line[2:].strip())
         if m:
             self.prefixed[m.group(1)] = m.group(2)
@@ -121,6 +124,13 @@ class OdooValuesForTopic:
         logg.error("??? %s", line)
     def lookup(self, topic: str, daydate: Optional[Day] = None) -> Optional[OdooValues]:
         """ from a topic try to find the odoo values to be used. """
+        key = (topic, self.shortnames)
+        if key in self.resolved:
+            return self.resolved[key]
+        found = self.resolve(topic)
+        self.resolved[key] = found
+        return found
+    def resolve(self, topic: str) -> Optional[OdooValues]:
         prefix = topic
         # if desc.strip().startswith(":"):
         # desc = topic
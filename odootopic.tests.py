@@ -930,6 +930,26 @@ class odootopicTest(unittest.TestCase):
         logg.debug("data %s", data)
         want = ("Development", "projects", "dev-frontend", "MAKE-122")
         self.assertEqual(want, _tuple(data[0]))
+    def test_700(self) -> None:
+        spec = """
+        >> dev [Development] #dev
+        >> dev "projects"
+        """.splitlines()
+        have = topics.scanning(spec)
+        want = ("Development", "projects", "dev1", None)
+        self.assertEqual(want, _tuple(have.lookup("dev1")))
+        self.assertIs(have.lookup("dev1"), have.lookup("dev1"))
+        self.assertEqual(len(have.resolved), 1)
+        self.assertEqual(None, have.lookup("test1"))
+        self.assertEqual(None, have.lookup("test1"))
+        have.shortnames = True
+        self.assertEqual((":dev", "projects", "dev1", None), _tuple(have.lookup("dev1")))
+        have.shortnames = False
+        have.scanline(">> test [Testing]")
+        self.assertEqual(len(have.resolved), 0)
+        self.assertEqual(("Testing", "", "test1", None), _tuple(have.lookup("test1")))
+        have.scanline(">> dev MAKE-11")
+        self.assertEqual(("Development", "projects", "dev1", "MAKE-11"), _tuple(have.lookup("dev1")))
 
 if __name__ == "__main__":
     # unittest.main()
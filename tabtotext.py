@@ -70,6 +70,7 @@ JSONDictDict = Dict[str, JSONDict]
 
 class DataItem:
     """ Use this as the base class for dataclass types """
+    __slots__ = ()  # subclasses may use slots as well
     def __getitem__(self, name: str) -> JSONItem:
         return cast(JSONItem, getattr(self, name))
     def replace(self, **values: str) -> JSONDict:
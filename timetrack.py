@@ -47,6 +47,7 @@ VAT = 0.10
 
 DAYS = dayrange()
 UPDATE = False
+FULLPULL = False
 SHORTNAME = 0
 SHORTDESC = 0
 ONLYZEIT = 0
@@ -195,6 +196,8 @@ class TimeDB:
             cur.execute("REPLACE INTO versions VALUES(?,?);", ('timesheet', 1.1))
             cur.execute("REPLACE INTO versions VALUES(?,?);", ('timespans', 1.2))
             cur.execute("REPLACE INTO versions VALUES(?,?);", ('timeevent', 1.2))
+            cur.execute("REPLACE INTO versions VALUES(?,?);", ('odoosync', 1.0))
+            cur.execute("REPLACE INTO versions VALUES(?,?);", ('odooentry', 1.0))
             for row in cur.execute("SELECT * FROM versions"):
                 logg.debug("version  %s", row)
             cur.execute("""CREATE TABLE IF NOT EXISTS timesheet(
@@ -209,6 +212,14 @@ class TimeDB:
                 site_name, site_type, proj_name, task_name, entry_date)""")
             cur.execute("""CREATE UNIQUE INDEX IF NOT EXISTS timeevent_date ON timeevent(
                 site_name, site_type, proj_name, task_name, entry_date)""")
+            cur.execute("""CREATE TABLE IF NOT EXISTS odoosync(
+                site_name, user_name, after, before, synced)""")
+            cur.execute("""CREATE TABLE IF NOT EXISTS odooentry(
+                site_name, user_name, entry_id, proj_name, task_name, entry_date, entry_size, entry_desc)""")
+            cur.execute("""CREATE UNIQUE INDEX IF NOT EXISTS odoosync_range ON odoosync(
+                site_name, user_name, after, before)""")
+            cur.execute("""CREATE UNIQUE INDEX IF NOT EXISTS odooentry_id ON odooentry(
+                site_name, entry_id)""")
             found = cur.execute("select name from sqlite_schema where type = 'table'")
             for row in found:
                 logg.debug("table %s", row)
@@ -238,26 +249,62 @@ def pref_desc(desc: str) -> str:
         return desc.split(" ", 1)[0]
 
 def pull_odoo(after: Day, before: Day, conf: Optional[odoo_api.OdooConfig] = None) -> JSONList:
+    """ mirror the odoo timesheet into the timesheet table. The odooentry table remembers the
+        entries of the last pull, so that the next one only asks for the changes since then."""
     r: JSONList = []
     conf = conf or odoo_api.OdooConfig()
     odoo = odoo_api.Odoo(conf)
     uses = TimeConfig()
     pull = TimeDB(uses)
     pull.tables(after)
-    for item in odoo.timesheet(after, before):
-        proj: str = cast(str, item["proj_name"])
-        task: str = cast(str, item["task_name"])
-        desc: str = cast(str, item["entry_desc"])
-        pref: str = pref_desc(desc)
-        date: Day = get_date(cast(str, item["entry_date"]))
-        size: Num = cast(Num, item["entry_size"])
-        logg.info(" %s", f"{date:%Y-%m-%d} {size:.2} : {desc}")
-        site = uses.site()
-        kind = "odoo"
-        logg.info(" %s %s [%s] %s", site, kind, proj, task)
-        with closing(pull.db(after).cursor()) as cur:
-            ok = cur.execute("REPLACE INTO timesheet VALUES(?,?,?,?,?,?,?)", (site, kind, proj, task, date, size, desc))
-            r.append({"row": ok.rowcount, "values": [site, kind, strName(proj), strName(task), f"{date:%Y-%m-%d}"]})
+    site = uses.site()
+    kind = "odoo"
+    user = conf.user or ""
+    since = ""
+    known: Dict[EntryID, Tuple[str, str, str]] = {}
+    with closing(pull.db(after).cursor()) as cur:
+        if not FULLPULL:
+            for row in cur.execute("SELECT synced FROM odoosync WHERE site_name = ? AND user_name = ? AND after = ? AND before = ?",
+                                   (site, user, after.isoformat(), before.isoformat())):
+                since = row[0]
+        for row in cur.execute("SELECT entry_id, proj_name, task_name, entry_date FROM odooentry WHERE site_name = ? AND user_name = ?"
+                               " AND entry_date >= ? AND entry_date <= ?", (site, user, after.isoformat(), before.isoformat())):
+            known[row[0]] = (row[1], row[2], row[3])
+    changes = odoo.timesheet_changes(after, before, since, known.keys())
+    if since:
+        logg.info("changes since %s: %s changed, %s deleted", since, len(changes.changed), len(changes.deleted))
+    touched: Dict[Tuple[str, str, str], int] = {}
+    with closing(pull.db(after).cursor()) as cur:
+        for entry_id in changes.deleted:
+            touched[known[entry_id]] = 1
+            cur.execute("DELETE FROM odooentry WHERE site_name = ? AND entry_id = ?", (site, entry_id))
+        for item in changes.changed:
+            entry_id = cast(EntryID, item["entry_id"])
+            proj: str = cast(str, item["proj_name"])
+            task: str = cast(str, item["task_name"])
+            desc: str = cast(str, item["entry_desc"])
+            date: Day = get_date(cast(str, item["entry_date"]))
+            size: Num = cast(Num, item["entry_size"])
+            logg.info(" %s", f"{date:%Y-%m-%d} {size:.2} : {desc}")
+            logg.info(" %s %s [%s] %s", site, kind, proj, task)
+            if entry_id in known:
+                touched[known[entry_id]] = 1
+            touched[(proj, task, date.isoformat())] = 1
+            cur.execute("REPLACE INTO odooentry VALUES(?,?,?,?,?,?,?,?)", (site, user, entry_id, proj, task, date.isoformat(), size, desc))
+        for proj, task, isodate in touched:
+            date = get_date(isodate)
+            # like a full pull, the entry with the lowest entry_id wins when there are multiple on a day
+            found = list(cur.execute("SELECT entry_size, entry_desc FROM odooentry WHERE site_name = ? AND user_name = ?"
+                                     " AND proj_name = ? AND task_name = ? AND entry_date = ? ORDER BY entry_id LIMIT 1",
+                                     (site, user, proj, task, isodate)))
+            if found:
+                size, desc = found[0]
+                ok = cur.execute("REPLACE INTO timesheet VALUES(?,?,?,?,?,?,?)", (site, kind, proj, task, date, size, desc))
+            else:
+                ok = cur.execute("DELETE FROM timesheet WHERE site_name = ? AND site_type = ? AND proj_name = ? AND task_name = ?"
+                                 " AND entry_date = ?", (site, kind, proj, task, date))
+            r.append({"row": ok.rowcount, "values": [site, kind if found else "deleted", strName(proj), strName(task), f"{date:%Y-%m-%d}"]})
+        cur.execute("REPLACE INTO odoosync VALUES(?,?,?,?,?)", (site, user, after.isoformat(), before.isoformat(), changes.synced))
     pull.commit()
     return r
 
@@ -509,6 +556,8 @@ if __name__ == "__main__":
     cmdline.add_option("-c", "--config", metavar="NAME=VALUE", action="append", default=[])
     cmdline.add_option("-y", "--update", action="store_true", default=UPDATE,
                        help="actually update odoo")
+    cmdline.add_option("--fullpull", action="store_true", default=FULLPULL,
+                       help="pull all odoo entries again (not only the changes)")
     opt, args = cmdline.parse_args()
     logging.basicConfig(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
     logg.setLevel(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
@@ -520,6 +569,7 @@ if __name__ == "__main__":
     config = ConfigParser()
     config.read_string(default_config(False))
     UPDATE = opt.update
+    FULLPULL = opt.fullpull
     LABELS = opt.labels
     OUTPUT = opt.output
     JSONFILE = opt.jsonfile
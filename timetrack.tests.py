@@ -4,13 +4,16 @@ __copyright__ = "(C) 2019-2025 Guido Draheim, licensed under the Apache License
 __version__ = "0.2.4023"
 
 import timetrack as track
-from typing import Optional
+import odoo2data_api
+import odoo2data_api_mockup
+from typing import Optional, List, Tuple
 import datetime
 import unittest
 import tempfile
 import os
 import os.path as path
 import sys
+import sqlite3
 from configparser import ConfigParser
 from fnmatch import fnmatchcase as fnmatch
 
@@ -19,6 +22,8 @@ logg = logging.getLogger("TEST")
 
 SCRIPT = "./timetrack.py"
 
+Day = datetime.date
+
 class timetrackTest(unittest.TestCase):
     def setUp(self) -> None:
         track.OUTPUT = ""
@@ -58,6 +63,45 @@ class timetrackTest(unittest.TestCase):
         logg.info("data %s", data)
         want = [{'db': 'testdb', 'name': 'odoo', 'type': 'odoo', 'url': 'https://example.com'}]
         self.assertEqual(want, data)
+    def timesheet(self, filename: str) -> List[Tuple[str, str, str, float, str]]:
+        with sqlite3.connect(filename) as conn:
+            return list(conn.execute("SELECT proj_name, task_name, entry_date, entry_size, entry_desc FROM timesheet ORDER BY entry_date"))
+    def test_201(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        filename = path.join(tmp.name, "timetrack.db3")
+        saved = (track.odoo_api, track.TIME_FILENAME, track.TIME_SITENAME, track.FULLPULL)
+        try:
+            track.odoo_api = odoo2data_api_mockup
+            track.TIME_FILENAME = filename
+            track.TIME_SITENAME = "testsite"
+            odoo2data_api_mockup.reset()
+            odoo = odoo2data_api_mockup.Odoo()
+            odoo.timesheet_create("Project-1", "Developments", Day(2022, 1, 3), 1.5, "dev1 started")
+            odoo.timesheet_create("Project-1", "Developments", Day(2022, 1, 4), 2.5, "dev1 continued")
+            odoo.timesheet_create("MGMT", "Project Management", Day(2022, 1, 4), 0.5, "mgmt call")
+            conf = odoo2data_api.OdooConfig("https://example.com", "testdb")
+            done = track.pull_odoo(Day(2022, 1, 1), Day(2022, 1, 31), conf)
+            self.assertEqual(len(done), 3)
+            self.assertEqual(self.timesheet(filename), [
+                ("Project-1", "Developments", "2022-01-03", 1.5, "dev1 started"),
+                ("Project-1", "Developments", "2022-01-04", 2.5, "dev1 continued"),
+                ("MGMT", "Project Management", "2022-01-04", 0.5, "mgmt call")])
+            done = track.pull_odoo(Day(2022, 1, 1), Day(2022, 1, 31), conf)
+            self.assertEqual(len(done), 1)  # the entry with the last write_date is checked again
+            odoo.timesheet_write(0, "Project-1", "Developments", Day(2022, 1, 3), 1.0, "dev1 started again")
+            odoo.timesheet_delete(1)
+            done = track.pull_odoo(Day(2022, 1, 1), Day(2022, 1, 31), conf)
+            self.assertEqual(len(done), 3)  # changed, deleted, and the last one checked again
+            want = [("Project-1", "Developments", "2022-01-03", 1.0, "dev1 started again"),
+                    ("MGMT", "Project Management", "2022-01-04", 0.5, "mgmt call")]
+            self.assertEqual(self.timesheet(filename), want)
+            track.FULLPULL = True
+            done = track.pull_odoo(Day(2022, 1, 1), Day(2022, 1, 31), conf)
+            self.assertEqual(len(done), 2)
+            self.assertEqual(self.timesheet(filename), want)
+        finally:
+            track.odoo_api, track.TIME_FILENAME, track.TIME_SITENAME, track.FULLPULL = saved
+            tmp.cleanup()
 
 if __name__ == "__main__":
     # unittest.main()
@@ -84,8 +84,8 @@ def update_per_days(data: JSONList, user: str = NIX) -> JSONList:
     daydata: Dict[str, Dict[Day, JSONList]] = {}
     jira = jira_api.Worklogs(user=user, remote=REMOTE)
     logg.debug("tickets = %s", tickets)
-    for taskname, items in tickets.items():
-        for item in jira.timesheet(taskname, DAYS.after, DAYS.before):
+    for taskname, worklogs in jira.timesheets(tickets, DAYS.after, DAYS.before):
+        for item in worklogs:
             item_date: Day = get_date(cast(str, item["entry_date"]))
             item_size: Num = cast(Num, item["entry_size"])
             if taskname not in daydata:
@@ -158,8 +158,8 @@ def summary_per_day(data: JSONList, user: str = NIX) -> JSONList:
     if ONLYZEIT:
         return list(daydata.values())
     jira = jira_api.Worklogs(user=user, remote=REMOTE)
-    for taskname, hint in tickets.items():
-        for item in jira.timesheet(taskname, DAYS.after, DAYS.before):
+    for taskname, worklogs in jira.timesheets(tickets, DAYS.after, DAYS.before, ordered=True):
+        for item in worklogs:
             logg.info("............. %s", item)
             old_date: Day = get_date(cast(str, item["entry_date"]))
             old_size: Num = cast(Num, item["entry_size"])
@@ -191,8 +191,9 @@ def summary_per_project_ticket(data: JSONList, user: str = NIX) -> JSONList:
         return list(sumdata.values())
     dayjira: Dict[Day, JSONList] = {}
     jira = jira_api.Worklogs(user=user, remote=REMOTE)
-    for taskname, projname in tickets.items():
-        for item in jira.timesheet(taskname, DAYS.after, DAYS.before):
+    for taskname, worklogs in jira.timesheets(tickets, DAYS.after, DAYS.before, ordered=True):
+        projname = tickets[taskname]
+        for item in worklogs:
             old_date: Day = get_date(cast(str, item["entry_date"]))
             old_size: Num = cast(Num, item["entry_size"])
             old_key = taskname
@@ -244,8 +245,9 @@ def summary_per_topic(data: JSONList, user: str = NIX) -> JSONList:
     if ONLYZEIT:
         return list(sumdata.values())
     jira = jira_api.Worklogs(user=user, remote=REMOTE)
-    for taskname, projname in tickets.items():
-        for item in jira.timesheet(taskname, DAYS.after, DAYS.before):
+    for taskname, worklogs in jira.timesheets(tickets, DAYS.after, DAYS.before, ordered=True):
+        projname = tickets[taskname]
+        for item in worklogs:
             old_desc: str = cast(str, item["entry_desc"])
             old_date: Day = get_date(cast(str, item["entry_date"]))
             old_size: Num = cast(Num, item["entry_size"])
@@ -410,6 +412,8 @@ if __name__ == "__main__":
     cmdline.add_option("-c", "--config", metavar="NAME=VALUE", action="append", default=[])
     cmdline.add_option("-y", "--update", action="store_true", default=UPDATE,
                        help="actually update odoo")
+    cmdline.add_option("--since-updated", action="store_true", default=False,
+                       help="fetch only the jira worklogs updated since the start day [%default]")
     opt, args = cmdline.parse_args()
     logging.basicConfig(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
     logg.setLevel(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
@@ -420,6 +424,7 @@ if __name__ == "__main__":
     dotnetrc.add_password_filename(opt.netcredentials, opt.extracredentials)
     REMOTE = opt.remote
     UPDATE = opt.update
+    jira_api.WORKLOG_UPDATED = opt.since_updated
     LABELS = opt.labels
     OUTPUT = opt.output
     JSONFILE = opt.jsonfile
@@ -12,14 +12,18 @@ older optins)
 __copyright__ = "(C) 2017-2025 Guido Draheim, licensed under the Apache License 2.0"""
 __version__ = "0.6.4023"
 
-from typing import List, Dict, Union, Optional, Sequence, TextIO, Iterator, cast
+from typing import List, Dict, Tuple, Union, Optional, Sequence, TextIO, Iterator, Iterable, Callable, cast
 
 import logging
 import re
 import os
 import csv
+import json
+import locale
 import datetime
 import os.path as path
+from functools import lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor
 
 import tabtotext
 from tabtotext import JSONList, JSONDict, JSONItem, viewFMT
@@ -49,6 +53,11 @@ ZEIT_USER_NAME = ""
 ZEIT_FUTURE = False
 
 DEFAULT_FILENAME = "~/zeit{YEAR}.txt"
+ZEIT_INDEX = True  # use a sidecar index to read only the weeks of the date range
+ZEIT_PROCESSES = 4  # parse the zeit{YEAR} files of a multi-year range in parallel
+WEEKSPAN = datetime.timedelta(days=7)
+WEEKSTARS = ["**", "***", "****", "*****", "******", "*******"]
+WEEKCACHE = 4096  # parsed WEEK headers to keep
 
 WRITEXLSX = False
 WRITEJSON = True
@@ -76,6 +85,19 @@ _zeit_topics_mapping = """
 >> odoo "Odoo Automation",
 """
 
+WEEKSPAN1 = re.compile(r"(\d+[.]\d+[.]\d*)-*(\d+[.]\d+[.]\d*).*")
+WEEKSTART1 = re.compile(r"(\d+[.]\d+[.]\d*) *$")
+WEEKDAYINDEX = {"mo": 0, "di": 1, "tu": 1, "mi": 2, "we": 2, "do": 3, "th": 3, "fr": 4, "sa": 5, "so": 6, "su": 6}
+WEEKDAYDELTAS = [datetime.timedelta(days=n) for n in range(8)]
+
+@lru_cache(maxsize=WEEKCACHE)
+def parse_weekstart(weekdesc: str, year: int) -> Optional[Day]:
+    """ the first date in the WEEK header, where a date without a year is in the given year """
+    match1 = WEEKSPAN1.match(weekdesc) or WEEKSTART1.match(weekdesc)
+    if not match1:
+        return None
+    return get_date(match1.group(1), Day(year, 12, 31))
+
 class DateFromWeekday:
     mo: Optional[Day] = None
     di: Optional[Day] = None
@@ -86,18 +108,18 @@ class DateFromWeekday:
     so: Optional[Day] = None
     ignore = False
     def __init__(self) -> None:
-        self.weekspan1 = re.compile(r"(\d+[.]\d+[.]\d*)-*(\d+[.]\d+[.]\d*).*")
-        self.weekstart1 = re.compile(r"(\d+[.]\d+[.]\d*) *$")
+        self.days: List[Optional[Day]] = [None] * 7  # mo di mi do fr sa so
+    def weekstart(self, weekdesc: str, refdate: Optional[Day] = None) -> Optional[Day]:
+        """ the first date in the WEEK header (None if it can not be parsed) """
+        return parse_weekstart(weekdesc, (refdate or Day.today()).year)
     def setweek(self, weekdesc: str, weekdays: List[str] = ["so", "mo"], refdate: Optional[Day] = None) -> bool:
         today = Day.today()
-        span1 = self.weekspan1.match(weekdesc)
-        start1 = self.weekstart1.match(weekdesc)
-        match1 = span1 or start1
-        if not match1:
+        # sync weekdays to dates
+        weekstart = self.weekstart(weekdesc, refdate)
+        if weekstart is None:
             logg.error("could not parse WEEK %s", weekdesc)
             return False
-        # sync weekdays to dates
-        date1 = get_date(match1.group(1), refdate or today)
+        date1 = weekstart
         if date1 > today and not ZEIT_FUTURE:
             logg.info("going to ignore future week date (%s)", date1)
             self.ignore = True
@@ -105,46 +127,21 @@ class DateFromWeekday:
             self.ignore = False
         # checking if given date1 matches with day-name of the weekstart
         logg.debug("start of week %s", date1)
-        offset = 0
-        plus2 = date1 + datetime.timedelta(days=2)
-        if "sa" in weekdays and plus2.weekday() == 0:  # 0(monday)
-            self.sa = date1 + datetime.timedelta(days=0)
-            self.so = date1 + datetime.timedelta(days=1)
-            self.mo = date1 + datetime.timedelta(days=2)
-            self.di = date1 + datetime.timedelta(days=3)
-            self.mi = date1 + datetime.timedelta(days=4)
-            self.do = date1 + datetime.timedelta(days=5)
-            self.fr = date1 + datetime.timedelta(days=6)
+        plus2 = (date1.weekday() + 2) % 7
+        if "sa" in weekdays and plus2 == 0:  # 0(monday)
+            self.setdays(date1, [2, 3, 4, 5, 6, 0, 1])
             logg.debug("accept %s %s as 'sa'", weekdays, date1)
             return True
-        elif "so" in weekdays and plus2.weekday() == 1:  # 1(tuesday)
-            self.so = date1 + datetime.timedelta(days=0)
-            self.mo = date1 + datetime.timedelta(days=1)
-            self.di = date1 + datetime.timedelta(days=2)
-            self.mi = date1 + datetime.timedelta(days=3)
-            self.do = date1 + datetime.timedelta(days=4)
-            self.fr = date1 + datetime.timedelta(days=5)
-            self.sa = date1 + datetime.timedelta(days=6)
+        elif "so" in weekdays and plus2 == 1:  # 1(tuesday)
+            self.setdays(date1, [1, 2, 3, 4, 5, 6, 0])
             logg.debug("accept %s %s as 'so'", weekdays, date1)
             return True
-        elif "so" in weekdays and "mo" in weekdays and plus2.weekday() == 2:
-            self.so = date1 + datetime.timedelta(days=1)
-            self.mo = date1 + datetime.timedelta(days=2)
-            self.di = date1 + datetime.timedelta(days=3)
-            self.mi = date1 + datetime.timedelta(days=4)
-            self.do = date1 + datetime.timedelta(days=5)
-            self.fr = date1 + datetime.timedelta(days=6)
-            self.sa = date1 + datetime.timedelta(days=7)
+        elif "so" in weekdays and "mo" in weekdays and plus2 == 2:
+            self.setdays(date1, [2, 3, 4, 5, 6, 7, 1])
             logg.debug("accept %s %s as 'so'", weekdays, date1)
             return True
-        elif "mo" in weekdays and plus2.weekday() == 2:
-            self.mo = date1 + datetime.timedelta(days=1)
-            self.di = date1 + datetime.timedelta(days=2)
-            self.mi = date1 + datetime.timedelta(days=3)
-            self.do = date1 + datetime.timedelta(days=4)
-            self.fr = date1 + datetime.timedelta(days=5)
-            self.sa = date1 + datetime.timedelta(days=6)
-            self.so = date1 + datetime.timedelta(days=7)
+        elif "mo" in weekdays and plus2 == 2:
+            self.setdays(date1, [1, 2, 3, 4, 5, 6, 7])
             logg.debug("accept %s %s as 'mo'", weekdays, date1)
             return True
         else:
@@ -155,25 +152,18 @@ class DateFromWeekday:
             logg.info("going to ignore incompatible weekstart (%s %s)", weekdays, weekdesc)
             self.ignore = True
             return False
+    def setdays(self, date1: Day, offsets: List[int]) -> None:
+        """ the dates of mo..so as offsets from the weekstart """
+        self.days = [date1 + WEEKDAYDELTAS[offset] for offset in offsets]
+        self.mo, self.di, self.mi, self.do, self.fr, self.sa, self.so = self.days
     def daydate(self, day: str, line: Optional[str] = None) -> Optional[Day]:
         if self.ignore:
             if line:
                 logg.warning("ignoring %s", line)
             return None
-        if day in ["mo"]:
-            return self.mo
-        if day in ["di", "tu"]:
-            return self.di
-        if day in ["mi", "we"]:
-            return self.mi
-        if day in ["do", "th"]:
-            return self.do
-        if day in ["fr"]:
-            return self.fr
-        if day in ["sa"]:
-            return self.sa
-        if day in ["so", "su"]:
-            return self.so
+        index = WEEKDAYINDEX.get(day)
+        if index is not None:
+            return self.days[index]
         logg.error("no day to put the line to: %s", day)
         if line:
             logg.error("   %s", line.strip())
@@ -191,9 +181,27 @@ def time2float(time: str) -> float:
         return float(newtime)
     return float(time)
 
+def time2float_table() -> Dict[str, float]:
+    """ the usual quarter-hour times like "1:30" or "2,5" converted in advance """
+    table: Dict[str, float] = {}
+    for hour in range(25):
+        table[str(hour)] = time2float(str(hour))
+        for minutes, decimals in [("00", ["0", "00"]), ("15", ["25"]), ("30", ["5", "50"]), ("45", ["75"])]:
+            table[f"{hour}:{minutes}"] = time2float(f"{hour}:{minutes}")
+            for decimal in decimals:
+                table[f"{hour},{decimal}"] = time2float(f"{hour},{decimal}")
+                table[f"{hour}.{decimal}"] = time2float(f"{hour}.{decimal}")
+    return table
+
+TIMEFLOATS = time2float_table()
+
+CLEANDESC = re.compile(r"(.*)\S*\d:\d+\S*$")
+
 def cleandesc(desc: str) -> str:
     d = desc.replace("*", "").replace(" , ", ", ")
-    m = re.match("(.*)\\S*\\d:\\d+\\S*$", d)
+    if ":" not in d:
+        return d
+    m = CLEANDESC.match(d)
     if m:
         return m.group(1)
     return d
@@ -264,6 +272,22 @@ class ZeitConfig:
     def filename(self, after: Day) -> str:
         filename = self.filespec()
         return self.expand(filename, after)
+    def filenames(self, after: Day, before: Day) -> List[str]:
+        """ the zeit{YEAR} files for each year of the range (the first one is always included) """
+        return [filename for filename, refdate in self.yearfiles(after, before)]
+    def yearfiles(self, after: Day, before: Day) -> List[Tuple[str, Day]]:
+        """ the filenames with the reference date for their WEEK headers without a year """
+        filespec = self.filespec()
+        if "{YEAR" not in filespec:
+            return [(self.expand(filespec, after), before)]
+        yearfiles = [(self.expand(filespec, after), min(before, Day(after.year, 12, 31)))]
+        for year in range(after.year + 1, before.year + 1):
+            filename = self.expand(filespec, Day(year, 1, 1))
+            if not path.exists(filename):
+                logg.info("no zeit file for %s: %s", year, filename)
+                continue
+            yearfiles.append((filename, min(before, Day(year, 12, 31))))
+        return yearfiles
     def expand(self, filename: str, after: Day) -> str:
         YEAR = after.year
         return path.expanduser(filename.format(**locals()))
@@ -272,96 +296,204 @@ class Zeit:
     def __init__(self, config: Optional[ZeitConfig] = None):
         self.config = config or ZeitConfig()
     def read_entries(self, on_or_after: Day, on_or_before: Day) -> JSONList:
-        filename = self.config.filename(on_or_after)
-        return read_data(filename, on_or_after, on_or_before)
+        yearfiles = self.config.yearfiles(on_or_after, on_or_before)
+        return read_files(yearfiles, on_or_after, on_or_before, read_data)
     def read_entries2(self, on_or_after: Day, on_or_before: Day) -> JSONList:
-        filename = self.config.filename(on_or_after)
-        return read_data2(filename, on_or_after, on_or_before)
+        yearfiles = self.config.yearfiles(on_or_after, on_or_before)
+        return read_files(yearfiles, on_or_after, on_or_before, read_data2)
+
+ZeitReader = Callable[[str, Day, Day, Day], JSONList]
+
+def read_files(yearfiles: List[Tuple[str, Day]], on_or_after: Day, on_or_before: Day, reader: ZeitReader) -> JSONList:
+    """ the entries of the zeit files in the order of the files. Each file has its own >> mappings
+        and its own reference date for WEEK headers without a year, so that multiple files are
+        parsed independently in a pool of ZEIT_PROCESSES. """
+    if len(yearfiles) <= 1 or ZEIT_PROCESSES <= 1:
+        return [item for filename, refdate in yearfiles for item in reader(filename, on_or_after, on_or_before, refdate)]
+    settings = (ZEIT_SHORT, ZEIT_FUTURE, ZEIT_INDEX)
+    read_file = partial(read_with, settings, reader, on_or_after, on_or_before)
+    with ProcessPoolExecutor(min(ZEIT_PROCESSES, len(yearfiles))) as pool:
+        return [item for data in pool.map(read_file, yearfiles) for item in data]
+def read_with(settings: Tuple[bool, bool, bool], reader: ZeitReader, on_or_after: Day, on_or_before: Day, yearfile: Tuple[str, Day]) -> JSONList:
+    """ run the reader in a pool process, with the settings of the parent process """
+    global ZEIT_SHORT, ZEIT_FUTURE, ZEIT_INDEX
+    ZEIT_SHORT, ZEIT_FUTURE, ZEIT_INDEX = settings
+    filename, refdate = yearfile
+    return reader(filename, on_or_after, on_or_before, refdate)
 
 def read_zeit(on_or_after: Day, on_or_before: Day) -> JSONList:
     zeit = Zeit()
     return zeit.read_entries(on_or_after, on_or_before)
-def read_data(filename: str, on_or_after: Optional[Day] = None, on_or_before: Optional[Day] = None) -> JSONList:
+def read_data(filename: str, on_or_after: Optional[Day] = None, on_or_before: Optional[Day] = None, refdate: Optional[Day] = None) -> JSONList:
     logg.info("reading %s", filename)
-    return scan_data(open(filename), on_or_after, on_or_before)
-def read_data2(filename: str, on_or_after: Optional[Day] = None, on_or_before: Optional[Day] = None) -> JSONList:
+    after, before = on_or_after or get_zeit_after(), on_or_before or get_zeit_before()
+    return scan_data(read_lines(filename, after, before, refdate), after, before, refdate=refdate)
+def read_data2(filename: str, on_or_after: Optional[Day] = None, on_or_before: Optional[Day] = None, refdate: Optional[Day] = None) -> JSONList:
     logg.info("reading %s", filename)
-    return scan_data2(open(filename), on_or_after, on_or_before)
+    after, before = on_or_after or get_zeit_after(), on_or_before or get_zeit_before()
+    return scan_data2(read_lines(filename, after, before, refdate), after, before, refdate=refdate)
+def read_lines(filename: str, on_or_after: Day, on_or_before: Day, refdate: Optional[Day] = None) -> Iterator[str]:
+    """ the lines of the zeit file that matter for the range (see ZEIT_INDEX) """
+    if ZEIT_INDEX:
+        return ZeitIndex(filename).load().lines(on_or_after, on_or_before, refdate)
+    return iter(open(filename))
 
-def scan_data2(lines_from_file: Union[Sequence[str], TextIO], on_or_after: Optional[Day] = None, on_or_before: Optional[Day] = None, username: Optional[str] = None) -> JSONList:
-    return list(each_scan_data2(lines_from_file, on_or_after or get_zeit_after(), on_or_before or get_zeit_before(), username))
-def each_scan_data2(lines_from_file: Union[Sequence[str], TextIO], on_or_after: Day, on_or_before: Day, username: Optional[str] = None) -> Iterator[JSONDict]:
-    for item in scanlines(lines_from_file, on_or_after, on_or_before, username):
+def zeit_index_filename(filename: str) -> str:
+    return path.join(path.dirname(filename), "." + path.basename(filename) + ".idx")
+
+class ZeitIndex:
+    """ the byte offsets of the WEEK headers and of the >> mapping lines of a zeit file.
+        It is stored next to the file and rebuilt when the file size or mtime changes. """
+    version = 1
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.encoding = locale.getpreferredencoding(False)
+        self.size = 0
+        self.mtime = 0.
+        self.weeks: List[Tuple[int, str]] = []  # (offset, weekdesc)
+        self.maps: List[Tuple[int, str]] = []  # (offset, mapping line)
+    def load(self) -> "ZeitIndex":
+        stat = os.stat(self.filename)
+        indexfile = zeit_index_filename(self.filename)
+        try:
+            with open(indexfile) as f:
+                data = json.load(f)
+            if data["version"] == self.version and data["size"] == stat.st_size and data["mtime"] == stat.st_mtime:
+                self.size, self.mtime = stat.st_size, stat.st_mtime
+                self.weeks = [(int(offset), str(weekdesc)) for offset, weekdesc in data["weeks"]]
+                self.maps = [(int(offset), str(line)) for offset, line in data["maps"]]
+                return self
+            logg.debug("outdated %s", indexfile)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logg.debug("no index %s: %s", indexfile, e)
+        self.size, self.mtime = stat.st_size, stat.st_mtime
+        self.scan()
+        try:
+            with open(indexfile + ".tmp", "w") as f:
+                json.dump({"version": self.version, "size": self.size, "mtime": self.mtime,
+                           "weeks": self.weeks, "maps": self.maps}, f)
+            os.replace(indexfile + ".tmp", indexfile)
+        except OSError as e:
+            logg.debug("can not write %s: %s", indexfile, e)
+        return self
+    def scan(self) -> None:
+        self.weeks = []
+        self.maps = []
+        offset = 0
+        with open(self.filename, "rb") as f:
+            for rawline in f:
+                line = rawline.decode(self.encoding, errors="replace").strip()
+                if line.startswith(">>"):
+                    self.maps.append((offset, line))
+                elif not line.startswith("#"):
+                    weekdesc = weekheader(line)
+                    if weekdesc:
+                        self.weeks.append((offset, weekdesc))
+                offset += len(rawline)
+    def weekstarts(self, refdate: Day) -> List[Optional[Day]]:
+        weekmap = DateFromWeekday()
+        starts: List[Optional[Day]] = []
+        for offset, weekdesc in self.weeks:
+            try:
+                starts.append(weekmap.weekstart(weekdesc, refdate))
+            except ValueError as e:
+                logg.debug("no weekstart %s: %s", weekdesc, e)
+                starts.append(None)
+        return starts
+    def lines(self, on_or_after: Day, on_or_before: Day, refdate: Optional[Day] = None) -> Iterator[str]:
+        """ the >> mapping lines before the first week that may have dates in the range,
+            followed by the lines up to the last week that may have dates in the range """
+        starts = self.weekstarts(refdate or on_or_before)
+        first = 0
+        while first < len(starts) and starts[first] is not None and cast(Day, starts[first]) + WEEKSPAN < on_or_after:
+            first += 1  # week lines are within 7 days after the week start
+        last = len(starts)
+        while last > first and starts[last - 1] is not None and cast(Day, starts[last - 1]) > on_or_before:
+            last -= 1
+        begin = 0 if not first else self.weeks[first][0] if first < len(self.weeks) else self.size
+        end = self.weeks[last][0] if last < len(self.weeks) else -1
+        logg.debug("%s index: reading weeks %s..%s at %s..%s", self.filename, first, last, begin, end)
+        for offset, line in self.maps:
+            if offset < begin:
+                yield line
+        with open(self.filename, "rb") as f:
+            f.seek(begin)
+            offset = begin
+            for rawline in f:
+                if offset == end:
+                    break
+                offset += len(rawline)
+                yield rawline.decode(self.encoding)
+
+def weekheader(line: str) -> Optional[str]:
+    """ the weekdesc of a "<weekday> **** WEEK <date-string>" line """
+    parts = line.split(None, 3)
+    if len(parts) < 4 or parts[2] != "WEEK":
+        return None
+    if parts[0] == "**" or parts[1] in WEEKSTARS:
+        return parts[3]
+    return None
+
+def scan_data2(lines_from_file: Union[Sequence[str], TextIO, Iterable[str]], on_or_after: Optional[Day] = None, on_or_before: Optional[Day] = None, username: Optional[str] = None, refdate: Optional[Day] = None) -> JSONList:
+    return list(each_scan_data2(lines_from_file, on_or_after or get_zeit_after(), on_or_before or get_zeit_before(), username, refdate))
+def each_scan_data2(lines_from_file: Union[Sequence[str], TextIO, Iterable[str]], on_or_after: Day, on_or_before: Day, username: Optional[str] = None, refdate: Optional[Day] = None) -> Iterator[JSONDict]:
+    for item in scanlines(lines_from_file, on_or_after, on_or_before, username, refdate):
         if TitleID in item:
             del item[TitleID]  # new
         yield item
-def scan_data(lines_from_file: Union[Sequence[str], TextIO], on_or_after: Optional[Day] = None, on_or_before: Optional[Day] = None, username: Optional[str] = None) -> JSONList:
-    return list(each_scan_data(lines_from_file, on_or_after or get_zeit_after(), on_or_before or get_zeit_before(), username))
-def each_scan_data(lines_from_file: Union[Sequence[str], TextIO], on_or_after: Day, on_or_before: Day, username: Optional[str] = None) -> Iterator[JSONDict]:
-    for item in scanlines(lines_from_file, on_or_after, on_or_before, username):
+def scan_data(lines_from_file: Union[Sequence[str], TextIO, Iterable[str]], on_or_after: Optional[Day] = None, on_or_before: Optional[Day] = None, username: Optional[str] = None, refdate: Optional[Day] = None) -> JSONList:
+    return list(each_scan_data(lines_from_file, on_or_after or get_zeit_after(), on_or_before or get_zeit_before(), username, refdate))
+def each_scan_data(lines_from_file: Union[Sequence[str], TextIO, Iterable[str]], on_or_after: Day, on_or_before: Day, username: Optional[str] = None, refdate: Optional[Day] = None) -> Iterator[JSONDict]:
+    for item in scanlines(lines_from_file, on_or_after, on_or_before, username, refdate):
         if TitleTicket in item:
             del item[TitleTicket]  # new
         yield item
 
-def scanlines(lines_from_file: Union[Sequence[str], TextIO], on_or_after: Day, on_or_before: Day, username: Optional[str] = None) -> Iterator[JSONDict]:
+def scanlines(lines_from_file: Union[Sequence[str], TextIO, Iterable[str]], on_or_after: Day, on_or_before: Day, username: Optional[str] = None, refdate: Optional[Day] = None) -> Iterator[JSONDict]:
+    """ the refdate (default on_or_before) gives the year of the WEEK headers without a year """
+    refdate = refdate or on_or_before
     odoomap = OdooValuesForTopic(ZEIT_SHORT)
     weekmap = DateFromWeekday()
     idvalues: Dict[str, str] = {}
-    cols0 = re.compile(r"^(\S+)\s+(\S+)+\s+(\S+)(\s*)$")
-    cols1 = re.compile(r"^(\S+)\s+(\S+)+\s+(\S+)\s+(.*)")
+    skipline = re.compile(r"^\S+ ([(]|\d+-\d+)")
     timespan = re.compile(r"(\d+)(:\d+)?-(\d+)(:\d+)?")
     for line in lines_from_file:
         try:
             line = line.strip()
             if not line:
                 continue
-            if line.startswith("#"):
+            if line[0] == "#":
                 continue
-            if line.startswith(">>"):
+            if line[0] == ">" and line.startswith(">>"):
                 odoomap.scanline(line)
                 continue
             # general format is:
             # <weekday> <timespan> <topic-word> <description>
-            m0 = cols0.match(line)
-            m1 = cols1.match(line)
-            m = m1 or m0
-            if not m:
-                if re.match("^\S+ [(].*", line):
-                    logg.debug("?? %s", line)
-                    continue
-                if re.match("^\S+ \d+-\d+.*", line):
+            parts = line.split(None, 3)
+            if len(parts) < 3:
+                if skipline.match(line):
                     logg.debug("?? %s", line)
                     continue
                 logg.error("?? %s", line)
                 continue
-            day, time, topic, desc = m.groups()
-            if time.startswith("("):
+            day, time, topic = parts[0], parts[1], parts[2]
+            desc = parts[3] if len(parts) > 3 else ""
+            if time[0] == "(":
                 logg.debug("??: %s", line)
                 continue
-            mm = timespan.match(time + "$")
-            if mm:
-                logg.error("ignoring a timespan %s (%s)", time, line.strip())
+            if "-" in time and timespan.match(time):
+                logg.error("ignoring a timespan %s (%s)", time, line)
                 continue
             # checking for week start:
             # <weekday> **** WEEK <date-string>
-            weekdesc = ""
-            weekdays = ["so", "mo"]
-            if day.strip() in ["**"]:  # old-style "** **** WEEK ..."
-                if topic.strip() not in ["WEEK"]:
+            if day == "**" or (time[0] == "*" and time in WEEKSTARS):  # old-style "** **** WEEK ..."
+                if topic != "WEEK":
                     logg.error("could not check *** %s", topic)
                     continue
-                weekdesc = desc
-                logg.debug("found weekdesc %s", weekdesc)
-            elif time.strip() in ["**", "***", "****", "*****", "******", "*******"]:
-                if topic.strip() not in ["WEEK"]:
-                    logg.error("could not check *** %s", topic)
+                logg.debug("found weekdesc %s", desc)
+                if desc:
+                    weekmap.setweek(desc, ["so", "mo"] if day == "**" else [day], refdate)
                     continue
-                weekdesc = desc
-                weekdays = [day]
-                logg.debug("found weekdesc %s", weekdesc)
-            if weekdesc:
-                weekmap.setweek(weekdesc, weekdays, on_or_before)
-                continue
             # else # convert weekday to real date and get odoo values
             daydate = weekmap.daydate(day, line)
             if daydate is None:
@@ -380,7 +512,7 @@ def scanlines(lines_from_file: Union[Sequence[str], TextIO], on_or_after: Day, o
                     logg.error("    on line: %s", line.strip())
                     raise ValueError(topic)
                 itemDate = daydate
-                itemTime = time2float(time)
+                itemTime = TIMEFLOATS[time] if time in TIMEFLOATS else time2float(time)
                 itemDesc = odoo.pref + " " + cleandesc(desc)
                 itemPref = odoo.pref
                 itemProj = odoo.proj
@@ -390,7 +522,7 @@ def scanlines(lines_from_file: Union[Sequence[str], TextIO], on_or_after: Day, o
                     if "(onsite)" in desc:
                         itemTask += " (onsite)"
                 # idx = account.proj_ids[proj]
-                datex = int(daydate.strftime("%y%m%d"))
+                datex = (daydate.year % 100) * 10000 + daydate.month * 100 + daydate.day  # "%y%m%d"
                 # year = daydate.strftime("%y")
                 itemID = "%s%s" % (datex, topic)
                 item: JSONDict = {}
@@ -545,6 +677,8 @@ if __name__ == "__main__":
                        help="present the shorthand names for projects and tasks [%default]")
     cmdline.add_option("-U", "--user-name", metavar="TEXT", default=ZEIT_USER_NAME,
                        help="user name for the output report (not for login)")
+    cmdline.add_option("--noindex", action="store_true", default=not ZEIT_INDEX,
+                       help="read the whole zeit file without the .idx sidecar [%default]")
     opt, args = cmdline.parse_args()
     logging.basicConfig(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
     logg.setLevel(level=max(0, logging.WARNING - 10 * opt.verbose + 10 * opt.quiet))
@@ -568,6 +702,7 @@ if __name__ == "__main__":
     ZEIT_FILENAME = opt.filename
     ZEIT_SUMMARY = opt.summary
     ZEIT_FUTURE = opt.future
+    ZEIT_INDEX = not opt.noindex
     ZEIT_AFTER = opt.after
     ZEIT_BEFORE = opt.before
     if not args or is_dayrange(args[0]):
@@ -4,10 +4,14 @@ __copyright__ = "(C) 2017-2025 Guido Draheim, licensed under the Apache License
 __version__ = "0.6.4023"
 
 import zeit2json as zeit
-from typing import Optional
+from typing import Optional, List, Dict, Tuple, Iterable, Iterator, Union
+from tabtotext import JSONList, JSONDict
+from odootopic import OdooValuesForTopic
 
 import os
+import re
 import sys
+import time
 import unittest
 import tempfile
 import os.path as path
@@ -18,6 +22,120 @@ from datetime import timedelta as Delta
 import logging
 logg = logging.getLogger("TEST")
 
+def time2float_regex(time: str) -> float:
+    """ the time2float before TIMEFLOATS as the reference for the benchmark """
+    return zeit.time2float(time)
+def cleandesc_regex(desc: str) -> str:
+    d = desc.replace("*", "").replace(" , ", ", ")
+    m = re.match("(.*)\\S*\\d:\\d+\\S*$", d)
+    if m:
+        return m.group(1)
+    return d
+
+def scanlines_regex(lines_from_file: Iterable[str], on_or_after: Date, on_or_before: Date, username: Optional[str] = None) -> Iterator[JSONDict]:
+    """ the scanlines before the split tokenizer, matching cols0/cols1/timespan on each line """
+    odoomap = OdooValuesForTopic(zeit.ZEIT_SHORT)
+    weekmap = zeit.DateFromWeekday()
+    idvalues: Dict[str, str] = {}
+    cols0 = re.compile(r"^(\S+)\s+(\S+)+\s+(\S+)(\s*)$")
+    cols1 = re.compile(r"^(\S+)\s+(\S+)+\s+(\S+)\s+(.*)")
+    timespan = re.compile(r"(\d+)(:\d+)?-(\d+)(:\d+)?")
+    logg = zeit.logg
+    for line in lines_from_file:
+        try:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("#"):
+                continue
+            if line.startswith(">>"):
+                odoomap.scanline(line)
+                continue
+            m0 = cols0.match(line)
+            m1 = cols1.match(line)
+            m = m1 or m0
+            if not m:
+                if re.match("^\\S+ [(].*", line):
+                    logg.debug("?? %s", line)
+                    continue
+                if re.match("^\\S+ \\d+-\\d+.*", line):
+                    logg.debug("?? %s", line)
+                    continue
+                logg.error("?? %s", line)
+                continue
+            day, time, topic, desc = m.groups()
+            if time.startswith("("):
+                logg.debug("??: %s", line)
+                continue
+            mm = timespan.match(time + "$")
+            if mm:
+                logg.error("ignoring a timespan %s (%s)", time, line.strip())
+                continue
+            weekdesc = ""
+            weekdays = ["so", "mo"]
+            if day.strip() in ["**"]:
+                if topic.strip() not in ["WEEK"]:
+                    logg.error("could not check *** %s", topic)
+                    continue
+                weekdesc = desc
+                logg.debug("found weekdesc %s", weekdesc)
+            elif time.strip() in ["**", "***", "****", "*****", "******", "*******"]:
+                if topic.strip() not in ["WEEK"]:
+                    logg.error("could not check *** %s", topic)
+                    continue
+                weekdesc = desc
+                weekdays = [day]
+                logg.debug("found weekdesc %s", weekdesc)
+            if weekdesc:
+                weekmap.setweek(weekdesc, weekdays, on_or_before)
+                continue
+            daydate = weekmap.daydate(day, line)
+            if daydate is None:
+                logg.error("no daydate for day '%s'", day)
+                continue
+            if on_or_after and daydate < on_or_after:
+                logg.debug("daydate %s is before %s", daydate, on_or_after)
+                continue
+            if on_or_before and daydate > on_or_before:
+                logg.debug("daydate %s is after %s", daydate, on_or_before)
+                continue
+            odoo = odoomap.lookup(topic, daydate)
+            if not odoo:
+                logg.error("can not find odoo values for topic %s (on %s)", topic, daydate)
+                logg.error("    on line: %s", line.strip())
+                raise ValueError(topic)
+            itemTask = odoo.task
+            if zeit.ZEIT_SHORT:
+                if "(onsite)" in desc:
+                    itemTask += " (onsite)"
+            itemID = "%s%s" % (int(daydate.strftime("%y%m%d")), topic)
+            item: JSONDict = {}
+            item[zeit.TitleID] = itemID
+            item[zeit.TitleDate] = daydate
+            item[zeit.TitleTime] = time2float_regex(time)
+            item[zeit.TitleDesc] = odoo.pref + " " + cleandesc_regex(desc)
+            item[zeit.TitlePref] = odoo.pref
+            item[zeit.TitleProj] = odoo.proj
+            item[zeit.TitleTask] = itemTask
+            item[zeit.TitleUser] = username
+            item[zeit.TitleTicket] = odoo.ticket
+            if itemID in idvalues:
+                logg.error("duplicate idvalue %s", itemID)
+                logg.error("OLD:   %s", idvalues[itemID].strip())
+                logg.error("NEW:   %s", line.strip())
+            idvalues[itemID] = line
+            yield item
+        except:
+            logg.error("FOR:    %s", line.strip())
+            raise
+
+class LogRecords(logging.Handler):
+    def __init__(self) -> None:
+        logging.Handler.__init__(self, logging.DEBUG)
+        self.records: List[Tuple[str, str]] = []
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append((record.levelname, record.getMessage()))
+
 
 class zeit2jsonTest(unittest.TestCase):
     def last_sunday(self) -> Date:
@@ -162,6 +280,167 @@ class zeit2jsonTest(unittest.TestCase):
         self.assertEqual(data[0]["Task"], "project1")
         self.assertEqual(data[0]["Topic"], "dev1")
         self.assertEqual(len(data), 1)
+    def test_201(self) -> None:
+        lines = ["# zeit", ">> dev1 [Development]", ">> dev1 \"project1\""]
+        for week in range(10):
+            sunday = Date(2022, 1, 2) + Delta(days=7 * week)
+            if week == 5:
+                lines += [">> dev2 [Development]", ">> dev2 \"project2\""]
+            saturday = sunday + Delta(days=6)
+            lines += [f"so **** WEEK {sunday.day:02}.{sunday.month:02}.-{saturday.day:02}.{saturday.month:02}.",
+                      f"so 1:15 dev1 started {week}", f"mi 2:00 dev{1 + (week >= 5)} checked {week}", f"sa 0:30 dev1 fixed {week}"]
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = path.join(tmp, "zeit2022.txt")
+            with open(filename, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            after, before = Date(2022, 2, 1), Date(2022, 2, 14)
+            want = zeit.scan_data(lines, after, before)
+            self.assertEqual(len(want), 6)
+            self.assertEqual(zeit.read_data(filename, after, before), want)
+            indexfile = zeit.zeit_index_filename(filename)
+            self.assertTrue(path.exists(indexfile))
+            self.assertEqual(len(zeit.ZeitIndex(filename).load().weeks), 10)
+            self.assertLess(len(list(zeit.read_lines(filename, after, before))), len(lines) - 10)
+            self.assertEqual(zeit.read_data(filename, Date(2022, 1, 8), Date(2022, 1, 9)), zeit.scan_data(lines, Date(2022, 1, 8), Date(2022, 1, 9)))
+            self.assertEqual(zeit.read_data(filename, Date(2022, 3, 10), Date(2022, 12, 31)), zeit.scan_data(lines, Date(2022, 3, 10), Date(2022, 12, 31)))
+            with open(filename, "a") as f:
+                f.write("so **** WEEK 13.03.-19.03.\nmo 1:00 dev2 appended\n")
+            data = zeit.read_data(filename, Date(2022, 3, 10), Date(2022, 12, 31))
+            self.assertEqual(data[-1]["Topic"], "dev2")
+            self.assertEqual(data[-1]["Task"], "project2")
+            self.assertEqual(len(zeit.ZeitIndex(filename).load().weeks), 11)
+    def test_202(self) -> None:
+        weekmap = zeit.DateFromWeekday()
+        self.assertEqual(weekmap.daydate("mo"), None)
+        self.assertTrue(weekmap.setweek("02.01.-08.01.", ["so"], Date(2022, 12, 31)))
+        self.assertEqual(weekmap.daydate("so"), Date(2022, 1, 2))
+        self.assertEqual(weekmap.daydate("su"), Date(2022, 1, 2))
+        self.assertEqual(weekmap.daydate("tu"), Date(2022, 1, 4))
+        self.assertEqual(weekmap.daydate("sa"), Date(2022, 1, 8))
+        self.assertEqual(weekmap.daydate("xx"), None)
+        self.assertEqual(weekmap.mo, Date(2022, 1, 3))
+        self.assertTrue(weekmap.setweek("08.01.-14.01.", ["sa"], Date(2022, 12, 31)))
+        self.assertEqual(weekmap.daydate("sa"), Date(2022, 1, 8))
+        self.assertEqual(weekmap.daydate("fr"), Date(2022, 1, 14))
+        hits = zeit.parse_weekstart.cache_info().hits
+        self.assertEqual(weekmap.weekstart("08.01.-14.01.", Date(2022, 6, 1)), Date(2022, 1, 8))
+        self.assertEqual(zeit.parse_weekstart.cache_info().hits, hits + 1)
+        self.assertEqual(weekmap.weekstart("08.01.-14.01.", Date(2023, 6, 1)), Date(2023, 1, 8))
+        self.assertEqual(weekmap.weekstart("WEEK"), None)
+    def test_203(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(path.join(tmp, "zeit2021.txt"), "w") as f:
+                f.write(">> dev1 [Development]\n>> dev1 \"project1\"\n"
+                        "so **** WEEK 26.12.2021-01.01.2022\nmo 1:00 dev1 old\nsa 2:00 dev1 new year\n")
+            with open(path.join(tmp, "zeit2022.txt"), "w") as f:
+                f.write(">> dev1 [Maintenance]\n>> dev1 \"project2\"\n"
+                        "so **** WEEK 02.01.2022-08.01.2022\nmo 1:30 dev1 fixed\n")
+            conf = zeit.ZeitConfig(path.join(tmp, "zeit{YEAR}.txt"))
+            self.assertEqual(len(conf.filenames(Date(2021, 12, 1), Date(2023, 1, 31))), 2)
+            self.assertEqual(len(conf.filenames(Date(2022, 1, 1), Date(2022, 1, 31))), 1)
+            data = zeit.Zeit(conf).read_entries(Date(2021, 12, 1), Date(2023, 1, 31))
+            self.assertEqual([item["Date"] for item in data], [Date(2021, 12, 27), Date(2022, 1, 1), Date(2022, 1, 3)])
+            self.assertEqual([item["Project"] for item in data], ["Development", "Development", "Maintenance"])
+            saved = zeit.ZEIT_PROCESSES
+            try:
+                zeit.ZEIT_PROCESSES = 1
+                self.assertEqual(zeit.Zeit(conf).read_entries(Date(2021, 12, 1), Date(2023, 1, 31)), data)
+            finally:
+                zeit.ZEIT_PROCESSES = saved
+            data2 = zeit.Zeit(conf).read_entries2(Date(2021, 12, 1), Date(2022, 12, 31))
+            self.assertEqual([item["Task"] for item in data2], ["project1", "project1", "project2"])
+    def test_204(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(path.join(tmp, "zeit2021.txt"), "w") as f:
+                f.write(">> dev1 [Development]\n>> dev1 \"project1\"\n"
+                        "so **** WEEK 19.12.-25.12.\nmo 1:00 dev1 december\n"
+                        "so **** WEEK 26.12.-01.01.\nmo 2:00 dev1 old\nsa 0:30 dev1 new year\n")
+            with open(path.join(tmp, "zeit2022.txt"), "w") as f:
+                f.write(">> dev1 [Maintenance]\n>> dev1 \"project2\"\n"
+                        "so **** WEEK 02.01.-08.01.\nmo 1:30 dev1 fixed\n")
+            conf = zeit.ZeitConfig(path.join(tmp, "zeit{YEAR}.txt"))
+            self.assertEqual([refdate for filename, refdate in conf.yearfiles(Date(2021, 12, 1), Date(2022, 1, 31))],
+                             [Date(2021, 12, 31), Date(2022, 1, 31)])
+            want = [Date(2021, 12, 20), Date(2021, 12, 27), Date(2022, 1, 1), Date(2022, 1, 3)]
+            data = zeit.Zeit(conf).read_entries(Date(2021, 12, 1), Date(2022, 1, 31))
+            self.assertEqual([item["Date"] for item in data], want)
+            saved = zeit.ZEIT_PROCESSES
+            try:
+                zeit.ZEIT_PROCESSES = 1
+                self.assertEqual(zeit.Zeit(conf).read_entries(Date(2021, 12, 1), Date(2022, 1, 31)), data)
+            finally:
+                zeit.ZEIT_PROCESSES = saved
+            data = zeit.Zeit(conf).read_entries(Date(2021, 12, 21), Date(2022, 1, 1))
+            self.assertEqual([item["Date"] for item in data], want[1:3])
+    def zeitlines(self, count: int) -> List[str]:
+        """ a synthetic zeit file of full weeks starting 2004-01-04 """
+        topics = [f"dev{n}" for n in range(14)]
+        times = ["0:15", "1:30", "2,5", "0:45", "3:00", "1,25", "4:00"]
+        lines = []
+        for n, topic in enumerate(topics):
+            lines += [f">> {topic} [Project{n % 3}]", f">> {topic} \"task{n}\""]
+        sunday = Date(2004, 1, 4)
+        while len(lines) < count:
+            saturday = sunday + Delta(days=6)
+            lines += [f"so **** WEEK {sunday.day:02}.{sunday.month:02}.{sunday.year}-{saturday.day:02}.{saturday.month:02}.{saturday.year}"]
+            for d, day in enumerate(["so", "mo", "di", "mi", "do", "fr", "sa"]):
+                lines += [f"{day} {times[(d + n) % 7]} {topic} worked on {topic} #{n}" for n, topic in enumerate(topics)]
+            sunday += Delta(days=7)
+        return lines[:count]
+    def scanned(self, scanlines: object, lines: List[str], after: Date, before: Date) -> Tuple[Union[JSONList, str], List[Tuple[str, str]]]:
+        """ the items (or the exception) and the log records of one scanlines variant """
+        handler = LogRecords()
+        level = zeit.logg.level
+        zeit.logg.addHandler(handler)
+        zeit.logg.setLevel(logging.DEBUG)
+        zeit.logg.propagate = False
+        try:
+            return list(scanlines(lines, after, before)), handler.records  # type: ignore[operator]
+        except Exception as e:
+            return repr(e), handler.records
+        finally:
+            zeit.logg.propagate = True
+            zeit.logg.setLevel(level)
+            zeit.logg.removeHandler(handler)
+    def test_301(self) -> None:
+        lines = self.zeitlines(100000)
+        after, before = Date(2004, 1, 1), Date(2023, 12, 31)
+        started = time.perf_counter()
+        want = list(scanlines_regex(lines, after, before))
+        elapsed0 = time.perf_counter() - started
+        started = time.perf_counter()
+        data = list(zeit.scanlines(lines, after, before))
+        elapsed = time.perf_counter() - started
+        logg.info("regex scanned %s lines in %.3fs (%.0f lines/s)", len(lines), elapsed0, len(lines) / elapsed0)
+        logg.info("split scanned %s lines in %.3fs (%.0f lines/s)", len(lines), elapsed, len(lines) / elapsed)
+        logg.info("split tokenizer is %.2fx the speed of the regex classification", elapsed0 / elapsed)
+        self.assertEqual(data, want)
+        self.assertGreater(len(data), 98000)
+        self.assertEqual(data[0]["Quantity"], 0.25)
+        self.assertEqual(data[2]["Quantity"], 2.5)
+        self.assertEqual(data[0]["Project"], "Project0")
+    def test_302(self) -> None:
+        head = [">> dev1 [Project1]", '>> dev1 "task1"', ">> dev2 [Project2]", '>> dev2 "task2"',
+                "so **** WEEK 02.01.2022-09.01."]
+        cases = [[""], ["   "], ["# mo 1:30 dev1 comment"], ["mo"], ["mo 1:30"], ["mo 1:30 "],
+                 ["mo (1:30) dev1 maybe"], ["mo (1:30)"], ["mo 9-12"], ["mo 9-12 dev1 meeting"],
+                 ["mo 9:00-12:30 dev1 meeting"], ["mo 9-12x dev1 meeting"], ["mo 1:30 dev1"],
+                 ["mo\t1:30\tdev1\ttabbed"], ["mo  1:30   dev1   spaced  out"], ["mo\u00a01:30 dev1 nbsp"],
+                 ["mo 1:30 dev1\u2003emspace"], ["xx 1:30 dev1 no weekday"], ["mo 1:20 dev1 unusual"],
+                 ["mo 1.5 dev1 dotted"], ["mo 1,5 dev1 comma"], ["mo 1,75 dev1"], ["mo 0:00 dev1 zero"],
+                 ["mo 24:45 dev1 long"], ["mo 25:00 dev1 longer"], ["mo 1:30 dev1 until 10:30"],
+                 ["mo 1:30 dev1 with ** stars **"], ["mo 1:30 dev1 this , that"], ["mo 1:30 dev2 (onsite)"],
+                 ["mo abc dev1 not a time"], ["mo 1:30 dev3 unknown topic"], ["mo 1:30 dev1 a", "mo 0:30 dev1 b"],
+                 ["so **** WEEK 09.01.2022-16.01.", "mo 1:30 dev1 next"], ["mo ** WEEK 10.01.2022", "di 1:00 dev1"],
+                 ["** **** WEEK 09.01.2022-16.01.", "mo 2:00 dev1 old style"], ["** **** WEEK"], ["so **** WEEK"],
+                 ["mo **** TEST 10.01."], ["** **** TEST x"], ["so ******** WEEK 09.01.2022"],
+                 ["so **** WEEK 26.12.2021-02.01.", "mo 1:00 dev1 before"], [">> dev1", "mo 1:00 dev1 remapped"]]
+        for case in cases:
+            lines = head + case
+            want, wantlog = self.scanned(scanlines_regex, lines, Date(2022, 1, 1), Date(2022, 12, 31))
+            have, havelog = self.scanned(zeit.scanlines, lines, Date(2022, 1, 1), Date(2022, 12, 31))
+            self.assertEqual(have, want, case)
+            self.assertEqual(havelog, wantlog, case)
 
 if __name__ == "__main__":
     # unittest.main()
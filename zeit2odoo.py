@@ -193,6 +193,8 @@ def update_per_days(data: JSONList) -> JSONList:
 def __update_per_days(data: JSONList, daydata: Dict[Day, JSONList]) -> JSONList:
     changes: JSONList = []
     odoo = odoo_api.Odoo()
+    batch = odoo.batch()
+    queued: Dict[int, JSONDict] = {}
     for day in sorted(daydata.keys()):
         items = daydata[day]
         found = odoo.timesheet_records(day)
@@ -216,11 +218,11 @@ def __update_per_days(data: JSONList, daydata: Dict[Day, JSONList]) -> JSONList:
                     logg.info(" no: (%s) [%s] %s", new_date, strHours(new_size), strDesc(new_desc))
                 else:
                     logg.info("NEW: (%s) [%s] %s", new_date, strHours(new_size), strDesc(new_desc))
+                    change: JSONDict = {"act": "NEW", "at proj": proj_id, "at task": task_id,
+                                        "date": new_date, "desc": new_desc, "zeit": new_size}
                     if UPDATE:
-                        done = odoo.timesheet_create(proj_id, task_id, new_date, new_size, new_desc)
-                        logg.info("-->: %s", done)
-                    changes.append({"act": "NEW", "at proj": proj_id, "at task": task_id,
-                                    "date": new_date, "desc": new_desc, "zeit": new_size})
+                        queued[batch.timesheet_create(proj_id, task_id, new_date, new_size, new_desc)] = change
+                    changes.append(change)
             elif len(matching) > 1:
                 logg.info(" *multiple: (%s) [%s] %s", new_date, strHours(new_size), strDesc(new_desc))
                 for matched in matching:
@@ -237,27 +239,31 @@ def __update_per_days(data: JSONList, daydata: Dict[Day, JSONList]) -> JSONList:
                 if new_size == 0:
                     logg.info("old: (%s) [%s] %s", old_date, strHours(old_size), strDesc(old_desc))
                     logg.info("del: (%s) [%s] %s", new_date, strHours(new_size), strDesc(new_desc))
+                    change = {"act": "DEL", "at proj": proj_id, "at task": task_id,
+                              "date": new_date, "desc": new_desc, "zeit": new_size}
                     if UPDATE:
                         old_id = cast(EntryID, matched["entry_id"])
                         # done = odoo.timesheet_write(old_id, proj_id, task_id, new_date, new_size, new_desc)
-                        done = odoo.timesheet_delete(old_id)
-                        logg.info("-->: %s", done)
-                    changes.append({"act": "DEL", "at proj": proj_id, "at task": task_id,
-                                    "date": new_date, "desc": new_desc, "zeit": new_size})
+                        queued[batch.timesheet_delete(old_id)] = change
+                    changes.append(change)
                 elif old_size != new_size or old_desc != new_desc or old_proj != proj_id or old_task != task_id:
                     logg.info("old: (%s) [%s] %s", old_date, strHours(old_size), strDesc(old_desc))
                     logg.info("new: (%s) [%s] %s", new_date, strHours(new_size), strDesc(new_desc))
                     if proj_id != proj_id or old_task != task_id:
                         logg.info("REF: (%s)       [%s] \"%s\"", new_date, old_proj, old_task)
                         logg.info("UPD: (%s)       [%s] \"%s\"", new_date, proj_id, task_id)
+                    change = {"act": "UPD", "at proj": proj_id, "at task": task_id,
+                              "date": new_date, "desc": new_desc, "zeit": new_size}
                     if UPDATE:
                         old_id = cast(EntryID, matched["entry_id"])
-                        done = odoo.timesheet_write(old_id, proj_id, task_id, new_date, new_size, new_desc)
-                        logg.info("-->: %s", done)
-                    changes.append({"act": "UPD", "at proj": proj_id, "at task": task_id,
-                                    "date": new_date, "desc": new_desc, "zeit": new_size})
+                        queued[batch.timesheet_write(old_id, proj_id, task_id, new_date, new_size, new_desc)] = change
+                    changes.append(change)
                 else:
                     logg.info(" ok: (%s) [%s] %s", new_date, strHours(new_size), strDesc(new_desc))
+    if queued:
+        results = batch.flush()
+        for index, change in sorted(queued.items()):
+            logg.info("-->: %s %s (%s) %s", results[index], change["act"], change["date"], strDesc(cast(str, change["desc"])))
     return changes
 
 def replace_per_days(data: JSONList) -> JSONList:
@@ -56,6 +56,9 @@ class zeit2odooTest(unittest.TestCase):
         filename = "tmp.zeit2020.txt"
         if os.path.exists(filename):
             os.remove(filename)
+        indexfile = zeit.zeit_index_filename(filename)
+        if os.path.exists(indexfile):
+            os.remove(indexfile)
     def test_001_check(self) -> None:
         txt = self.mk_zeit2020_txt()
         cmd = f"{SCRIPT} -a 01.01.2020 -b 10.01.2020 -v check --mockup -f {txt}"